@@ -27,6 +27,10 @@ extras_require = {
     'test': [
         'pytest',
         'pytest-cov'
+    ],
+    'export': [
+        'pyarrow',
+        'pandas'
     ]
 }
 
@@ -34,6 +38,7 @@ packages = [
     'weatherly',
     'weatherly.api',
     'weatherly.models',
+    'weatherly.store',
 ]
 
 setup(
@@ -45,6 +50,7 @@ setup(
     },
     version=version,
     packages=packages,
+    package_data={'weatherly.api': ['conditions.json']},
     license='MIT',
     description='A simple Python wrapper around WeatherAPI. Get current weather, forecast, history and more...',
     long_description=readme,
@@ -0,0 +1,141 @@
+import copy
+
+import pytest
+
+LOCATION = {
+    "name": "London",
+    "region": "City of London, Greater London",
+    "country": "United Kingdom",
+    "lat": 51.52,
+    "lon": -0.11,
+    "tz_id": "Europe/London",
+    "localtime_epoch": 1687341600,
+    "localtime": "2023-06-21 11:00",
+}
+
+CONDITIONS = (
+    {"text": "Sunny", "icon": "//cdn.weatherapi.com/weather/64x64/day/113.png", "code": 1000},
+    {"text": "Partly cloudy", "icon": "//cdn.weatherapi.com/weather/64x64/day/116.png", "code": 1003},
+    {"text": "Light rain", "icon": "//cdn.weatherapi.com/weather/64x64/day/296.png", "code": 1183},
+)
+
+WIND_DIRS = ("N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW")
+
+DAY_EPOCH = 1687305600 # 2023-06-21 00:00 UTC
+
+
+def make_hour(epoch, i, marine=False):
+    hour = {
+        "time_epoch": epoch,
+        "time": f"2023-06-{21 + i // 24} {i % 24:02d}:00",
+        "temp_c": 10.0 + i % 24,
+        "temp_f": 50.0 + i % 24,
+        "is_day": int(6 <= i % 24 < 21),
+        "condition": dict(CONDITIONS[i % 3]),
+        "wind_mph": 5.0 + i % 5,
+        "wind_kph": 8.0 + i % 5,
+        "wind_degree": (i * 22) % 360,
+        "wind_dir": WIND_DIRS[i % 16],
+        "pressure_mb": 1012.0,
+        "pressure_in": 29.88,
+        "precip_mm": 0.1 * (i % 4),
+        "precip_in": 0.0,
+        "humidity": 60 + i % 10,
+        "cloud": 10 * (i % 10),
+        "feelslike_c": 9.0 + i % 24,
+        "feelslike_f": 48.0 + i % 24,
+        "windchill_c": 9.5,
+        "windchill_f": 49.1,
+        "heatindex_c": 10.5,
+        "heatindex_f": 50.9,
+        "dewpoint_c": 5.0,
+        "dewpoint_f": 41.0,
+        "vis_km": 10.0,
+        "vis_miles": 6.0,
+        "gust_mph": 9.4,
+        "gust_kph": 15.1,
+        "uv": 4.0,
+    }
+    if marine:
+        hour.update({
+            "sig_ht_mt": 0.5,
+            "swell_ht_mt": 0.3 + 0.1 * (i % 3),
+            "swell_ht_ft": 1.0,
+            "swell_dir": 200.0,
+            "swell_dir_16_point": "SSW",
+            "swell_period_secs": 6.5,
+            "water_temp_c": 15.0,
+            "water_temp_f": 59.0,
+        })
+    else:
+        hour.update({
+            "will_it_rain": i % 2,
+            "chance_of_rain": (i * 7) % 100,
+            "will_it_snow": 0,
+            "chance_of_snow": 0,
+        })
+    return hour
+
+
+def make_day(d, marine=False):
+    epoch = DAY_EPOCH + d * 86400
+    day = {
+        "maxtemp_c": 21.0, "maxtemp_f": 69.8, "mintemp_c": 11.0, "mintemp_f": 51.8,
+        "avgtemp_c": 16.0, "avgtemp_f": 60.8, "maxwind_mph": 9.0, "maxwind_kph": 14.4,
+        "totalprecip_mm": 0.5, "totalprecip_in": 0.02, "avgvis_km": 10.0, "avgvis_miles": 6.0,
+        "avghumidity": 65, "uv": 5.0, "condition": dict(CONDITIONS[d % 3]),
+    }
+    if marine:
+        day["tides"] = [{"tide": [
+            {"tide_time": f"2023-06-{21 + d} 04:10", "tide_height_mt": "1.20", "tide_type": "HIGH"},
+            {"tide_time": f"2023-06-{21 + d} 10:30", "tide_height_mt": "0.10", "tide_type": "LOW"},
+        ]}]
+    return {
+        "date": f"2023-06-{21 + d}",
+        "date_epoch": epoch,
+        "day": day,
+        "astro": {"sunrise": "04:43 AM", "sunset": "09:21 PM", "moonrise": "09:02 AM",
+                  "moonset": "12:10 AM", "moon_phase": "Waxing Crescent", "moon_illumination": "12"},
+        "hour": [make_hour(epoch + h * 3600, d * 24 + h, marine) for h in range(24)],
+    }
+
+
+def make_forecast(days=3, location=None, marine=False):
+    raw = {
+        "location": dict(location or LOCATION),
+        "forecast": {"forecastday": [make_day(d, marine) for d in range(days)]},
+    }
+    if not marine:
+        raw["current"] = make_current()["current"]
+        raw["alerts"] = {"alert": []}
+    return raw
+
+
+def make_current(location=None, **fields):
+    current = {
+        "last_updated_epoch": 1687341600,
+        "last_updated": "2023-06-21 11:00",
+        "temp_c": 18.0, "temp_f": 64.4, "is_day": 1,
+        "condition": dict(CONDITIONS[1]),
+        "wind_mph": 6.9, "wind_kph": 11.2, "wind_degree": 240, "wind_dir": "WSW",
+        "pressure_mb": 1014.0, "pressure_in": 29.94, "precip_mm": 0.0, "precip_in": 0.0,
+        "humidity": 63, "cloud": 25, "feelslike_c": 18.0, "feelslike_f": 64.4,
+        "vis_km": 10.0, "vis_miles": 6.0, "uv": 5.0, "gust_mph": 9.2, "gust_kph": 14.8,
+    }
+    current.update(fields)
+    return {"location": dict(location or LOCATION), "current": current}
+
+
+@pytest.fixture
+def forecast_raw():
+    return copy.deepcopy(make_forecast())
+
+
+@pytest.fixture
+def marine_raw():
+    return copy.deepcopy(make_forecast(marine=True))
+
+
+@pytest.fixture
+def current_raw():
+    return make_current()
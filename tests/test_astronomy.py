@@ -0,0 +1,67 @@
+import datetime
+
+import pytest
+import weatherly
+
+from conftest import LOCATION
+from test_client import FakeResponse
+
+# rise and set times computed with a high-precision ephemeris (sampled every minute), moon illumination at local noon
+REFERENCE = [
+    ((51.52, -0.11, "2023-06-21", "Europe/London"),
+     ("04:42 AM", "09:21 PM", "07:20 AM", "No moonset", "Waxing Crescent", 10)),
+    ((40.71, -74.01, "2024-04-08", "America/New_York"),
+     ("06:27 AM", "07:28 PM", "06:23 AM", "07:38 PM", "New Moon", 0)),
+    ((40.71, -74.01, "2024-01-25", "America/New_York"),
+     ("07:12 AM", "05:04 PM", "04:57 PM", "07:32 AM", "Full Moon", 100)),
+    ((-33.87, 151.21, "2023-12-21", "Australia/Sydney"),
+     ("05:40 AM", "08:05 PM", "02:17 PM", "01:26 AM", "First Quarter", 64)),
+    ((35.68, 139.69, "2023-09-10", "Asia/Tokyo"),
+     ("05:19 AM", "05:56 PM", "12:20 AM", "03:38 PM", "Waning Crescent", 21)),
+    ((-22.9, -43.2, "2022-02-14", "America/Sao_Paulo"),
+     ("05:40 AM", "06:32 PM", "05:30 PM", "03:31 AM", "Waxing Gibbous", 96)),
+]
+
+def minutes(text):
+    time = datetime.datetime.strptime(text, "%I:%M %p")
+    return time.hour * 60 + time.minute
+
+
+@pytest.mark.parametrize(("args", "expected"), REFERENCE)
+def test_compute(args, expected):
+    astro = weatherly.astronomy.compute(*args)
+    for name, value, tolerance in zip(("sunrise", "sunset", "moonrise", "moonset"), expected, (2, 2, 6, 6)):
+        if value.startswith("No"):
+            assert astro[name] == value
+        else:
+            assert abs(minutes(astro[name]) - minutes(value)) <= tolerance, name
+    assert astro["moon_phase"] == expected[4]
+    assert abs(astro["moon_illumination"] - expected[5]) <= 1
+
+
+def test_polar_and_many():
+    polar = weatherly.astronomy.compute(78.22, 15.65, "2023-06-21", "Arctic/Longyearbyen")
+    assert (polar["sunrise"], polar["sunset"]) == ("No sunrise", "No sunset")
+
+    locations = [(lat, lon, tz) for (lat, lon, _, tz), _ in REFERENCE]
+    dates = [args[2] for args, _ in REFERENCE]
+    many = weatherly.astronomy.compute_many(locations, dates)
+    assert len(many) == len(locations) and all(len(row) == len(dates) for row in many)
+    for i, (args, _) in enumerate(REFERENCE):
+        assert many[i][i] == weatherly.astronomy.compute(*args)
+
+
+def test_client_offline_astronomy(monkeypatch):
+    calls = []
+
+    def fake_request(self, path, data=None, **kwargs):
+        calls.append(path)
+        return {"location": dict(LOCATION)}, FakeResponse()
+
+    monkeypatch.setattr(weatherly.Client, "_request", fake_request)
+    client = weatherly.Client("key", offline_astronomy=True)
+    astro = client.get_astronomical_data("London", "2023-06-21")
+    client.get_astronomical_data(" london", "2023-06-22")
+    assert calls == ["timezone.json"]
+    assert astro.location.name == "London" and astro.moon_phase == "Waxing Crescent"
+    assert astro.sunrise == weatherly.astronomy.compute(51.52, -0.11, "2023-06-21", "Europe/London")["sunrise"]
@@ -0,0 +1,619 @@
+import functools
+import json
+import multiprocessing
+import threading
+
+import pytest
+import weatherly
+from weatherly.api import translation
+
+from conftest import DAY_EPOCH, LOCATION, make_current, make_forecast
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, url=""):
+        self.status_code = status_code
+        self.url = url
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def fake_request(self, path, data=None, **kwargs):
+        with lock:
+            calls.append((path, kwargs))
+        return make_forecast(days=1), FakeResponse()
+
+    monkeypatch.setattr(weatherly.Client, "_request", fake_request)
+    return calls
+
+
+def test_historical_range(calls, tmp_path):
+    client = weatherly.Client("key")
+    cache = {"London|2023-01-02": weatherly.ForecastData(make_forecast(days=1), 200, None)}
+    checkpoint = tmp_path / "checkpoint.txt"
+
+    results = list(client.get_historical_range(
+        ["London", "Paris"], "2023-01-01", "2023-01-03", cache=cache, checkpoint=str(checkpoint), rate_limit=1000
+    ))
+    assert len(results) == 6
+    assert len(calls) == 5
+    assert sorted((path, kwargs["q"], kwargs["dt"]) for path, kwargs in calls)[0] == ("history.json", "London", "2023-01-01")
+    assert len(cache) == 6
+    assert len(checkpoint.read_text().splitlines()) == 6
+
+    # resuming skips days that were already processed
+    assert list(client.get_historical_range(["London", "Paris"], "2023-01-01", "2023-01-04", checkpoint=str(checkpoint))) != []
+    assert len(calls) == 7
+
+
+def test_historical_range_columnar(calls, tmp_path):
+    client = weatherly.Client("key")
+
+    columns = client.get_historical_range("London", "2023-01-01", "2023-01-02", columnar=True)
+    assert list(columns) == ["London"]
+    assert len(columns["London"]) == 48
+
+    # a resumed run still covers every day: checkpointed days come from the cache, or are fetched again
+    checkpoint = str(tmp_path / "checkpoint.txt")
+    list(client.get_historical_range("London", "2023-01-01", "2023-01-02", checkpoint=checkpoint))
+    calls.clear()
+    columns = client.get_historical_range("London", "2023-01-01", "2023-01-03", checkpoint=checkpoint, columnar=True)
+    assert len(columns["London"]) == 72 and len(calls) == 3
+    cache = {}
+    client.get_historical_range("London", "2023-01-01", "2023-01-03", cache=cache, columnar=True)
+    calls.clear()
+    columns = client.get_historical_range("London", "2023-01-01", "2023-01-03", cache=cache, checkpoint=checkpoint, columnar=True)
+    assert len(columns["London"]) == 72 and calls == []
+
+
+def test_historical_range_invalid_dates():
+    client = weatherly.Client("key")
+    with pytest.raises(weatherly.InvalidDate):
+        client.get_historical_range("London", "2023-01-03", "2023-01-01")
+
+
+def test_poll_scheduler(monkeypatch):
+    now = [1687341600.0]
+    calls = []
+
+    def fake_request(self, path, data=None, **kwargs):
+        calls.append(now[0])
+        # the API publishes a new update every 15 minutes
+        updated = int(now[0] - (now[0] - 1687341600) % 900)
+        return make_current(last_updated_epoch=updated), FakeResponse()
+
+    monkeypatch.setattr(weatherly.Client, "_request", fake_request)
+    scheduler = weatherly.PollScheduler(
+        weatherly.Client("key"), ["London", "Paris"], grace=30, jitter=0, stagger=0, max_workers=1, clock=lambda: now[0]
+    )
+
+    fresh = []
+    for _ in range(2 * 3600 // 60): # poll every minute for two hours
+        fresh.extend(scheduler.poll())
+        now[0] += 60
+    # every update was seen once, with a single call per update and location
+    assert len(fresh) == 2 * 8
+    assert len(calls) == 2 * 8
+    assert scheduler.stale_calls == 0
+    assert scheduler.estimated_interval("London") == 900
+
+    # an update published late is retried instead of waiting a whole interval
+    scheduler.update("London", weatherly.CurrentWeatherData(make_current(last_updated_epoch=0), 200, None), now[0])
+    assert scheduler.stale_calls == 1
+    assert scheduler.next_due() <= now[0] + 60
+
+    # first fetches of many added locations are spread over the interval
+    scheduler.stagger = 1
+    for i in range(100):
+        scheduler.add(f"location-{i}")
+    due = sorted(scheduler._states[f"location-{i}"].next_at - now[0] for i in range(100))
+    assert 0 <= due[0] < 90 and 810 < due[-1] <= 900
+
+
+def test_hash_ring():
+    ring = weatherly.HashRing(["a", "b", "c"])
+    keys = [f"location-{i}" for i in range(3000)]
+    before = {key: ring.node_for(key) for key in keys}
+    assert all(600 < len(assigned) < 1400 for assigned in ring.assign(keys).values())
+
+    ring.add("d")
+    moved = [key for key in keys if ring.node_for(key) != before[key]]
+    assert all(ring.node_for(key) == "d" for key in moved) # only keys of the new node move
+    ring.remove("d")
+    assert {key: ring.node_for(key) for key in keys} == before
+
+
+class PollingClient(weatherly.Client):
+    def _request(self, path, data=None, **kwargs):
+        return make_current(location={**LOCATION, "name": kwargs["q"]}), FakeResponse()
+
+
+def polling_client():
+    return PollingClient("key")
+
+
+def frozen_polling_client():
+    return PollingClient("key", frozen=True)
+
+
+def handle_weather(handled, query, weather):
+    handled.put(weather.location.name)
+
+
+def test_sharded_poller():
+    queries = [f"location-{i}" for i in range(20)]
+    with weatherly.ShardedPoller(polling_client, queries, workers=2, context="fork", stagger=0) as poller:
+        assert sorted(q for assigned in poller.assignment.values() for q in assigned) == sorted(queries)
+        received = {}
+        for query, data in poller.results(timeout=10):
+            received[query] = data
+            if len(received) == len(queries):
+                break
+    assert sorted(received) == sorted(queries)
+    assert received["location-3"].location.name == "location-3"
+
+    # raw data is sent to the parent, models are built only when asked for
+    with weatherly.ShardedPoller(frozen_polling_client, queries[:4], workers=2, context="fork", stagger=0) as poller:
+        received = {}
+        for query, data in poller.results(timeout=10, raw=True):
+            received[query] = data
+            if len(received) == 4:
+                break
+    assert received["location-1"]["location"]["name"] == "location-1"
+
+    # data is processed in the workers
+    handled = multiprocessing.get_context("fork").Queue()
+    with weatherly.ShardedPoller(polling_client, queries[:4], workers=2, context="fork", stagger=0,
+                                 handler=functools.partial(handle_weather, handled)) as poller:
+        seen = sorted(handled.get(timeout=10) for _ in range(4))
+        assert list(poller.results(timeout=0.5)) == []
+    assert seen == sorted(queries[:4])
+
+    # machines split locations between them
+    first = weatherly.ShardedPoller(polling_client, queries, workers=1, node="a", nodes=["a", "b"])
+    second = weatherly.ShardedPoller(polling_client, queries, workers=1, node="b", nodes=["a", "b"])
+    assert sorted(first.queries + second.queries) == sorted(queries)
+
+    second.add_worker()
+    assert sorted(q for assigned in second.assignment.values() for q in assigned) == sorted(second.queries)
+    second.remove_worker("worker-0")
+    assert second.assignment == {"worker-1": second.queries}
+
+    # a machine leaves and another one joins, only their locations move
+    taken = first.set_nodes(["a"])
+    assert sorted(taken["worker-0"]) == sorted(second.queries)
+    assert sorted(first.assignment["worker-0"]) == sorted(queries)
+    assert first.set_nodes(["a", "c"]) == {}
+    third = weatherly.ShardedPoller(polling_client, queries, workers=1, node="c", nodes=["a", "c"])
+    assert sorted(first.queries + third.queries) == sorted(queries)
+    assert sorted(first.assignment["worker-0"]) == sorted(first.queries)
+    with pytest.raises(ValueError):
+        first.set_nodes(["b"])
+
+
+def test_subscriptions(monkeypatch):
+    payloads = []
+    monkeypatch.setattr(weatherly.Client, "_request", lambda self, path, data=None, **kwargs: (payloads.pop(0), FakeResponse()))
+    client = weatherly.Client("key")
+    now = [DAY_EPOCH + 12 * 3600]
+    subscriptions = weatherly.Subscriptions(client, clock=lambda: now[0])
+    changes, crossings, alerts = [], [], []
+    subscriptions.on_change("temp_c", 2, changes.append, source="current")
+    subscriptions.on_crossing("chance_of_rain", 50, crossings.append, direction="up", source="forecast")
+    subscriptions.on_alert(alerts.append)
+
+    for temp in (18.0, 19.5, 20.1, 21.0, 17.0):
+        payloads.append(make_current(temp_c=temp))
+        client.get_current_weather("London")
+    client.events.flush()
+    assert [(event.old, event.new) for event in changes] == [(18.0, 20.1), (20.1, 17.0)]
+
+    alert = {
+        "headline": "Flood warning", "msgType": "Alert", "severity": "Moderate", "urgency": "Expected",
+        "areas": "London", "category": "Met", "certainty": "Likely", "event": "Flood", "note": "",
+        "effective": "2023-06-21T10:00:00+00:00", "expires": "2023-06-22T10:00:00+00:00", "desc": "", "instruction": "",
+    }
+    first, second = make_forecast(days=1), make_forecast(days=1)
+    first["forecast"]["forecastday"][0]["hour"][5]["chance_of_rain"] = 30
+    second["forecast"]["forecastday"][0]["hour"][5]["chance_of_rain"] = 60
+    second["forecast"]["forecastday"][0]["hour"][6]["chance_of_rain"] = 20
+    second["alerts"] = {"alert": [alert]}
+    payloads.extend([first, second, second])
+    for _ in range(3):
+        client.get_forecast_data("London", 1)
+    client.events.flush()
+
+    assert [(event.time_epoch, event.old, event.new) for event in crossings] == [(DAY_EPOCH + 5 * 3600, 30, 60)]
+    assert len(alerts) == 1 and alerts[0].new.headline == "Flood warning"
+
+    # baselines of past hours and expired alerts are forgotten
+    watcher = weatherly.Subscriptions(clock=lambda: now[0])
+    subscription = watcher.on_change("temp_c", 2, lambda event: None, source="forecast")
+    watcher.on_alert(alerts.append)
+    today, tomorrow = make_forecast(days=2), make_forecast(days=2)
+    tomorrow["forecast"]["forecastday"].pop(0)
+    today["alerts"] = tomorrow["alerts"] = {"alert": [alert]}
+    watcher.process(weatherly.ForecastData(today, 200, None))
+    (location, baselines), = subscription._baselines.items()
+    assert len(baselines) == 48 and len(watcher._alerts[location]) == 1
+
+    now[0] = DAY_EPOCH + 36 * 3600 # the alert expired
+    watcher.process(weatherly.ForecastData(tomorrow, 200, None))
+    assert min(baselines) == DAY_EPOCH + 86400 and len(baselines) == 24
+    assert watcher._alerts == {}
+    assert len(alerts) == 2 # an expired alert is not reported again
+
+
+def test_event_listeners(calls):
+    class CustomClient(weatherly.Client):
+        def on_api_call_successful(self, request, response):
+            seen.append(("subclass", request))
+
+    seen = []
+    slow = threading.Event()
+    client = CustomClient("key")
+
+    @client.event
+    def on_api_call_successful(request, response):
+        slow.wait(5) # a slow listener does not block the call
+        seen.append(("listener", request))
+
+    assert client.get_forecast_data("London", 1) is not None
+    assert ("listener", "") not in seen
+    slow.set()
+    client.events.flush()
+    assert sorted(seen) == [("listener", ""), ("subclass", "")]
+
+    client.events.remove_listener("on_api_call_successful", on_api_call_successful)
+    assert len(client.events.listeners("on_api_call_successful")) == 1
+
+
+def test_event_bus_is_bounded():
+    bus = weatherly.EventBus(maxsize=1, on_error=lambda event, exc: errors.append(event))
+    errors, calls = [], []
+    release = threading.Event()
+    bus.add_listener("on_data", lambda data: (release.wait(5), calls.append(data)))
+    bus.add_listener("on_data", lambda data: 1 / 0)
+    bus.dispatch("unknown", 1) # no listeners, nothing is queued
+    for i in range(5):
+        bus.dispatch("on_data", i)
+    release.set()
+    bus.close()
+    assert bus.dropped >= 3
+    assert calls[0] == 0 and len(calls) == 5 - bus.dropped
+    assert errors == ["on_data"] * len(calls)
+
+
+def test_result_mode(monkeypatch, caplog):
+    def fake_request(self, path, data=None, **kwargs):
+        if kwargs["q"] == "nowhere" or data is not None: # bulk requests are only made for "nowhere"
+            return {"error": {"code": 1006, "message": "No matching location found."}}, FakeResponse(400)
+        return make_current(), FakeResponse()
+
+    monkeypatch.setattr(weatherly.Client, "_request", fake_request)
+    client = weatherly.Client("key", results=True)
+
+    @client.event
+    def on_error(func, exc):
+        pytest.fail("on_error should not be called")
+
+    result = client.get_current_weather("London")
+    assert result and result.ok and result.unwrap().temp_c == 18.0
+
+    with caplog.at_level("WARNING", logger="weatherly"):
+        errors = [client.get_current_weather("nowhere") for _ in range(250)]
+    assert all(not error and isinstance(error.error, weatherly.NoLocationFound) for error in errors)
+    assert errors[0].func == "get_current_weather"
+    with pytest.raises(weatherly.NoLocationFound):
+        errors[0].unwrap()
+    assert client.errors.most_common() == [(("get_current_weather", "NoLocationFound"), 250)]
+    assert len(caplog.records) == 3 # the first, 100th and 200th error
+
+    # bulk requests return errors instead of raising them too
+    request = weatherly.BulkRequest.build(("a", "nowhere"), endpoint=weatherly.WeatherEndpoints.CURRENT_WEATHER)
+    error = client.bulk_request(request)
+    assert not error and isinstance(error.error, weatherly.NoLocationFound) and error.func == "bulk_request"
+
+
+def test_negative_cache(monkeypatch):
+    now = [0.0]
+    calls = []
+
+    def fake_request(self, path, data=None, **kwargs):
+        calls.append(kwargs["q"])
+        if kwargs["q"] == "limit":
+            return {"error": {"code": 2007, "message": "API key has exceeded calls per month quota."}}, FakeResponse(400)
+        return {"error": {"code": 1006, "message": "No matching location found."}}, FakeResponse(400)
+
+    monkeypatch.setattr(weatherly.Client, "_request", fake_request)
+    client = weatherly.Client("key", results=True, negative_cache=weatherly.NegativeCache(ttl=30, clock=lambda: now[0]))
+
+    for _ in range(3):
+        result = client.get_current_weather("nowhere")
+        assert isinstance(result.error, weatherly.NoLocationFound) and result.error.code == 1006
+    assert calls == ["nowhere"]
+    assert client.negative_cache.hits == 2
+
+    client.get_current_weather("nowhere", aqi=True) # different request
+    client.get_current_weather("limit")
+    client.get_current_weather("limit") # not deterministic, not cached
+    assert calls == ["nowhere", "nowhere", "limit", "limit"]
+
+    now[0] += 31
+    client.get_current_weather("nowhere")
+    assert len(calls) == 5
+
+
+def test_query_canonicalizer():
+    canonicalizer = weatherly.QueryCanonicalizer(precision=2)
+    assert canonicalizer.canonical("  New   York ") == "new york"
+    assert canonicalizer.canonical("51.5072, -0.1276") == canonicalizer.canonical("51.51,-0.13") == "51.51,-0.13"
+    assert canonicalizer.canonical("-0.001,0") == "0.00,0.00"
+    assert canonicalizer.learn("London, UK", LOCATION) == "51.52,-0.11"
+    assert canonicalizer.canonical("london,  uk") == "51.52,-0.11"
+
+
+def test_response_cache(monkeypatch):
+    calls = []
+
+    def fake_request(self, path, data=None, **kwargs):
+        calls.append(kwargs["q"])
+        return make_current(), FakeResponse(url="https://api.weatherapi.com/v1/current.json")
+
+    monkeypatch.setattr(weatherly.Client, "_request", fake_request)
+    client = weatherly.Client("key", response_cache=60)
+    for query in ("London", "london", " London ", "51.52,-0.11", "51.5201,-0.1099"):
+        assert client.get_current_weather(query).temp_c == 18.0
+    assert calls == ["London"]
+
+    client.get_current_weather("London, UK") # unknown query, resolved to the cached location
+    client.get_current_weather("london, uk")
+    client.get_current_weather("London", aqi=True) # different request
+    assert calls == ["London", "London, UK", "London"]
+    assert client.response_cache.hits == 5
+
+
+def test_geo_index():
+    from weatherly.api.geoindex import haversine
+
+    index = weatherly.GeoIndex(cell_size=1)
+    points = {i: ((i * 37) % 170 - 85 + 0.3, (i * 91) % 360 - 180 + 0.7) for i in range(500)}
+    for item, (lat, lon) in points.items():
+        index.insert(item, lat, lon)
+    for lat, lon in ((51.5, -0.1), (-33.9, 151.2), (0.0, 179.9), (89.0, 10.0)):
+        expected = min(points, key=lambda item: haversine(lat, lon, *points[item]))
+        assert index.nearest(lat, lon)[0] == expected
+        assert [item for item, _ in index.within(lat, lon, 2000)] == sorted(
+            (item for item in points if haversine(lat, lon, *points[item]) <= 2000),
+            key=lambda item: haversine(lat, lon, *points[item]),
+        )
+    assert index.nearest(0.0, 0.0, max_distance=1) is None
+    index.remove(0)
+    assert 0 not in index and len(index) == 499
+
+
+def test_response_cache_nearby(monkeypatch):
+    calls = []
+
+    def fake_request(self, path, data=None, **kwargs):
+        calls.append(kwargs["q"])
+        return make_current(), FakeResponse()
+
+    monkeypatch.setattr(weatherly.Client, "_request", fake_request)
+    client = weatherly.Client("key", response_cache=weatherly.ResponseCache(nearby=10))
+    client.get_current_weather("London")
+    client.get_current_weather("51.50,-0.15") # about 3 km away
+    client.get_current_weather("51.50,-0.15", aqi=True) # different request
+    client.get_current_weather("52.00,-0.11") # about 53 km away
+    assert calls == ["London", "51.50,-0.15", "52.00,-0.11"]
+    assert client.response_cache.approximate_hits == 1
+
+
+def test_autocomplete_cache(monkeypatch):
+    places = [
+        {"id": i, "name": name, "region": region, "country": "United Kingdom", "lat": 51.0, "lon": 0.0, "url": name.lower()}
+        for i, (name, region) in enumerate([
+            ("London", "City of London, Greater London"), ("Londonderry", "Northern Ireland"),
+            ("Long Eaton", "Derbyshire"), ("Longford", "Greater London"),
+        ])
+    ]
+    calls = []
+
+    def fake_request(self, path, data=None, **kwargs):
+        calls.append(kwargs["q"])
+        prefix = kwargs["q"].lower()
+        return [place for place in places if place["name"].lower().startswith(prefix)], FakeResponse()
+
+    monkeypatch.setattr(weatherly.Client, "_request", fake_request)
+    client = weatherly.Client("key", autocomplete=True)
+    for query in ("Lon", "Lond", "Londo", "London", "lon", "Long "):
+        client.get_locations(query)
+    assert calls == ["Lon"]
+    assert [location.name for location in client.get_locations("londonderry")] == ["Londonderry"]
+    assert client.autocomplete.hits == 1 and client.autocomplete.filtered_hits == 5
+
+    # incomplete results (as many as the API returns at most) are not filtered
+    cache = weatherly.AutocompleteCache(max_results=2)
+    cache.put("Lon", places[:2])
+    assert cache.get("Lond") is None
+    assert cache.get(" LON ") == places[:2]
+
+    # least recently used prefixes are evicted first
+    cache = weatherly.AutocompleteCache(max_bytes=1)
+    cache.put("a", places[:1])
+    cache.put("ab", places[1:2])
+    assert len(cache) == 1 and cache.get("ab") == places[1:2] and cache.get("a") is None
+
+
+def test_ip_cache(monkeypatch):
+    calls = []
+
+    def fake_request(self, path, data=None, **kwargs):
+        calls.append(kwargs["q"])
+        return {
+            "ip": kwargs["q"], "type": "ipv4", "continent_code": "EU", "continent_name": "Europe",
+            "country_code": "GB", "country_name": "United Kingdom", "is_eu": "false", "geoname_id": 2643743,
+            "city": "London", "region": "England", "lat": 51.5, "lon": -0.13, "tz_id": "Europe/London",
+            "localtime_epoch": 1687341600, "localtime": "2023-06-21 11:00",
+        }, FakeResponse()
+
+    monkeypatch.setattr(weatherly.Client, "_request", fake_request)
+    client = weatherly.Client("key", ip_cache=weatherly.IPCache(ipv4_prefix=24))
+    assert client.get_ip_data("203.0.113.7").ip == "203.0.113.7"
+    data = client.get_ip_data("203.0.113.200")
+    assert (data.ip, data.city) == ("203.0.113.200", "London")
+    client.get_ip_data("203.0.114.1")
+    client.get_ip_data("auto:ip")
+    assert calls == ["203.0.113.7", "203.0.114.1", "auto:ip"]
+
+    # the longest matching network wins
+    cache = weatherly.IPCache()
+    cache.add("2001:db8::/32", {"city": "Wide"})
+    cache.add("2001:db8:1::/48", {"city": "Narrow"})
+    assert cache.get("2001:db8:1::5")["city"] == "Narrow"
+    assert cache.get("2001:db8:2::5") == {"city": "Wide", "ip": "2001:db8:2::5", "type": "ipv6"}
+    assert cache.get("198.51.100.1") is None and len(cache) == 2
+
+    # IPv4-mapped addresses share IPv4 networks, but keep the address as given
+    cache.put("203.0.113.7", {"city": "London"})
+    assert cache.get("::ffff:203.0.113.9") == {"city": "London", "ip": "::ffff:203.0.113.9", "type": "ipv6"}
+
+    # least recently used networks are evicted, expired ones are dropped, and so are their empty branches
+    now = [0.0]
+    cache = weatherly.IPCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.add("10.0.0.0/8", {"city": "A"})
+    cache.add("192.168.0.0/16", {"city": "B"})
+    assert cache.get("10.1.2.3")["city"] == "A"
+    cache.add("172.16.0.0/12", {"city": "C"})
+    assert len(cache) == 2 and cache.get("192.168.1.1") is None
+    assert cache._roots[4].children[1].children[1] is None # 192.168.0.0/16 is unlinked
+    now[0] = 20
+    assert cache.get("10.1.2.3") is None and cache.get("172.16.0.1") is None
+    assert len(cache) == 0 and cache._roots[4].children == [None, None]
+
+
+def test_response_cache_subsumption(monkeypatch):
+    calls = []
+
+    def fake_request(self, path, data=None, **kwargs):
+        calls.append((path, kwargs.get("days"), kwargs.get("hour"), kwargs.get("aqi"), kwargs.get("tides")))
+        days = int(kwargs.get("days", 1))
+        raw = make_forecast(days, marine=path == "marine.json")
+        if kwargs.get("aqi") == "yes":
+            aqi = {"co": 230.3, "o3": 13.0, "no2": 14.0, "so2": 2.0, "pm2_5": 4.0, "pm10": 5.0,
+                   "us-epa-index": 1, "gb-defra-index": 1}
+            raw["current"]["air_quality"] = aqi
+            for forecastday in raw["forecast"]["forecastday"]:
+                forecastday["day"]["air_quality"] = aqi
+        return raw, FakeResponse()
+
+    monkeypatch.setattr(weatherly.Client, "_request", fake_request)
+    client = weatherly.Client("key", response_cache=60)
+    client.get_forecast_data("London", days=7, aqi=True, alerts=True)
+    forecast = client.get_forecast_data("London", days=3)
+    assert len(forecast.forecast_days) == 3 and forecast.forecast_days[0].aqi is None
+    forecast = client.get_forecast_data("London", days=2, hour=13)
+    assert [len(day.hour_data) for day in forecast.forecast_days] == [1, 1]
+    assert forecast.forecast_days[0].hour_data[0].temp_c == 23.0
+    assert client.get_forecast_data("London", days=8) is not None # wider than the cached response
+    assert calls == [("forecast.json", 7, None, "yes", None), ("forecast.json", 8, None, "no", None)]
+    assert client.response_cache.subsumed_hits == 2
+
+    marine = client.get_marine_data("London", tides=True, days=3)
+    assert marine.marine_days[0].tide_data
+    assert not client.get_marine_data("London", days=1).marine_days[0].tide_data
+    assert len(calls) == 3
+
+    # missed requests are upgraded to frequently requested shapes
+    calls.clear()
+    client = weatherly.Client("key", response_cache=weatherly.ResponseCache(upgrade=True))
+    client.get_forecast_data("Paris", days=3, aqi=True)
+    assert len(client.get_forecast_data("London", days=1).forecast_days) == 1
+    client.get_forecast_data("London", days=3, aqi=True)
+    assert calls == [("forecast.json", 3, None, "yes", None), ("forecast.json", 3, None, "yes", None)]
+
+    # a rare wide request does not widen all later ones
+    calls.clear()
+    client = weatherly.Client("key", response_cache=weatherly.ResponseCache(upgrade=True))
+    client.get_forecast_data("Paris", days=10)
+    for city in ("Berlin", "Rome", "Madrid", "Vienna", "Prague"):
+        client.get_forecast_data(city, days=1)
+    assert [days for _, days, *_ in calls] == [10, 10, 10, 10, 1, 1]
+
+
+def test_condition_translation(monkeypatch):
+    french = {1000: ("Ensoleillé", "Clair"), 1003: ("Partiellement nuageux", "Partiellement nuageux"),
+              1183: ("Pluie légère", "Pluie légère")}
+    calls = []
+
+    def fake_request(self, path, data=None, **kwargs):
+        calls.append(kwargs.get("lang"))
+        raw = make_forecast(1)
+        if kwargs.get("lang") == "fr":
+            for item in [raw["current"], raw["forecast"]["forecastday"][0]["day"], *raw["forecast"]["forecastday"][0]["hour"]]:
+                item["condition"]["text"] = french[item["condition"]["code"]][0 if item.get("is_day", 1) else 1]
+        return raw, FakeResponse()
+
+    monkeypatch.setattr(weatherly.Client, "_request", fake_request)
+    # only English texts, so texts of other languages have to be learned or loaded
+    english_only = [{**condition, "languages": []} for condition in translation._bundled_conditions()]
+    monkeypatch.setattr(translation, "_bundled_conditions", lambda: english_only)
+    client = weatherly.Client("key", response_cache=60, translate=True)
+    english = client.get_forecast_data("London", days=1)
+    assert english.forecast_days[0].condition_text == "Sunny"
+    client.set_language(weatherly.Languages.French)
+    first = client.get_forecast_data("London", days=1) # texts are learned from a response in French
+    second = client.get_forecast_data("London", days=1)
+    assert calls == [None, "fr"]
+    assert second.raw == first.raw
+    assert [hour.condition_text for hour in second.forecast_days[0].hour_data[:3]] == ["Clair", "Partiellement nuageux", "Pluie légère"]
+    assert client.translator.hits == 1
+
+    translator = weatherly.ConditionTranslator([
+        {"code": 1000, "day": "Sunny", "night": "Clear", "icon": 113,
+         "languages": [{"lang_name": "Polish", "lang_iso": "pl", "day_text": "Słonecznie", "night_text": "Bezchmurnie"}]},
+    ])
+    assert "Polish" in translator and "de" not in translator
+    assert translator.text(1000, weatherly.Languages.Polish, is_day=False) == "Bezchmurnie"
+    assert translator.text(1276) == "Moderate or heavy rain with thunder"
+    assert translator.translate(make_current(), "pl") is None # 1003 is unknown in Polish
+
+
+def test_bundled_conditions():
+    with open(translation.CONDITIONS_FILE, encoding="utf-8") as file:
+        table = json.load(file)
+    translator = weatherly.ConditionTranslator()
+    assert translator.text(1000) == "Sunny" and translator.text(1000, is_day=False) == "Clear"
+    assert all(translator.text(condition["code"]) == condition["day"] for condition in table)
+    for condition in table:
+        for language in condition["languages"]:
+            assert translator.text(condition["code"], language["lang_iso"], is_day=False) == language["night_text"]
+
+
+def test_translation_requests_without_default_language(monkeypatch):
+    urls = []
+
+    class HTTPResponse(FakeResponse):
+        def json(self):
+            raw = make_current()
+            if "lang=fr" in self.url:
+                raw["current"]["condition"]["text"] = "Partiellement nuageux"
+            return raw
+
+    def fake_get(url, json=None):
+        urls.append(url)
+        return HTTPResponse(url=url)
+
+    monkeypatch.setattr("weatherly.api.core.requests.get", fake_get)
+    cache, translator = weatherly.ResponseCache(), weatherly.ConditionTranslator()
+    french = weatherly.Client("key", lang="fr", response_cache=cache, translate=translator)
+    english = weatherly.Client("key", response_cache=cache, translate=translator)
+    assert french.get_current_weather("London").condition_text == "Partiellement nuageux" # learned
+    french.get_current_weather("Paris")
+    assert "lang=" not in urls[-1]
+    assert english.get_current_weather("Paris").condition_text == "Partly cloudy"
+    assert french.get_current_weather("Paris").condition_text == "Partiellement nuageux"
+    assert len(urls) == 2
@@ -0,0 +1,39 @@
+import pytest
+import weatherly
+
+from conftest import make_current, make_forecast
+
+
+def test_to_arrow(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    parquet = pytest.importorskip("pyarrow.parquet")
+    forecasts = [weatherly.ForecastData(make_forecast(days=d), 200, None) for d in (1, 2)]
+
+    batch = weatherly.export.to_arrow(forecasts)
+    assert batch.schema == weatherly.export.schema(weatherly.ForecastData)
+    assert batch.num_rows == 72
+    assert batch.column("temp_c")[1].as_py() == 11.0
+    assert batch.column("condition_text")[0].as_py() == "Sunny"
+
+    path = tmp_path / "forecast.parquet"
+    weatherly.export.to_parquet(forecasts, str(path))
+    assert parquet.read_table(path).num_rows == 72
+
+
+def test_to_pandas():
+    pytest.importorskip("pandas")
+    current = [weatherly.CurrentWeatherData(make_current(temp_c=t), 200, None) for t in (1.0, 2.0)]
+
+    frame = weatherly.export.to_pandas(current)
+    assert list(frame["temp_c"]) == [1.0, 2.0]
+    assert list(frame["location_name"]) == ["London", "London"]
+    assert frame["last_updated_epoch"].dtype.kind == "i"
+
+
+def test_mixed_models_are_rejected():
+    models = [
+        weatherly.CurrentWeatherData(make_current(), 200, None),
+        weatherly.ForecastData(make_forecast(days=1), 200, None),
+    ]
+    with pytest.raises(TypeError):
+        weatherly.export._columns(models)
@@ -0,0 +1,259 @@
+import json
+import math
+import pickle
+import timeit
+from array import array
+
+import pytest
+import weatherly
+
+from conftest import LOCATION, make_current, make_forecast
+
+
+def test_conditions_are_shared(forecast_raw):
+    forecast = weatherly.ForecastData(forecast_raw, 200, None)
+    hours = list(forecast.iter_hours())
+
+    assert hours[0].condition is hours[3].condition
+    assert hours[0].condition_text is hours[3].condition_text
+    assert hours[0].condition == weatherly.Condition(
+        "Sunny", "//cdn.weatherapi.com/weather/64x64/day/113.png", 1000
+    )
+    assert hours[0].wind_dir is hours[16].wind_dir
+
+
+def test_locations_are_shared():
+    first = weatherly.CurrentWeatherData(make_current(), 200, None)
+    second = weatherly.ForecastData(make_forecast(days=1), 200, None)
+
+    assert first.location is second.location
+    assert first.location.name == "London"
+
+    # local time changes with every response, the location stays the same
+    later = weatherly.CurrentWeatherData(make_current({**LOCATION, "localtime_epoch": 1687341660, "localtime": "2023-06-21 11:01"}), 200, None)
+    assert later.location is first.location
+    assert first.location.frozen and not first.frozen
+    with pytest.raises(weatherly.FrozenModelError):
+        first.location.name = "Paris"
+
+
+def test_intern_table_is_bounded():
+    table = weatherly.InternTable(maxsize=2)
+    for value in ("a", "b", "c"):
+        table.intern(value)
+
+    assert len(table) == 2
+    assert "a" not in table
+    assert table.intern("c") == "c"
+    assert table.hits == 1
+
+
+@pytest.mark.parametrize(
+    ('offset', 'expected_hour'),
+    [
+        (0, 0),
+        (1799, 0),
+        (3600 * 5 + 10, 5),
+        (3600 * 71 + 3599, 71),
+        (-1, None),
+        (3600 * 72, None),
+    ]
+)
+def test_hour_index_at(forecast_raw, offset, expected_hour):
+    forecast = weatherly.ForecastData(forecast_raw, 200, None)
+    hours = list(forecast.iter_hours())
+    start = hours[0].time_epoch
+
+    found = forecast.at(start + offset)
+    assert found is (hours[expected_hour] if expected_hour is not None else None)
+
+
+def test_hour_index_lookups(marine_raw):
+    marine = weatherly.MarineData(marine_raw, 200, None)
+    hours = list(marine.iter_hours())
+    start = hours[0].time_epoch
+
+    assert marine.nearest(start + 1900) is hours[1]
+    assert marine.nearest(start - 10**6) is hours[0]
+    assert marine.between(start + 3600, start + 4 * 3600) == hours[1:4]
+    assert marine.hour_of_day(12) == [hours[12], hours[36], hours[60]]
+
+
+def test_columns_aggregations(forecast_raw):
+    columns = weatherly.ForecastData(forecast_raw, 200, None).columns
+
+    assert len(columns) == 72
+    assert columns.min("temp_c") == 10.0
+    assert columns.max("temp_c") == 33.0
+    assert columns.mean("temp_c") == pytest.approx(21.5)
+    assert columns.percentile("temp_c", 50) == pytest.approx(21.5)
+    assert list(columns.rolling("temp_c", 3, "max")[:3]) == [12.0, 13.0, 14.0]
+    assert list(columns.rolling("temp_c", 2, "mean")[:2]) == [10.5, 11.5]
+
+    # a large value leaving the window does not leave rounding errors in later windows
+    values = array("d", [1e8] + [0.1] * 10)
+    sums = weatherly.HourlyColumns(array("q"), array("q"), {"precip_mm": values}).rolling("precip_mm", 2, "sum")
+    assert len(sums) == 10
+    assert sums[0] == 1e8 + 0.1
+    assert all(abs(value - 0.2) < 1e-12 for value in sums[1:])
+    values = array("d", [0.1, 1e8, -1e8] * 50 + [0.1] * 200)
+    sums = weatherly.HourlyColumns(array("q"), array("q"), {"precip_mm": values}).rolling("precip_mm", 3, "sum")
+    assert all(abs(value - math.fsum(values[i:i + 3])) < 1e-12 for i, value in enumerate(sums))
+
+
+def test_columns_resample(forecast_raw):
+    columns = weatherly.ForecastData(forecast_raw, 200, None).columns
+
+    starts, values = columns.resample("temp_c", "6h", "max")
+    assert len(starts) == 12
+    assert list(values[:4]) == [15.0, 21.0, 27.0, 33.0]
+
+    starts, values = columns.resample("wind_degree", "daily", "circular_mean")
+    assert len(starts) == 3
+
+
+@pytest.mark.parametrize(
+    ('angles', 'expected'),
+    [
+        ([350.0, 10.0], 0.0),
+        ([90.0, 180.0], 135.0),
+        ([270.0], 270.0),
+    ]
+)
+def test_circular_mean(angles, expected):
+    columns = weatherly.HourlyColumns(array("q"), array("q"), {"wind_degree": array("d", angles)})
+    result = columns.circular_mean()
+    assert min(abs(result - expected), 360 - abs(result - expected)) == pytest.approx(0, abs=1e-9)
+
+
+def test_columns_concat(forecast_raw):
+    forecast = weatherly.ForecastData(forecast_raw, 200, None)
+    merged = weatherly.HourlyColumns.concat([forecast.columns, forecast.columns])
+
+    assert len(merged) == 144
+    _, values = merged.resample("temp_c", "daily", "mean")
+    assert list(values) == [21.5, 21.5, 21.5]
+
+
+def test_bulk_response_stack():
+    hot = dict(LOCATION, name="Madrid")
+    data = [
+        ("london", weatherly.CurrentWeatherData(make_current(temp_c=18.0), 200, None)),
+        ("madrid", weatherly.CurrentWeatherData(make_current(hot, temp_c=31.0), 200, None)),
+        ("oslo", weatherly.CurrentWeatherData(make_current(temp_c=9.0), 200, None)),
+    ]
+    bulk = weatherly.BulkResponse({}, 200, None, weatherly.WeatherEndpoints.CURRENT_WEATHER, data)
+
+    assert bulk["madrid"].location.name == "Madrid"
+    assert "paris" not in bulk and bulk.get("paris") is None
+
+    frame = bulk.stack(["temp_c", "humidity"])
+    assert frame.shape == (3, 1, 2)
+    assert list(frame.column("temp_c")) == [18.0, 31.0, 9.0]
+    assert [custom_id for custom_id, _ in frame.rank("temp_c")] == ["madrid", "london", "oslo"]
+
+
+def test_bulk_forecast_stack():
+    data = [
+        ("long", weatherly.ForecastData(make_forecast(days=2), 200, None)),
+        ("short", weatherly.ForecastData(make_forecast(days=1), 200, None)),
+    ]
+    frame = weatherly.BulkResponse({}, 200, None, weatherly.WeatherEndpoints.FORECAST, data).stack()
+
+    assert frame.shape[:2] == (2, 48)
+    assert list(frame.series("short", "temp_c")[22:26])[:2] == [32.0, 33.0]
+    assert frame.column("temp_c", 30)[1] != frame.column("temp_c", 30)[1] # padded with NaN
+    assert [custom_id for custom_id, _ in frame.rank("temp_c", hour=30, descending=False)] == ["long", "short"]
+
+
+def test_serialization_roundtrip(forecast_raw):
+    forecast = weatherly.ForecastData(forecast_raw, 200, None)
+
+    data = weatherly.dumps(forecast)
+    loaded = weatherly.loads(data)
+    assert isinstance(loaded, weatherly.ForecastData)
+    assert loaded.raw == forecast_raw
+    assert loaded.status == 200
+    assert [hour.temp_c for hour in loaded.iter_hours()] == [hour.temp_c for hour in forecast.iter_hours()]
+    assert loaded.forecast_days[0].raw is loaded.raw["forecast"]["forecastday"][0]
+    assert loaded.location is weatherly.LocationData.shared(forecast_raw["location"], 200, None)
+
+    frozen = weatherly.loads(weatherly.dumps(weatherly.ForecastData(forecast_raw, 200, None).freeze()))
+    assert frozen.frozen and frozen == weatherly.ForecastData(forecast_raw, 200, None).freeze()
+    assert pickle.loads(pickle.dumps(forecast, protocol=5)).raw == forecast_raw
+
+
+@pytest.mark.parametrize(
+    'model, raw',
+    [
+        (weatherly.ForecastData, make_forecast(days=7)),
+        (weatherly.CurrentWeatherData, make_current()),
+    ]
+)
+def test_serialization_benchmark(model, raw):
+    # a response as sent by the API and decoded from JSON, where equal strings are separate objects
+    text = json.dumps(raw, separators=(",", ":"))
+    raw = json.loads(text)
+    data = weatherly.dumps(model(raw, 200, None))
+    if model is weatherly.ForecastData:
+        assert len(data) < len(text.encode()) * 0.6
+        assert len(data) < len(pickle.dumps(raw, protocol=5))
+
+    # both are timed in turns, so a slowdown of the machine affects them alike
+    number = 20 if model is weatherly.ForecastData else 500
+    loads, parse = timeit.Timer(lambda: weatherly.loads(data)), timeit.Timer(lambda: model(json.loads(text), 200, None))
+    times = [(loads.timeit(number), parse.timeit(number)) for _ in range(15)]
+    assert min(time for time, _ in times) < min(time for _, time in times)
+
+
+@pytest.mark.parametrize(
+    'data',
+    [b"", b"JSON{}", b"WTLY\x63payload"]
+)
+def test_serialization_rejects_invalid_data(data):
+    with pytest.raises(weatherly.SerializationError):
+        weatherly.loads(data)
+
+
+def test_frozen_models(forecast_raw):
+    forecast = weatherly.ForecastData(forecast_raw, 200, None).freeze()
+
+    assert forecast.frozen and forecast.forecast_days[0].frozen
+    assert isinstance(forecast.forecast_days, tuple)
+    assert isinstance(forecast.forecast_days[0].hour_data, tuple)
+    assert forecast.forecast_days[0].raw is forecast.raw["forecast"]["forecastday"][0]
+
+    with pytest.raises(weatherly.FrozenModelError):
+        forecast.alerts = []
+    with pytest.raises(AttributeError):
+        del forecast.forecast_days[0].hour_data[0].temp_c
+    with pytest.raises(TypeError):
+        forecast.raw["location"]["name"] = "Paris"
+
+    other = weatherly.ForecastData(make_forecast(), 200, None).freeze()
+    assert other == forecast and hash(other) == hash(forecast)
+    assert len({forecast, other}) == 1
+    assert weatherly.ForecastData(make_forecast(), 200, None) != forecast
+
+    loaded = pickle.loads(pickle.dumps(forecast))
+    assert loaded.frozen and loaded == forecast
+
+    # unfrozen models assign attributes without a guard, frozen ones keep their class name and isinstance checks
+    assert type(weatherly.ForecastData(make_forecast(), 200, None)).__setattr__ is object.__setattr__
+    assert isinstance(forecast, weatherly.ForecastData) and type(forecast).__name__ == "ForecastData"
+
+
+def test_live_local_time(monkeypatch):
+    location = weatherly.LocationData(dict(LOCATION), 200, None).freeze()
+    monkeypatch.setattr("time.time", lambda: 1703160300.5) # 2023-12-21 12:05 UTC
+    assert location.localtime_epoch == 1703160300
+    assert location.localtime_formatted == "2023-12-21 12:05"
+    monkeypatch.setattr("time.time", lambda: 1687338300) # 2023-06-21 09:05 UTC, 10:05 BST
+    assert location.localtime_formatted == "2023-06-21 10:05"
+    assert pickle.loads(pickle.dumps(location)).localtime_formatted == "2023-06-21 10:05"
+    with pytest.raises(weatherly.FrozenModelError):
+        location.localtime_epoch = 0
+
+    # unknown time zones report the time of the response
+    unknown = weatherly.LocationData({**LOCATION, "tz_id": "Not/AZone"}, 200, None)
+    assert (unknown.localtime_epoch, unknown.localtime_formatted) == (1687341600, "2023-06-21 11:00")
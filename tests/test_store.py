@@ -0,0 +1,166 @@
+import json
+import math
+from array import array
+
+import pytest
+import weatherly
+
+from conftest import DAY_EPOCH, make_current, make_forecast
+from test_client import FakeResponse
+
+
+def test_store_append_and_read(forecast_raw, tmp_path):
+    store = weatherly.TimeSeriesStore(str(tmp_path / "store"))
+    forecast = weatherly.ForecastData(forecast_raw, 200, None)
+
+    assert store.append_history("London", forecast) == 72
+    assert store.append_history("London", forecast) == 0 # already stored
+    assert store.locations() == ["London"]
+
+    columns = store.read("London")
+    assert len(columns) == 72
+    assert list(columns.epochs) == [hour.time_epoch for hour in forecast.iter_hours()]
+    assert list(columns["temp_c"]) == [hour.temp_c for hour in forecast.iter_hours()]
+    assert list(columns["precip_mm"]) == pytest.approx([hour.precip_mm for hour in forecast.iter_hours()])
+    assert list(columns.local_epochs) == list(forecast.columns.local_epochs)
+
+    window = store.read("London", ["temp_c"], start=DAY_EPOCH + 3600, end=DAY_EPOCH + 4 * 3600)
+    assert list(window.epochs) == [DAY_EPOCH + 3600, DAY_EPOCH + 7200, DAY_EPOCH + 10800]
+    assert list(window.columns) == ["temp_c"]
+
+    # a fresh store reads the same data from disk
+    assert len(weatherly.TimeSeriesStore(str(tmp_path / "store")).read("London")) == 72
+
+
+def test_store_segments_and_missing_values(tmp_path):
+    store = weatherly.TimeSeriesStore(str(tmp_path))
+
+    def columns(epochs, temps):
+        return weatherly.HourlyColumns(array("q", epochs), array("q", epochs), {"temp_c": array("d", temps)})
+
+    assert store.append("Paris", columns([7200, 10800], [1.5, float("nan")])) == 2
+    assert store.append("Paris", columns([0, 3600, 7200], [0.5, 1.0, 9.0])) == 2 # older data starts a new segment
+
+    current = weatherly.CurrentWeatherData(make_current(last_updated_epoch=14400), 200, None)
+    assert store.append_current("Paris", current) == 1
+    assert store.append_current("Paris", current) == 0
+
+    result = store.read("Paris")
+    assert list(result.epochs) == [0, 3600, 7200, 10800, 14400]
+    assert list(result["temp_c"])[:3] == [0.5, 1.0, 1.5]
+    assert math.isnan(result["temp_c"][3])
+    assert result["temp_c"][4] == 18.0
+    # humidity was first stored in the last row, earlier rows are missing
+    assert math.isnan(result["humidity"][2]) and result["humidity"][4] == 63
+
+
+def test_store_sync(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_request(self, path, data=None, **kwargs):
+        calls.append(kwargs["dt"])
+        raw = make_forecast(days=1)
+        offset = (int(kwargs["dt"][-2:]) - 1) * 86400
+        for hour in raw["forecast"]["forecastday"][0]["hour"]:
+            hour["time_epoch"] += offset
+        return raw, FakeResponse()
+
+    monkeypatch.setattr(weatherly.Client, "_request", fake_request)
+    client = weatherly.Client("key")
+    store = weatherly.TimeSeriesStore(str(tmp_path))
+
+    assert store.sync(client, "London", "2023-01-02", "2023-01-03") == 2
+    assert store.sync(client, "London", "2023-01-01", "2023-01-04") == 2 # only missing days are fetched
+    assert sorted(calls) == ["2023-01-01", "2023-01-02", "2023-01-03", "2023-01-04"]
+    assert len(store.synced_days("London")) == 4
+
+    epochs = list(store.read("London").epochs)
+    assert len(epochs) == 96 and epochs == sorted(epochs)
+
+    # days filling a gap inside a stored segment are stored too
+    calls.clear()
+    assert store.sync(client, "London", "2023-01-08", "2023-01-09") == 2
+    assert store.sync(client, "London", "2023-01-06", "2023-01-09") == 2
+    assert store.sync(client, "London", "2023-01-01", "2023-01-09") == 1
+    assert sorted(calls) == ["2023-01-05", "2023-01-06", "2023-01-07", "2023-01-08", "2023-01-09"]
+    assert store.sync(client, "London", "2023-01-01", "2023-01-09") == 0
+    epochs = list(store.read("London").epochs)
+    assert len(epochs) == 9 * 24 and epochs == sorted(epochs) and len(set(epochs)) == len(epochs)
+    assert store.read("London", start=DAY_EPOCH + 5 * 86400, end=DAY_EPOCH + 6 * 86400).epochs[0] == DAY_EPOCH + 5 * 86400
+
+    # days fetched before an interrupted sync are kept
+    fetch = client.get_historical_range
+
+    def interrupted(*args, **kwargs):
+        for i, item in enumerate(fetch(*args, **kwargs)):
+            if i == 2:
+                raise RuntimeError("interrupted")
+            yield item
+
+    monkeypatch.setattr(client, "get_historical_range", interrupted)
+    with pytest.raises(RuntimeError):
+        store.sync(client, "London", "2023-01-10", "2023-01-14")
+    assert len(store.synced_days("London")) == 11 and len(store.read("London").epochs) == 11 * 24
+    monkeypatch.setattr(client, "get_historical_range", fetch)
+    assert store.sync(client, "London", "2023-01-10", "2023-01-14") == 3
+
+
+def test_snapshot_archive(tmp_path):
+    archive = weatherly.SnapshotArchive(str(tmp_path), keyframe_interval=3)
+    snapshots = []
+    for i in range(5):
+        raw = make_forecast(days=2)
+        raw["current"]["last_updated_epoch"] += i * 3600
+        raw["forecast"]["forecastday"][0]["hour"][12]["temp_c"] = 20.0 + i
+        if i == 4:
+            del raw["forecast"]["forecastday"][1] # the forecast moved on
+        snapshots.append(raw)
+        assert archive.add("London", weatherly.ForecastData(raw, 200, None))
+    assert not archive.add("London", weatherly.ForecastData(snapshots[-1], 200, None))
+    with pytest.raises(ValueError):
+        archive.add("London", weatherly.ForecastData(snapshots[0], 200, None))
+
+    # deltas only store changed values
+    lines = (tmp_path / "London.jsonl").read_text().splitlines()
+    assert len(lines) == 5
+    assert json.loads(lines[1])["set"] == {
+        "current.last_updated_epoch": snapshots[1]["current"]["last_updated_epoch"],
+        f"hour:{DAY_EPOCH}:{DAY_EPOCH + 12 * 3600}.temp_c": 21.0,
+    }
+
+    reopened = weatherly.SnapshotArchive(str(tmp_path))
+    issues = reopened.issues("London")
+    for issued, raw in zip(issues, snapshots):
+        assert reopened.snapshot("London", issued).raw == raw
+    assert [forecast.raw for _, forecast in reopened.iter_snapshots("London")] == snapshots
+
+    assert reopened.hour_series("London", DAY_EPOCH + 12 * 3600, "temp_c") == list(zip(issues, [20.0, 21.0, 22.0, 23.0, 24.0]))
+    assert len(reopened.hour_series("London", DAY_EPOCH + 30 * 3600, "condition.code")) == 4
+    assert len(reopened.day_series("London", DAY_EPOCH, "day.maxtemp_c")) == 5
+
+
+def test_forecast_verifier(tmp_path):
+    archive = weatherly.SnapshotArchive(str(tmp_path / "archive"))
+    store = weatherly.TimeSeriesStore(str(tmp_path / "store"))
+    issued = DAY_EPOCH + 6 * 3600
+    for i in range(2):
+        raw = make_forecast(days=1)
+        for hour in raw["forecast"]["forecastday"][0]["hour"]:
+            hour["temp_c"] += 1 + i # forecasts are too warm
+        archive.add("London", weatherly.ForecastData(raw, 200, None), issued=issued + i * 3600)
+    store.append_history("London", weatherly.ForecastData(make_forecast(days=1), 200, None))
+
+    verifier = weatherly.ForecastVerifier(["temp_c", "humidity"])
+    assert verifier.add_archive(archive, store, "London") == 18 + 17
+
+    metrics = verifier.metrics("temp_c")
+    assert len(metrics.lead_times) == 18
+    assert list(metrics.count) == [2] * 17 + [1]
+    assert metrics.bias[0] == pytest.approx(1.5)
+    assert metrics.mae[17] == pytest.approx(1.0)
+    assert metrics.rmse[0] == pytest.approx(math.sqrt(2.5))
+    assert verifier.summary("humidity")[1:] == (0.0, 0.0, 0.0)
+
+    other = weatherly.ForecastVerifier(["temp_c"])
+    other.merge(verifier)
+    assert other.summary("temp_c") == verifier.summary("temp_c")
@@ -19,8 +19,11 @@ from .api import *
 from .errors import *
 from .enums import *
 from .models import *
+from .store import *
 from . import (
     utils as utils,
+    export as export,
+    astronomy as astronomy,
 )
 
 
@@ -28,3 +28,16 @@ SOFTWARE.
 """
 
 from .client import *
+from .autocomplete import *
+from .events import *
+from .geoindex import *
+from .ipcache import *
+from .results import *
+from .backfill import *
+from .cache import *
+from .canonical import *
+from .ratelimit import *
+from .scheduler import *
+from .sharding import *
+from .subscriptions import *
+from .translation import *
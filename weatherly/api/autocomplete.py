@@ -0,0 +1,200 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+__all__ = (
+    "AutocompleteCache",
+)
+
+def normalize(prefix: str) -> str:
+    """Normalize case and whitespace of a search prefix"""
+    return " ".join(prefix.lower().split())
+
+def _size(results: List[Mapping[str, Any]]) -> int:
+    return sys.getsizeof(results) + sum(
+        sys.getsizeof(raw) + sum(sys.getsizeof(value) for value in raw.values()) for raw in results
+    )
+
+def _matches(raw: Mapping[str, Any], prefix: str) -> bool:
+    # a location matches when its name, or any word of its name, region or country starts with the prefix
+    text = f"{raw.get('name', '')}, {raw.get('region', '')}, {raw.get('country', '')}".lower()
+    if text.startswith(prefix):
+        return True
+    return any(part.startswith(prefix) for part in text.replace(",", " ").split())
+
+class _Node():
+    __slots__ = ("children", "entry")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Node"] = {}
+        self.entry: Optional[Tuple[float, List[Mapping[str, Any]], bool]] = None # expires, results, complete
+
+class AutocompleteCache():
+    """A prefix tree of search results, answering :meth:`Client.get_locations` calls of a search box locally.
+
+    Results of every searched prefix are cached. When results of a shorter prefix are complete (the API returned
+    fewer than ``max_results`` locations), a longer prefix is answered by filtering them, without calling the API.
+    Least recently used prefixes are evicted when the cached results take more than ``max_bytes``.
+
+    .. container:: operations
+
+        .. describe:: len(x)
+
+            Number of cached prefixes
+
+    Parameters
+    ------------
+    max_bytes: :class:`int`
+        Approximate memory limit of cached results in bytes. Defaults to 16 MiB
+    ttl: :class:`float`
+        Number of seconds results are cached for. Defaults to one day
+    max_results: :class:`int`
+        Number of results the API returns at most. Results with fewer locations are complete. Defaults to ``10``
+    clock: Callable[[], :class:`float`]
+        Function returning the current time in seconds. Defaults to :func:`time.monotonic`
+
+    Attributes
+    ------------
+    max_bytes: :class:`int`
+        Approximate memory limit of cached results in bytes
+    ttl: :class:`float`
+        Number of seconds results are cached for
+    max_results: :class:`int`
+        Number of results the API returns at most
+    size: :class:`int`
+        Approximate memory used by cached results in bytes
+    hits: :class:`int`
+        Number of searches answered with cached results of the same prefix
+    filtered_hits: :class:`int`
+        Number of searches answered by filtering results of a shorter prefix
+    """
+    def __init__(
+        self,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl: float = 86400,
+        max_results: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_bytes: int = max_bytes
+        self.ttl: float = ttl
+        self.max_results: int = max_results
+        self.clock = clock
+        self.size: int = 0
+        self.hits: int = 0
+        self.filtered_hits: int = 0
+        self._root = _Node()
+        self._lru: "OrderedDict[str, int]" = OrderedDict() # prefix -> size of its results
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def _path(self, prefix: str) -> List[_Node]:
+        nodes = [self._root]
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char) # type: ignore
+            if node is None:
+                break
+            nodes.append(node)
+        return nodes
+
+    def get(self, query: str) -> Optional[List[Mapping[str, Any]]]:
+        """Get cached results of a search
+
+        Returns
+        ---------
+        Optional[List[Mapping[:class:`str`, Any]]]
+            Raw locations, ``None`` if the search has to be sent to the API
+        """
+        prefix = normalize(query)
+        now = self.clock()
+        with self._lock:
+            nodes = self._path(prefix)
+            # the deepest node is the prefix itself, if it was searched before
+            for depth in range(len(nodes) - 1, -1, -1):
+                entry = nodes[depth].entry
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    self._remove(prefix[:depth])
+                    continue
+                cached = prefix[:depth]
+                if depth == len(prefix):
+                    self._lru.move_to_end(cached)
+                    self.hits += 1
+                    return entry[1]
+                if entry[2]:
+                    self._lru.move_to_end(cached)
+                    self.filtered_hits += 1
+                    return [raw for raw in entry[1] if _matches(raw, prefix)]
+        return None
+
+    def put(self, query: str, results: List[Mapping[str, Any]]) -> None:
+        """Cache results of a search"""
+        prefix = normalize(query)
+        size = _size(results)
+        with self._lock:
+            self._remove(prefix)
+            node = self._root
+            for char in prefix:
+                node = node.children.setdefault(char, _Node())
+            node.entry = (self.clock() + self.ttl, list(results), len(results) < self.max_results)
+            self._lru[prefix] = size
+            self.size += size
+            while self.size > self.max_bytes and len(self._lru) > 1:
+                self._remove(next(iter(self._lru)))
+
+    def _remove(self, prefix: str) -> None:
+        size = self._lru.pop(prefix, None)
+        if size is None:
+            return
+        self.size -= size
+        nodes = self._path(prefix)
+        nodes[-1].entry = None
+        # prune branches without cached results
+        for depth in range(len(prefix), 0, -1):
+            node = nodes[depth]
+            if node.entry is not None or node.children:
+                break
+            del nodes[depth - 1].children[prefix[depth - 1]]
+
+    def clear(self) -> None:
+        """Remove all cached results"""
+        with self._lock:
+            self._root = _Node()
+            self._lru.clear()
+            self.size = 0
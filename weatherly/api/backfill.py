@@ -0,0 +1,208 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import datetime
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from ..errors import InvalidDate
+from ..models import ForecastData
+from .ratelimit import RateLimiter
+from .results import unwrap_or_none
+
+if TYPE_CHECKING:
+    from .client import Client
+
+__all__ = (
+    "Checkpoint",
+)
+
+DateLike = Union[str, datetime.date]
+
+def parse_date(value: DateLike) -> datetime.date:
+    """Convert a ``yyyy-mm-dd`` string (or a date) into a :class:`datetime.date`"""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError) as exc:
+        raise InvalidDate(f"Failed to convert date {value}: Invalid format") from exc
+
+def plan_days(queries: Iterable[str], start: DateLike, end: DateLike) -> List[Tuple[str, str]]:
+    """Plan one call per query and day, from ``start`` to ``end`` (both inclusive).
+
+    Returns
+    ---------
+    List[Tuple[:class:`str`, :class:`str`]]
+        Pairs of (query, date), ordered by date and then by query
+    """
+    first, last = parse_date(start), parse_date(end)
+    if first > last:
+        raise InvalidDate(f"Start date {first} is after end date {last}")
+    queries = list(queries)
+    days = (last - first).days + 1
+    return [
+        (query, (first + datetime.timedelta(days=offset)).isoformat())
+        for offset in range(days)
+        for query in queries
+    ]
+
+def cache_key(query: str, date: str) -> str:
+    """Key of a single day in backfill caches and checkpoints"""
+    return f"{query}|{date}"
+
+class Checkpoint():
+    """An append-only file recording which days of a backfill were already processed.
+
+    Every processed day is written (and flushed) as a single line, so an interrupted backfill
+    can be resumed by passing the same file again.
+
+    Parameters
+    ------------
+    path: :class:`str`
+        Path of the checkpoint file. It is created if it does not exist
+
+    Attributes
+    ------------
+    path: :class:`str`
+        Path of the checkpoint file
+    """
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._done: Set[str] = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self._done.update(line.rstrip("\n") for line in file if line.strip())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._done
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def add(self, key: str) -> None:
+        """Mark a day as processed"""
+        with self._lock:
+            if key in self._done:
+                return
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(key + "\n")
+            self._done.add(key)
+
+def historical_range(
+    client: "Client",
+    queries: Union[str, Iterable[str]],
+    start: DateLike,
+    end: DateLike,
+    *,
+    max_workers: int = 4,
+    rate_limit: Optional[Union[float, RateLimiter]] = None,
+    cache: Optional[MutableMapping[str, ForecastData]] = None,
+    checkpoint: Optional[Union[str, Checkpoint]] = None,
+    complete: bool = False,
+    **kwargs: Any
+) -> Iterator[Tuple[str, str, ForecastData]]:
+    """Implementation of :meth:`Client.get_historical_range` returning a generator.
+
+    With ``complete``, days recorded in the checkpoint are not skipped: they are taken from the cache,
+    or fetched again when they are not cached.
+    """
+    if isinstance(queries, str):
+        queries = [queries]
+    if isinstance(checkpoint, str):
+        checkpoint = Checkpoint(checkpoint)
+    limiter = RateLimiter(rate_limit) if isinstance(rate_limit, (int, float)) else rate_limit
+    # plan before returning the generator, so invalid dates are reported right away
+    plan = plan_days(queries, start, end)
+    return _run(client, plan, max_workers, limiter, cache, checkpoint, complete, kwargs)
+
+def _run(
+    client: "Client",
+    plan: List[Tuple[str, str]],
+    max_workers: int,
+    limiter: Optional[RateLimiter],
+    cache: Optional[MutableMapping[str, ForecastData]],
+    checkpoint: Optional[Checkpoint],
+    complete: bool,
+    kwargs: Dict[str, Any],
+) -> Iterator[Tuple[str, str, ForecastData]]:
+
+    def fetch(query: str, date: str) -> Optional[ForecastData]:
+        if limiter is not None:
+            limiter.acquire()
+        return unwrap_or_none(client.get_historical_data(query, date, **kwargs))
+
+    def done(key: str) -> None:
+        if checkpoint is not None:
+            checkpoint.add(key)
+
+    pending = iter(plan)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    in_flight: Dict[Future, Tuple[str, str]] = {}
+    try:
+        while True:
+            # keep a bounded number of calls in flight instead of scheduling the whole plan at once
+            for query, date in pending:
+                key = cache_key(query, date)
+                if checkpoint is not None and not complete and key in checkpoint:
+                    continue
+                if cache is not None and key in cache:
+                    yield query, date, cache[key]
+                    done(key)
+                    continue
+                in_flight[executor.submit(fetch, query, date)] = (query, date)
+                if len(in_flight) >= max_workers * 2:
+                    break
+            if not in_flight:
+                return
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                query, date = in_flight.pop(future)
+                result = future.result()
+                if result is None: # the error was already handled by the client, retry it when resumed
+                    continue
+                key = cache_key(query, date)
+                if cache is not None:
+                    cache[key] = result
+                yield query, date, result
+                done(key)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
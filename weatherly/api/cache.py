@@ -0,0 +1,497 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Mapping,
+    Tuple,
+    Type,
+)
+
+from ..errors import WeatherAPIException
+from .canonical import QueryCanonicalizer
+from .geoindex import GeoIndex
+
+__all__ = (
+    "NegativeCache",
+    "ResponseCache",
+)
+
+# error codes that are always returned for the same request:
+# 1003 - parameter "q" not provided, 1005 - invalid request URL, 1006 - no location found,
+# 9000 - invalid JSON body of a bulk request, 9001 - too many locations in a bulk request
+DETERMINISTIC_CODES: Tuple[int, ...] = (1003, 1005, 1006, 9000, 9001)
+
+def request_key(endpoint: str, options: Dict[str, Any]) -> Hashable:
+    """Make a hashable key of a request, ignoring the API key"""
+    return (endpoint, tuple(sorted((k, str(v)) for k, v in options.items() if k != "key")))
+
+class NegativeCache():
+    """Remembers requests that failed with a deterministic error, so they fail again without calling the API.
+
+    The cached exception class is raised again (with the same status, code and message) until the entry expires.
+
+    .. container:: operations
+
+        .. describe:: len(x)
+
+            Number of cached errors, including expired ones that were not evicted yet
+
+    Parameters
+    ------------
+    ttl: :class:`float`
+        Number of seconds an error is cached for. Defaults to ``60``
+    maxsize: :class:`int`
+        Maximum number of cached errors, the oldest ones are evicted first. Defaults to ``10000``
+    codes: Iterable[:class:`int`]
+        Cached error codes. Defaults to errors that depend only on the request, e.g. ``1006`` (no location found)
+    clock: Callable[[], :class:`float`]
+        Function returning the current time in seconds. Defaults to :func:`time.monotonic`
+
+    Attributes
+    ------------
+    ttl: :class:`float`
+        Number of seconds an error is cached for
+    maxsize: :class:`int`
+        Maximum number of cached errors
+    codes: FrozenSet[:class:`int`]
+        Cached error codes
+    hits: :class:`int`
+        Number of requests answered from the cache
+    """
+    def __init__(
+        self,
+        ttl: float = 60,
+        maxsize: int = 10000,
+        codes: Iterable[int] = DETERMINISTIC_CODES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl: float = ttl
+        self.maxsize: int = maxsize
+        self.codes = frozenset(codes)
+        self.clock = clock
+        self.hits: int = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Type[WeatherAPIException], int, int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: Hashable, exc: WeatherAPIException) -> bool:
+        """Cache an error of a request, if its code is deterministic
+
+        Returns
+        ---------
+        :class:`bool`
+            ``True`` if the error was cached
+        """
+        if exc.code not in self.codes:
+            return False
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self.clock() + self.ttl, type(exc), exc.status, exc.code, exc.message)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return True
+
+    def get(self, key: Hashable) -> Optional[WeatherAPIException]:
+        """Get a new exception for a cached error of a request, ``None`` if there is no valid entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, cls, status, code, message = entry
+            if expires <= self.clock():
+                del self._entries[key]
+                return None
+            self.hits += 1
+        return cls(status, code, message)
+
+    def check(self, key: Hashable) -> None:
+        """Raise the cached error of a request, if there is one"""
+        exc = self.get(key)
+        if exc is not None:
+            raise exc
+
+    def clear(self) -> None:
+        """Remove all cached errors"""
+        with self._lock:
+            self._entries.clear()
+
+# endpoints whose responses can be sliced to answer narrower requests, with options selecting the shape of a response
+SUBSUMABLE_ENDPOINTS: Dict[str, Tuple[str, ...]] = {
+    "forecast.json": ("days", "hour", "aqi", "alerts"),
+    "history.json": ("hour", "aqi", "alerts"),
+    "marine.json": ("days", "hour", "tides"),
+}
+SHAPE_OPTIONS: Tuple[str, ...] = ("days", "hour", "aqi", "alerts", "tides")
+# missed requests are widened only to shapes making up at least UPGRADE_THRESHOLD of the last UPGRADE_WINDOW requests of an endpoint
+UPGRADE_WINDOW: int = 64
+UPGRADE_THRESHOLD: float = 0.25
+
+class Shape(NamedTuple):
+    """Parts of a forecast, history or marine request that only select how much of the response is returned"""
+    days: int
+    hour: Optional[int]
+    aqi: bool
+    alerts: bool
+    tides: bool
+
+    @classmethod
+    def of(cls, options: Mapping[str, Any]) -> "Shape":
+        hour = options.get("hour")
+        return cls(
+            int(options.get("days", 1)),
+            int(hour) if hour is not None else None,
+            *(str(options.get(name, "no")).lower() == "yes" for name in ("aqi", "alerts", "tides"))
+        )
+
+    def covers(self, other: "Shape") -> bool:
+        """Whether a response of this shape contains everything of a response of the other shape"""
+        return (
+            self.days >= other.days
+            and (self.hour is None or self.hour == other.hour)
+            and self.aqi >= other.aqi and self.alerts >= other.alerts and self.tides >= other.tides
+        )
+
+    def union(self, other: "Shape") -> "Shape":
+        """The narrowest shape covering both shapes"""
+        return Shape(
+            max(self.days, other.days),
+            self.hour if self.hour == other.hour else None,
+            self.aqi or other.aqi, self.alerts or other.alerts, self.tides or other.tides,
+        )
+
+    def options(self, endpoint: str) -> Dict[str, Any]:
+        """Request options selecting this shape"""
+        values = {
+            "days": self.days,
+            "hour": self.hour,
+            "aqi": "yes" if self.aqi else "no",
+            "alerts": "yes" if self.alerts else "no",
+            "tides": "yes" if self.tides else "no",
+        }
+        return {name: values[name] for name in SUBSUMABLE_ENDPOINTS[endpoint] if values[name] is not None}
+
+def _strip_aqi(raw: Dict[str, Any]) -> Dict[str, Any]:
+    if "air_quality" not in raw:
+        return raw
+    raw = dict(raw)
+    del raw["air_quality"]
+    return raw
+
+def narrow(data: Dict[str, Any], have: Shape, want: Shape) -> Dict[str, Any]:
+    """Slice raw data of a forecast, history or marine response of shape ``have`` to shape ``want``.
+
+    Only containers on the path to removed parts are copied, everything else is shared with ``data``.
+    """
+    data = dict(data)
+    if have.alerts and not want.alerts:
+        data.pop("alerts", None)
+    strip_aqi = have.aqi and not want.aqi
+    if strip_aqi and isinstance(data.get("current"), Mapping):
+        data["current"] = _strip_aqi(data["current"])
+    forecast = data.get("forecast")
+    if not isinstance(forecast, Mapping):
+        return data
+    days = forecast.get("forecastday", [])[:want.days]
+    if strip_aqi or (have.tides and not want.tides) or want.hour != have.hour:
+        narrowed = []
+        for forecastday in days:
+            forecastday = dict(forecastday)
+            day = forecastday["day"]
+            if strip_aqi:
+                day = _strip_aqi(day)
+            if have.tides and not want.tides and "tides" in day:
+                day = {**day, "tides": []}
+            forecastday["day"] = day
+            hours = forecastday.get("hour", [])
+            if want.hour != have.hour:
+                hours = [hour for hour in hours if int(hour["time"][11:13]) == want.hour]
+            if strip_aqi:
+                hours = [_strip_aqi(hour) for hour in hours]
+            forecastday["hour"] = hours
+            narrowed.append(forecastday)
+        days = narrowed
+    data["forecast"] = {**forecast, "forecastday": days}
+    return data
+
+class CachedResponse():
+    """Stands in for :class:`requests.Response` of a response served from a :class:`ResponseCache`"""
+    __slots__ = ("status_code", "url")
+    from_cache = True
+
+    def __init__(self, status_code: int, url: str) -> None:
+        self.status_code = status_code
+        self.url = url
+
+class ResponseCache():
+    """A cache of successful API responses, used by :class:`Client` before calling the API.
+
+    Raw response data is cached, and models are built from it on every hit. Cached data is shared between hits,
+    so it should not be modified (use ``Client(frozen=True)`` to make returned models immutable).
+
+    Queries are canonicalized first (see :class:`QueryCanonicalizer`), so equivalent queries share one entry.
+    Bulk requests are not cached.
+
+    Forecast, history and marine requests are also answered with a cached response of a wider request
+    of the same location, sliced to the requested shape: fewer ``days``, a single ``hour``,
+    or ``aqi``, ``alerts`` and ``tides`` disabled.
+
+    .. container:: operations
+
+        .. describe:: len(x)
+
+            Number of cached responses, including expired ones that were not evicted yet
+
+    Parameters
+    ------------
+    ttl: :class:`float`
+        Number of seconds a response is cached for. Defaults to ``300``
+    maxsize: :class:`int`
+        Maximum number of cached responses, the least recently used ones are evicted first. Defaults to ``1024``
+    canonicalizer: Optional[:class:`QueryCanonicalizer`]
+        Canonicalizer of queries, by default a new one with coordinates rounded to 2 decimal places
+    nearby: Optional[:class:`float`]
+        Answer ``lat,lon`` queries with a cached response of the nearest location within this many kilometers,
+        found with a :class:`GeoIndex`. Disabled by default
+    upgrade: :class:`bool`
+        Widen missed forecast, history and marine requests to the shapes frequently requested recently for the endpoint,
+        so later narrower requests are answered from the cache. Defaults to ``False``
+    clock: Callable[[], :class:`float`]
+        Function returning the current time in seconds. Defaults to :func:`time.monotonic`
+
+    Attributes
+    ------------
+    ttl: :class:`float`
+        Number of seconds a response is cached for
+    maxsize: :class:`int`
+        Maximum number of cached responses
+    canonicalizer: :class:`QueryCanonicalizer`
+        Canonicalizer of queries
+    nearby: Optional[:class:`float`]
+        Maximum distance of approximate hits in kilometers, ``None`` if disabled
+    upgrade: :class:`bool`
+        Whether missed requests are widened
+    hits: :class:`int`
+        Number of requests answered from the cache
+    approximate_hits: :class:`int`
+        Number of hits answered with a response of a nearby location (included in ``hits``)
+    subsumed_hits: :class:`int`
+        Number of hits answered by slicing a response of a wider request (included in ``hits``)
+    misses: :class:`int`
+        Number of requests not found in the cache
+    """
+    def __init__(
+        self,
+        ttl: float = 300,
+        maxsize: int = 1024,
+        canonicalizer: Optional[QueryCanonicalizer] = None,
+        nearby: Optional[float] = None,
+        upgrade: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl: float = ttl
+        self.maxsize: int = maxsize
+        self.canonicalizer: QueryCanonicalizer = canonicalizer or QueryCanonicalizer()
+        self.nearby: Optional[float] = nearby
+        self.upgrade: bool = upgrade
+        self.clock = clock
+        self.hits: int = 0
+        self.approximate_hits: int = 0
+        self.subsumed_hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, int, str, Optional[Hashable], Optional[Tuple[Hashable, Shape]]]]" = OrderedDict()
+        self._geo: Dict[Hashable, GeoIndex] = {} # locations of cached responses by request signature
+        self._shapes: Dict[Hashable, Dict[Hashable, Shape]] = {} # keys and shapes of cached responses by base key
+        self._recent: Dict[str, "deque[Shape]"] = {} # last requested shapes by endpoint
+        self._frequency: Dict[str, "Counter[Shape]"] = {} # number of requests of every shape in _recent
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, endpoint: str, options: Dict[str, Any]) -> Hashable:
+        """Make a key of a request, with its query in the canonical form"""
+        if "q" in options:
+            options = {**options, "q": self.canonicalizer.canonical(options["q"])}
+        return request_key(endpoint, options)
+
+    def _base(self, endpoint: str, options: Dict[str, Any]) -> Optional[Hashable]:
+        # the request without its shape, responses with the same base key differ only in how much data they contain
+        if endpoint not in SUBSUMABLE_ENDPOINTS:
+            return None
+        return self.key(endpoint, {k: v for k, v in options.items() if k not in SHAPE_OPTIONS})
+
+    def _signature(self, endpoint: str, options: Dict[str, Any]) -> Hashable:
+        # the request without its query, cached responses of nearby locations are compared only with the same signature
+        return request_key(endpoint, {k: v for k, v in options.items() if k != "q"})
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[float, Any, int, str, Optional[Hashable], Optional[Tuple[Hashable, Shape]]]]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self.clock():
+            self._evict(key)
+            return None
+        return entry
+
+    def _evict(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        if entry[4] is not None:
+            index = self._geo[entry[4]]
+            index.remove(key)
+            if not len(index):
+                del self._geo[entry[4]]
+        if entry[5] is not None:
+            base = entry[5][0]
+            shapes = self._shapes[base]
+            del shapes[key]
+            if not shapes:
+                del self._shapes[base]
+
+    def _subsuming(self, base: Hashable, shape: Shape) -> Optional[Tuple[Hashable, Shape]]:
+        # the smallest valid cached response covering the shape
+        best = None
+        for key, cached in list(self._shapes.get(base, {}).items()):
+            if cached.covers(shape) and (best is None or cached.days < best[1].days) and self._lookup(key) is not None:
+                best = (key, cached)
+        return best
+
+    def get(self, endpoint: str, options: Dict[str, Any]) -> Optional[Tuple[Any, CachedResponse]]:
+        """Get a cached response of a request
+
+        When ``nearby`` is set and the query is a ``lat,lon`` pair, a cached response of the nearest location
+        within ``nearby`` kilometers (of an otherwise identical request) is returned too.
+        Forecast, history and marine requests are answered with a sliced response of a wider request too.
+
+        Returns
+        ---------
+        Optional[Tuple[Any, CachedResponse]]
+            Raw data and response, ``None`` if there is no valid entry
+        """
+        key = self.key(endpoint, options)
+        base = self._base(endpoint, options)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None and base is not None:
+                shape = Shape.of(options)
+                subsuming = self._subsuming(base, shape)
+                if subsuming is not None:
+                    key = subsuming[0]
+                    entry = self._lookup(key)
+                    entry = entry[:1] + (narrow(entry[1], subsuming[1], shape),) + entry[2:] # type: ignore
+                    self.subsumed_hits += 1
+            if entry is None and self.nearby is not None:
+                coordinates = self.canonicalizer.parse_coordinates(options.get("q"))
+                index = self._geo.get(self._signature(endpoint, options)) if coordinates is not None else None
+                nearest = index.nearest(*coordinates, max_distance=self.nearby) if index is not None else None # type: ignore
+                if nearest is not None:
+                    key = nearest[0]
+                    entry = self._lookup(key)
+                    if entry is not None:
+                        self.approximate_hits += 1
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[1], CachedResponse(entry[2], entry[3])
+
+    def put(self, endpoint: str, options: Dict[str, Any], data: Any, response: Any) -> None:
+        """Cache a successful response of a request.
+
+        The resolved location of the response is remembered by :attr:`canonicalizer`, so the entry is shared
+        by all queries resolved to the same location.
+        """
+        location = data.get("location") if isinstance(data, Mapping) else None
+        query = options.get("q")
+        if isinstance(query, str) and isinstance(location, Mapping) and endpoint not in ("search.json", "ip.json"):
+            self.canonicalizer.learn(query, location)
+        key = self.key(endpoint, options)
+        base = self._base(endpoint, options)
+        shaped = (base, Shape.of(options)) if base is not None else None
+        signature = None
+        if self.nearby is not None and isinstance(location, Mapping) and "lat" in location and "lon" in location:
+            signature = self._signature(endpoint, options)
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (self.clock() + self.ttl, data, response.status_code, response.url, signature, shaped)
+            if signature is not None:
+                self._geo.setdefault(signature, GeoIndex()).insert(key, location["lat"], location["lon"]) # type: ignore
+            if shaped is not None:
+                self._shapes.setdefault(shaped[0], {})[key] = shaped[1]
+            while len(self._entries) > self.maxsize:
+                self._evict(next(iter(self._entries)))
+
+    def widen(self, endpoint: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Get options of the request to make for a missed request.
+
+        When :attr:`upgrade` is enabled, a forecast, history or marine request is widened to the union
+        of shapes that make up at least ``UPGRADE_THRESHOLD`` of the last ``UPGRADE_WINDOW`` requests of the endpoint,
+        so a single wide request does not widen every later one. Otherwise ``options`` are returned unchanged.
+        """
+        if not self.upgrade or endpoint not in SUBSUMABLE_ENDPOINTS:
+            return options
+        shape = Shape.of(options)
+        with self._lock:
+            recent = self._recent.setdefault(endpoint, deque())
+            frequency = self._frequency.setdefault(endpoint, Counter())
+            recent.append(shape)
+            frequency[shape] += 1
+            if len(recent) > UPGRADE_WINDOW:
+                oldest = recent.popleft()
+                frequency[oldest] -= 1
+                if not frequency[oldest]:
+                    del frequency[oldest]
+            widest = shape
+            for frequent, count in frequency.items():
+                if count >= UPGRADE_THRESHOLD * len(recent):
+                    widest = widest.union(frequent)
+        if widest == shape:
+            return options
+        widened = {k: v for k, v in options.items() if k not in SHAPE_OPTIONS}
+        widened.update(widest.options(endpoint))
+        return widened
+
+    def narrow(self, endpoint: str, options: Dict[str, Any], widened: Dict[str, Any], data: Any) -> Any:
+        """Slice raw data of a response of the ``widened`` request (see :meth:`widen`) to the requested ``options``"""
+        if widened is options:
+            return data
+        return narrow(data, Shape.of(widened), Shape.of(options))
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        with self._lock:
+            self._entries.clear()
+            self._geo.clear()
+            self._shapes.clear()
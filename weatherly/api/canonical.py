@@ -0,0 +1,136 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import re
+import threading
+from collections import OrderedDict
+from typing import (
+    Any,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+__all__ = (
+    "QueryCanonicalizer",
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_COORDINATES = re.compile(r"^\s*([-+]?\d+(?:\.\d+)?)\s*,\s*([-+]?\d+(?:\.\d+)?)\s*$")
+
+class QueryCanonicalizer():
+    """Maps equivalent queries to one canonical form, so they share cache entries.
+
+    Queries are normalized first: case and whitespace are normalized, and coordinates are rounded to ``precision`` decimal places
+    (``" London "`` becomes ``"london"``, ``"51.5072,-0.1276"`` becomes ``"51.51,-0.13"``).
+    Then, once a query was resolved by the API, it is mapped to the coordinates of the resolved location,
+    so different queries for the same location (e.g. ``"London"`` and ``"London, UK"``) share the same form.
+
+    .. container:: operations
+
+        .. describe:: len(x)
+
+            Number of remembered resolved queries
+
+    Parameters
+    ------------
+    precision: :class:`int`
+        Number of decimal places of coordinates. Defaults to ``2`` (about 1 km)
+    maxsize: :class:`int`
+        Maximum number of remembered resolved queries. Defaults to ``100000``
+
+    Attributes
+    ------------
+    precision: :class:`int`
+        Number of decimal places of coordinates
+    maxsize: :class:`int`
+        Maximum number of remembered resolved queries
+    """
+    def __init__(self, precision: int = 2, maxsize: int = 100000) -> None:
+        self.precision: int = precision
+        self.maxsize: int = maxsize
+        self._resolved: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._resolved)
+
+    def coordinates(self, lat: float, lon: float) -> str:
+        """Format coordinates as a canonical query"""
+        precision = self.precision
+        # adding 0.0 turns -0.0 into 0.0
+        return f"{round(float(lat), precision) + 0.0:.{precision}f},{round(float(lon), precision) + 0.0:.{precision}f}"
+
+    def parse_coordinates(self, query: Any) -> Optional[Tuple[float, float]]:
+        """Get latitude and longitude of a ``lat,lon`` query, ``None`` for other queries"""
+        match = _COORDINATES.match(query) if isinstance(query, str) else None
+        if match is None:
+            return None
+        return float(match.group(1)), float(match.group(2))
+
+    def normalize(self, query: str) -> str:
+        """Normalize case and whitespace of a query, and round its coordinates"""
+        match = _COORDINATES.match(query)
+        if match is not None:
+            return self.coordinates(float(match.group(1)), float(match.group(2)))
+        return _WHITESPACE.sub(" ", query).strip().lower()
+
+    def canonical(self, query: Any) -> Any:
+        """Get the canonical form of a query. Values that are not strings are returned as they are"""
+        if not isinstance(query, str):
+            return query
+        normalized = self.normalize(query)
+        resolved = self._resolved.get(normalized)
+        return normalized if resolved is None else resolved
+
+    def learn(self, query: str, location: Mapping[str, Any]) -> Optional[str]:
+        """Remember the location a query was resolved to.
+
+        Parameters
+        ------------
+        query: :class:`str`
+            Sent query
+        location: Mapping[:class:`str`, Any]
+            Raw location data of the response, with ``lat`` and ``lon`` keys
+
+        Returns
+        ---------
+        Optional[:class:`str`]
+            The new canonical form of the query, ``None`` if the location has no coordinates
+        """
+        try:
+            resolved = self.coordinates(location["lat"], location["lon"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        normalized = self.normalize(query)
+        with self._lock:
+            self._resolved.pop(normalized, None)
+            self._resolved[normalized] = resolved
+            while len(self._resolved) > self.maxsize:
+                self._resolved.popitem(last=False)
+        return resolved
+
+    def clear(self) -> None:
+        """Forget all resolved queries"""
+        with self._lock:
+            self._resolved.clear()
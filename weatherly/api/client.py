@@ -25,21 +25,42 @@ SOFTWARE.
 import datetime
 import inspect
 import traceback
-from typing import (Any, Callable, Dict, List, Literal, Optional, ParamSpec,
-                    Tuple, TypeVar, Union)
+from collections import OrderedDict
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Literal,
+                    MutableMapping, Optional, ParamSpec, Tuple, Type, TypeVar,
+                    Union)
 
+from .. import astronomy
 from .. import utils as utils
 from ..enums import Languages, WeatherEndpoints
 from ..errors import (AccessDenied, APIKeyDisabled, APILimitExceeded,
                       InternalApplicationError, InvalidAPIKey, InvalidDate,
                       NoLocationFound, WeatherAPIException)
 from ..models import (AstronomicalData, BulkRequest, BulkResponse,
-                         CurrentWeatherData, ForecastData, FutureData, IPData,
-                         LocationData, MarineData, SportsData)
+                         CurrentWeatherData, ForecastData, FutureData,
+                         HourlyColumns, IPData, LocationData, MarineData,
+                         SportsData)
+from . import backfill
+from .autocomplete import AutocompleteCache
+from .cache import NegativeCache, ResponseCache, request_key
 from .core import BaseAPIClient
+from .events import EventBus
+from .ipcache import IPCache
+from .translation import TRANSLATED_ENDPOINTS, ConditionTranslator
+from .ratelimit import RateLimiter
+from .results import Err, ErrorStats, Ok
 
 WEATHERAPI_BASE_URL = "https://api.weatherapi.com/v1/"
 BOOL_REPLACE = {True: "yes", False: "no"}
+ERROR_CODES: Dict[int, Type[WeatherAPIException]] = {
+    1006: NoLocationFound,
+    2006: InvalidAPIKey,
+    2007: APILimitExceeded,
+    2008: APIKeyDisabled,
+    2009: AccessDenied,
+    9999: InternalApplicationError,
+}
+EVENTS = ("on_api_call_successful", "on_data") # events dispatched through Client.events
 
 __all__ = (
     "Client",
@@ -69,6 +90,33 @@ class Client(BaseAPIClient):
         Enable/Disable Air Quality data in forecast API output. Defaults to "no".
     tides: :class:`bool`
         Enable/Disable Tide data in Marine API output. Defaults to "no".
+    frozen: :class:`bool`
+        Return frozen (immutable and hashable) models, see :meth:`PartialAPIResponse.freeze`. Defaults to ``False``.
+        Frozen models can be shared, e.g. by caches, without copying them.
+    events: Optional[:class:`EventBus`]
+        Event bus dispatching events of this client, e.g. shared by many clients.
+        By default, every client has its own bus calling listeners in a background thread
+    results: :class:`bool`
+        Return :class:`Ok` or :class:`Err` results from ``get_*`` methods, instead of models or ``None``.
+        Errors are then not passed to :meth:`on_error`, they are counted in :attr:`errors` and a sample of them is logged.
+        Defaults to ``False``
+    negative_cache: Optional[Union[:class:`float`, :class:`NegativeCache`]]
+        Cache errors that are always returned for the same request (e.g. :exc:`NoLocationFound`), for this many seconds
+        or in given cache. Cached errors are raised again without calling the API. Disabled by default
+    response_cache: Optional[Union[:class:`float`, :class:`ResponseCache`]]
+        Cache successful responses for this many seconds, or in given cache. Equivalent queries share cached responses,
+        see :class:`QueryCanonicalizer`, and narrower forecast, history and marine requests are sliced from wider ones.
+        Disabled by default
+    autocomplete: Optional[Union[:class:`bool`, :class:`AutocompleteCache`]]
+        Answer :meth:`get_locations` from an :class:`AutocompleteCache` (a new one if ``True``) whenever possible. Disabled by default
+    ip_cache: Optional[Union[:class:`bool`, :class:`IPCache`]]
+        Answer :meth:`get_ip_data` with cached data of the address's network (a new cache if ``True``). Disabled by default
+    translate: Optional[Union[:class:`bool`, :class:`ConditionTranslator`]]
+        Make requests in any language once without a language (so they share cached responses), and translate
+        condition texts locally with given translator (a new one if ``True``). Disabled by default
+    offline_astronomy: :class:`bool`
+        Compute :meth:`get_astronomical_data` locally (see :mod:`weatherly.astronomy`) instead of calling the Astronomy API.
+        Only the location of a query is requested, once. Defaults to ``False``
     kwargs: Dict[:class:`str`, Any]
         Additional keyword arguments passed by default to requests made by the client
         
@@ -87,6 +135,26 @@ class Client(BaseAPIClient):
         Indicates if Air Quality data has been enabled
     tides: :class:`bool`
         Indicates if tides data in the Marine API has been enabled
+    frozen: :class:`bool`
+        Indicates if returned models are frozen
+    events: :class:`EventBus`
+        Event bus of this client. Use it to add and remove listeners, or to wait for queued events with :meth:`EventBus.flush`
+    results: :class:`bool`
+        Indicates if ``get_*`` methods return :class:`Ok` or :class:`Err` results
+    errors: :class:`ErrorStats`
+        Counts of errors raised in ``get_*`` methods
+    negative_cache: Optional[:class:`NegativeCache`]
+        Cache of deterministic errors, ``None`` if disabled
+    response_cache: Optional[:class:`ResponseCache`]
+        Cache of responses, ``None`` if disabled
+    autocomplete: Optional[:class:`AutocompleteCache`]
+        Cache of search results, ``None`` if disabled
+    ip_cache: Optional[:class:`IPCache`]
+        Cache of IP data by network, ``None`` if disabled
+    translator: Optional[:class:`ConditionTranslator`]
+        Translator of condition texts, ``None`` if disabled
+    offline_astronomy: :class:`bool`
+        Indicates if astronomical data is computed locally
     kwargs: Dict[:class:`str`, Any]
         Additional keyword arguments passed by default to requests made by the client
     """
@@ -99,6 +167,15 @@ class Client(BaseAPIClient):
         hour: Optional[int] = None,
         aqi: bool = False,
         tides: bool = False,
+        frozen: bool = False,
+        events: Optional[EventBus] = None,
+        results: bool = False,
+        negative_cache: Optional[Union[float, NegativeCache]] = None,
+        response_cache: Optional[Union[float, ResponseCache]] = None,
+        autocomplete: Optional[Union[bool, AutocompleteCache]] = None,
+        ip_cache: Optional[Union[bool, IPCache]] = None,
+        translate: Optional[Union[bool, ConditionTranslator]] = None,
+        offline_astronomy: bool = False,
         **kwargs: Dict[str, Any]
     ) -> None:
         lang_code = None
@@ -118,8 +195,32 @@ class Client(BaseAPIClient):
         self.hour = hour
         self.aqi = aqi
         self.tides = tides
+        self.frozen = frozen
         self.kwargs = kwargs
         self.lang = Languages(lang_code) if lang_code else None
+        self.results = results
+        self.negative_cache: Optional[NegativeCache] = (
+            NegativeCache(negative_cache) if isinstance(negative_cache, (int, float)) else negative_cache
+        )
+        self.response_cache: Optional[ResponseCache] = (
+            ResponseCache(response_cache) if isinstance(response_cache, (int, float)) else response_cache
+        )
+        # caches define __len__, so an empty cache is falsy
+        self.autocomplete: Optional[AutocompleteCache] = (
+            AutocompleteCache() if autocomplete is True else None if autocomplete is False else autocomplete
+        )
+        self.ip_cache: Optional[IPCache] = IPCache() if ip_cache is True else None if ip_cache is False else ip_cache
+        self.translator: Optional[ConditionTranslator] = (
+            ConditionTranslator() if translate is True else None if translate is False else translate
+        )
+        self.offline_astronomy = offline_astronomy
+        self._locations: "OrderedDict[str, Dict[str, Any]]" = OrderedDict() # resolved locations of queries
+        self.errors = ErrorStats()
+        self.events = events or EventBus(on_error=lambda event, exc: self.on_error(event, exc))
+        for name in EVENTS:
+            # events implemented by a subclass are listeners too
+            if callable(getattr(type(self), name, None)):
+                self.events.add_listener(name, getattr(self, name))
     
     
     def _call_request(self, endpoint: str, options: Dict[str, Any], data: Optional[Dict] = None) -> Dict[str, Any]:
@@ -131,12 +232,45 @@ class Client(BaseAPIClient):
         # add options to final_options
         for k,v in options.items():
             # also - replace bool with "yes"/"no"
-            if v is not None: final_options[k] = BOOL_REPLACE.get(v, v)
-        
+            # (only real bools, 1 == True would turn days=1 into "yes")
+            if v is not None: final_options[k] = BOOL_REPLACE[v] if isinstance(v, bool) else v
+
+        translator = self.translator
+        if translator is not None and not data and endpoint in TRANSLATED_ENDPOINTS and final_options.get("lang"):
+            # make (and cache) the request once without a language, and translate condition texts locally
+            lang = final_options["lang"]
+            if lang in translator:
+                resp = self._send(endpoint, {k: v for k, v in final_options.items() if k != "lang"})
+                translated = translator.translate(resp[0], lang)
+                if translated is not None:
+                    return translated, resp[1]
+            # some texts are not known yet, learn them from a response in the language
+            resp = self._send(endpoint, final_options)
+            translator.learn(resp[0], lang)
+            return resp
+        return self._send(endpoint, final_options, data)
+
+    def _send(self, endpoint: str, final_options: Dict[str, Any], data: Optional[Dict] = None) -> Dict[str, Any]:
+        key = None
+        cache = self.response_cache if not data else None
+        if cache is not None:
+            cached = cache.get(endpoint, final_options)
+            if cached is not None:
+                return cached
+        if self.negative_cache is not None and not data:
+            # requests that failed with a deterministic error fail again without calling the API
+            key = request_key(endpoint, final_options) if cache is None else cache.key(endpoint, final_options)
+            self.negative_cache.check(key)
+
+        # a missed request may be widened, so later narrower requests are answered from the cache
+        request_options = cache.widen(endpoint, final_options) if cache is not None else final_options
+        # final options already hold the wanted default options, the others (e.g. lang of a translated request)
+        # are overridden with None so _request does not add them back
+        overrides = {k: None for k in self.default_options if k not in request_options}
         if data:
-            resp = self._request(endpoint, data=data, **final_options)
+            resp = self._request(endpoint, data=data, **request_options, **overrides)
         else:
-            resp = self._request(endpoint, **final_options)
+            resp = self._request(endpoint, **request_options, **overrides)
 
         if not resp[1].status_code < 400:
             # raise errors yay
@@ -145,20 +279,51 @@ class Client(BaseAPIClient):
             status = resp[1].status_code
             msg = error_data["message"]
 
-            if code == 1006: raise NoLocationFound(status, code, msg)
-            elif code == 2006: raise InvalidAPIKey(status, code, msg)
-            elif code == 2007: raise APILimitExceeded(status, code, msg)
-            elif code == 2008: raise APIKeyDisabled(status, code, msg)
-            elif code == 2009: raise AccessDenied(status, code, msg)
-            elif code == 9999: raise InternalApplicationError(status, code, msg)
-            else: raise WeatherAPIException(status, code, msg)
+            exc = ERROR_CODES.get(code, WeatherAPIException)(status, code, msg)
+            if key is not None:
+                self.negative_cache.add(key, exc) # type: ignore
+            raise exc
 
-        full_url = str(self.url + endpoint + utils.parse_kwargs_to_urlargs({**self.default_options, **final_options}))
-        try:
-            self.on_api_call_successful(full_url, resp[1])
-        except AttributeError: pass
+        if cache is not None:
+            cache.put(endpoint, request_options, resp[0], resp[1])
+            resp = (cache.narrow(endpoint, final_options, request_options, resp[0]), resp[1])
+        if self.events.has_listeners("on_api_call_successful"):
+            self.events.dispatch("on_api_call_successful", resp[1].url, resp[1])
         return resp
     
+    def _resolve_location(self, query: str) -> Dict[str, Any]:
+        """Private method used to get the location of a query, requested once from the Time Zone API"""
+        key = " ".join(query.lower().split())
+        location = self._locations.get(key)
+        if location is None:
+            location = self._call_request("timezone.json", {"q": query})[0]["location"]
+            self._locations[key] = location
+            if len(self._locations) > 4096:
+                self._locations.popitem(last=False)
+        return location
+
+    def _finalize(self, result: T) -> T:
+        """Private method used to prepare models before returning them from client methods"""
+        if self.frozen:
+            if isinstance(result, list): # e.g. locations
+                result = tuple(model.freeze() for model in result) # type: ignore
+            else:
+                result = result.freeze() # type: ignore
+        if self.events.has_listeners("on_data"):
+            self.events.dispatch("on_data", result)
+        if self.results:
+            return Ok(result) # type: ignore
+        return result
+
+    def _handle_error(self, func: str, exc: Exception) -> Optional[Err]:
+        """Private method used to handle exceptions raised in client methods"""
+        self.errors.record(func, exc, log=self.results)
+        if self.results:
+            # no traceback formatting on this path, errors are only counted and logged when sampled
+            return Err(exc, func)
+        self.on_error(func, exc)
+        return None
+
     def on_error(self, func: str, exc: Exception) -> None:
         """Default implementation of error handling in this client.
         
@@ -184,6 +349,9 @@ class Client(BaseAPIClient):
                 print(f"An error occured! Function: {func}, error: {str(exc)}")
         
         In the example above, by adding ``@client.event`` the ``on_error`` function has turned into an error handler function
+
+        ``on_error`` replaces the error handler of the client and is called synchronously. Other events can have many listeners,
+        every decorated function is added to :attr:`events` and called in the background.
         
         .. important::
         
@@ -192,8 +360,11 @@ class Client(BaseAPIClient):
         if inspect.iscoroutinefunction(func):
             raise ValueError("Event functions should not be coroutines")
         
-        # overwrite default client event implementation to user's func
-        setattr(self, func.__name__, func)
+        if func.__name__ == "on_error":
+            # overwrite default client error handler to user's func
+            setattr(self, func.__name__, func)
+        else:
+            self.events.add_listener(func.__name__, func)
         return func
 
     def set_language(self, lang: Union[str, Languages]) -> Optional[Languages]:
@@ -217,6 +388,7 @@ class Client(BaseAPIClient):
             return None
 
         self.lang = lang_class 
+        self.default_options["lang"] = lang_class.value
         return self.lang
 
     def get_current_weather(self, 
@@ -272,9 +444,9 @@ class Client(BaseAPIClient):
             resp = self._call_request("current.json", options)
 
             weather = CurrentWeatherData(resp[0], resp[1].status_code, None)
-            return weather
+            return self._finalize(weather)
         except Exception as exc:
-            self.on_error("get_current_weather", exc)
+            return self._handle_error("get_current_weather", exc)
 
     def get_locations(self, query: str):
         """Get locations for given query
@@ -307,14 +479,19 @@ class Client(BaseAPIClient):
             Raised when something else went wrong, that does not have a specific exception class.
         """
         try:
+            cached = self.autocomplete.get(query) if self.autocomplete is not None else None
+            if cached is not None:
+                return self._finalize([LocationData(loc, 200, None) for loc in cached])
             resp = self._call_request("search.json",{"q": query})
+            if self.autocomplete is not None:
+                self.autocomplete.put(query, resp[0])
 
             locations = []
             for loc in resp[0]:
                 locations.append(LocationData(loc, resp[1].status_code, None))
-            return locations
+            return self._finalize(locations)
         except Exception as exc:
-            self.on_error("get_locations", exc)
+            return self._handle_error("get_locations", exc)
 
     def get_forecast_data(
         self,
@@ -378,9 +555,9 @@ class Client(BaseAPIClient):
         try:
             resp = self._call_request("forecast.json", options)
             forecast = ForecastData(resp[0], resp[1].status_code, None)
-            return forecast
+            return self._finalize(forecast)
         except Exception as exc:
-            self.on_error("get_forecast_data", exc)
+            return self._handle_error("get_forecast_data", exc)
 
     def get_historical_data(
         self,
@@ -461,10 +638,86 @@ class Client(BaseAPIClient):
 
             resp = self._call_request("history.json", options)
             history = ForecastData(resp[0], resp[1].status_code, None)
-            return history
+            return self._finalize(history)
         except Exception as exc:
-            self.on_error("get_historical_data", exc)
+            return self._handle_error("get_historical_data", exc)
         
+    def get_historical_range(
+        self,
+        queries: Union[str, Iterable[str]],
+        start: Union[str, datetime.date],
+        end: Union[str, datetime.date],
+        *,
+        max_workers: int = 4,
+        rate_limit: Optional[Union[float, RateLimiter]] = None,
+        cache: Optional[MutableMapping[str, ForecastData]] = None,
+        checkpoint: Optional[Union[str, backfill.Checkpoint]] = None,
+        columnar: bool = False,
+        **kwargs: Dict[str, Any]
+    ) -> Union[Iterator[Tuple[str, str, ForecastData]], Dict[str, HourlyColumns]]:
+        """Retrieve historical data for a range of days and one or many queries. Uses History API.
+
+        One :meth:`get_historical_data` call is planned for every query and day.
+        Calls are made concurrently, but no faster than ``rate_limit`` allows.
+
+        .. code:: python
+
+            for query, date, history in client.get_historical_range(["London", "Paris"], "2023-01-01", "2023-01-31",
+                                                                     rate_limit=5, checkpoint="backfill.txt"):
+                ...
+
+        Parameters
+        -----------------
+        queries: Union[:class:`str`, Iterable[:class:`str`]]
+            Query string or many query strings, locations you want to get data for
+        start: Union[:class:`str`, :class:`datetime.date`]
+            First day of the range, as a date or a string in format yyyy-mm-dd
+        end: Union[:class:`str`, :class:`datetime.date`]
+            Last day of the range (inclusive), as a date or a string in format yyyy-mm-dd
+        max_workers: :class:`int`
+            Maximum number of concurrent calls. Defaults to ``4``
+        rate_limit: Optional[Union[:class:`float`, :class:`RateLimiter`]]
+            Maximum number of calls per second, or a rate limiter shared with other jobs. No limit by default
+        cache: Optional[MutableMapping[:class:`str`, :class:`ForecastData`]]
+            A mapping (e.g. a :class:`dict` or a :mod:`shelve` file) with already fetched days.
+            Days found in the cache are not requested again, fetched days are added to it.
+            Keys are formatted as ``query|yyyy-mm-dd``
+        checkpoint: Optional[Union[:class:`str`, :class:`Checkpoint`]]
+            Path of a checkpoint file. Every processed day is recorded there, and days already recorded
+            are skipped, so an interrupted backfill can be resumed
+        columnar: :class:`bool`
+            If ``True``, wait for all days and return hourly data of every query as :class:`HourlyColumns`.
+            Columns always cover every day of the range: days recorded in the checkpoint by an earlier run are taken
+            from ``cache``, or fetched again when they are not cached (pass a ``cache`` to resume without refetching them)
+        kwargs: Dict[:class:`str`, Any]
+            Additional keyword arguments passed to :meth:`get_historical_data`
+
+        Returns
+        ----------
+        Union[Iterator[Tuple[:class:`str`, :class:`str`, :class:`ForecastData`]], Dict[:class:`str`, :class:`HourlyColumns`]]
+            A generator of (query, date, data) tuples in the order the calls finish, or hourly columns by query if ``columnar`` is ``True``.
+            Days that failed are passed to :meth:`on_error` and skipped (they are not checkpointed, so they are retried when resuming).
+
+        Raises
+        ---------
+        :exc:`InvalidDate`
+            Raised when ``start`` or ``end`` is invalid, or ``start`` is after ``end``
+        """
+        results = backfill.historical_range(
+            self, queries, start, end,
+            max_workers=max_workers, rate_limit=rate_limit, cache=cache, checkpoint=checkpoint, complete=columnar, **kwargs
+        )
+        if not columnar:
+            return results
+
+        days: Dict[str, List[Tuple[str, ForecastData]]] = {}
+        for query, date, history in results:
+            days.setdefault(query, []).append((date, history))
+        return {
+            query: HourlyColumns.concat(history.columns for _, history in sorted(items, key=lambda item: item[0]))
+            for query, items in days.items()
+        }
+
     def get_future_data(
         self,
         query: str,
@@ -537,9 +790,9 @@ class Client(BaseAPIClient):
 
             resp = self._call_request("future.json", options)
             future = FutureData(resp[0], resp[1].status_code, None)
-            return future
+            return self._finalize(future)
         except Exception as exc:
-            self.on_error("get_future_data", exc)
+            return self._handle_error("get_future_data", exc)
         
     def get_astronomical_data(
         self,
@@ -586,11 +839,14 @@ class Client(BaseAPIClient):
             **kwargs
         }
         try:
+            if self.offline_astronomy:
+                astro = astronomy.astronomical_data(self._resolve_location(query), date)
+                return self._finalize(astro)
             resp = self._call_request("astronomy.json", options)
             astro = AstronomicalData(resp[0], resp[1].status_code, None)
-            return astro
+            return self._finalize(astro)
         except Exception as exc:
-            self.on_error("get_astronomical_data", exc)
+            return self._handle_error("get_astronomical_data", exc)
 
     def get_marine_data(
         self,
@@ -640,9 +896,9 @@ class Client(BaseAPIClient):
         try:
             resp = self._call_request("marine.json", options)
             marine = MarineData(resp[0], resp[1].status_code, None)
-            return marine
+            return self._finalize(marine)
         except Exception as exc:
-            self.on_error("get_marine_data", exc)
+            return self._handle_error("get_marine_data", exc)
 
     def get_ip_data(
         self,
@@ -686,11 +942,17 @@ class Client(BaseAPIClient):
             **kwargs
         }
         try:
+            if self.ip_cache is not None and not kwargs:
+                cached = self.ip_cache.get(ip_address)
+                if cached is not None:
+                    return self._finalize(IPData(cached, 200, None))
             resp = self._call_request("ip.json", options)
+            if self.ip_cache is not None and not kwargs:
+                self.ip_cache.put(ip_address, resp[0])
             ip = IPData(resp[0], resp[1].status_code, None)
-            return ip
+            return self._finalize(ip)
         except Exception as exc:
-            self.on_error("get_ip_data", exc)
+            return self._handle_error("get_ip_data", exc)
 
     def get_sports_data(
         self,
@@ -736,9 +998,9 @@ class Client(BaseAPIClient):
         try:
             resp = self._call_request("sports.json", options)
             sports = SportsData(resp[0], resp[1].status_code, None)
-            return sports
+            return self._finalize(sports)
         except Exception as exc:
-            self.on_error("get_sports_data", exc)
+            return self._handle_error("get_sports_data", exc)
             
     def bulk_request(
         self,
@@ -808,8 +1070,6 @@ class Client(BaseAPIClient):
         
         kwargs["q"] = "bulk"
         
-        data_res = self._call_request(endpoint, kwargs, parsed)
-        
         endpoint_to_class = {
             "current.json": CurrentWeatherData,
             "astronomy.json": AstronomicalData,
@@ -821,16 +1081,21 @@ class Client(BaseAPIClient):
             "marine.json": MarineData,
             "sports.json": SportsData
         }
-        class_ = endpoint_to_class[endpoint]
-        raw = data_res[0]["bulk"]
-        
-        res = []
-        
-        for elem in raw:
-            elem = elem["query"]
-            res.append((elem["custom_id"], class_(elem, data_res[1].status_code, None)))
-        
-        return BulkResponse(data_res[0], data_res[1].status_code, None, data.endpoint, res)
+        try:
+            data_res = self._call_request(endpoint, kwargs, parsed)
+
+            class_ = endpoint_to_class[endpoint]
+            raw = data_res[0]["bulk"]
+            
+            res = []
+            
+            for elem in raw:
+                elem = elem["query"]
+                res.append((elem["custom_id"], class_(elem, data_res[1].status_code, None)))
+            
+            return self._finalize(BulkResponse(data_res[0], data_res[1].status_code, None, data.endpoint, res))
+        except Exception as exc:
+            return self._handle_error("bulk_request", exc)
     
     def __str__(self):
         return f"<{self.__class__.__name__} api_key={self.default_options['key']} lang={self.lang}>"
@@ -76,9 +76,10 @@ class BaseAPIClient():
         path: :class:`str`
             A path that will be used as an endpoint for the request.
         kwargs: Optional[Dict[str, str]]
-            Additional parameters for the request.
+            Additional parameters for the request. ``None`` values are not sent, so they can override default options.
         """
-        full_url = self.url + path + parse_kwargs_to_urlargs({**self.default_options, **kwargs})
+        options = {k: v for k, v in {**self.default_options, **kwargs}.items() if v is not None}
+        full_url = self.url + path + parse_kwargs_to_urlargs(options)
 
         if not data:
             response = requests.get(full_url)
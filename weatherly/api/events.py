@@ -0,0 +1,164 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import queue
+import threading
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+__all__ = (
+    "EventBus",
+)
+
+_STOP = object()
+
+class EventBus():
+    """Dispatches client events to many listeners.
+
+    Events are put on a bounded queue and listeners are called by a background thread, so slow listeners
+    (e.g. loggers or metrics exporters) do not add latency to API calls. Events are delivered in the order they were dispatched.
+    When the queue is full, new events are dropped and counted instead of blocking the caller.
+
+    Parameters
+    ------------
+    maxsize: :class:`int`
+        Maximum number of queued events. Defaults to ``1024``
+    background: :class:`bool`
+        Call listeners in a background thread. If ``False``, listeners are called synchronously by :meth:`dispatch`.
+        Defaults to ``True``
+    on_error: Optional[Callable[[:class:`str`, :exc:`Exception`], Any]]
+        Called with the event name and the exception when a listener raises
+
+    Attributes
+    ------------
+    maxsize: :class:`int`
+        Maximum number of queued events
+    background: :class:`bool`
+        Indicates if listeners are called in a background thread
+    dropped: :class:`int`
+        Number of events dropped, because the queue was full
+    """
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        background: bool = True,
+        on_error: Optional[Callable[[str, Exception], Any]] = None,
+    ) -> None:
+        self.maxsize: int = maxsize
+        self.background: bool = background
+        self.on_error = on_error
+        self.dropped: int = 0
+        self._listeners: Dict[str, Tuple[Callable[..., Any], ...]] = {}
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def add_listener(self, event: str, func: Callable[..., Any]) -> None:
+        """Add a listener of an event, e.g. ``"on_api_call_successful"``"""
+        with self._lock:
+            self._listeners[event] = self._listeners.get(event, ()) + (func,)
+
+    def remove_listener(self, event: str, func: Callable[..., Any]) -> None:
+        """Remove a listener of an event, nothing happens if it was not added"""
+        with self._lock:
+            listeners = list(self._listeners.get(event, ()))
+            if func in listeners:
+                listeners.remove(func)
+            if listeners:
+                self._listeners[event] = tuple(listeners)
+            else:
+                self._listeners.pop(event, None)
+
+    def listeners(self, event: str) -> List[Callable[..., Any]]:
+        """Get listeners of an event"""
+        return list(self._listeners.get(event, ()))
+
+    def has_listeners(self, event: str) -> bool:
+        """Check if an event has any listeners. Callers use it to skip preparing event arguments"""
+        return event in self._listeners
+
+    def dispatch(self, event: str, *args: Any) -> None:
+        """Call all listeners of an event with given arguments.
+
+        Parameters
+        ------------
+        event: :class:`str`
+            Name of the event
+        args: Any
+            Arguments passed to listeners
+        """
+        listeners = self._listeners.get(event)
+        if not listeners:
+            return
+        if not self.background:
+            self._call(event, listeners, args)
+            return
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((event, listeners, args))
+        except queue.Full:
+            self.dropped += 1
+
+    def _call(self, event: str, listeners: Tuple[Callable[..., Any], ...], args: Tuple[Any, ...]) -> None:
+        for listener in listeners:
+            try:
+                listener(*args)
+            except Exception as exc:
+                if self.on_error is not None:
+                    self.on_error(event, exc)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="weatherly-events", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._call(*item)
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Wait until all queued events are delivered"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Deliver queued events and stop the background thread. It is started again by the next :meth:`dispatch`"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
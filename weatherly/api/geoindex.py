@@ -0,0 +1,184 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import math
+from typing import (
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+__all__ = (
+    "GeoIndex",
+)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometers"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+class GeoIndex():
+    """An in-memory spatial index of points, answering nearest neighbour and radius queries.
+
+    Points are kept in a grid of ``cell_size`` × ``cell_size`` degree cells. A query only checks the cells that
+    can contain points within its radius, so it takes microseconds even with many thousands of points.
+
+    .. container:: operations
+
+        .. describe:: len(x)
+
+            Number of indexed items
+
+        .. describe:: item in x
+
+            Check if an item is indexed
+
+    Parameters
+    ------------
+    cell_size: :class:`float`
+        Size of grid cells in degrees. Defaults to ``0.25`` (about 28 km)
+
+    Attributes
+    ------------
+    cell_size: :class:`float`
+        Size of grid cells in degrees
+    """
+    def __init__(self, cell_size: float = 0.25) -> None:
+        if not 0 < cell_size <= 90:
+            raise ValueError("cell_size should be between 0 and 90 degrees")
+        self.cell_size: float = cell_size
+        self._columns: int = math.ceil(360 / cell_size)
+        self._cells: Dict[Tuple[int, int], Dict[Hashable, Tuple[float, float]]] = {}
+        self._items: Dict[Hashable, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._items
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int((lat + 90) // self.cell_size), int(((lon + 180) % 360) // self.cell_size)
+
+    def insert(self, item: Hashable, lat: float, lon: float) -> None:
+        """Index an item at given coordinates, moving it if it is already indexed"""
+        self.remove(item)
+        cell = self._cell(lat, lon)
+        self._cells.setdefault(cell, {})[item] = (lat, lon)
+        self._items[item] = cell
+
+    def remove(self, item: Hashable) -> None:
+        """Remove an item from the index, nothing happens if it is not indexed"""
+        cell = self._items.pop(item, None)
+        if cell is None:
+            return
+        points = self._cells[cell]
+        del points[item]
+        if not points:
+            del self._cells[cell]
+
+    def _candidates(self, lat: float, lon: float, radius: float) -> Iterator[Tuple[Hashable, float, float]]:
+        size = self.cell_size
+        dlat = radius / KM_PER_DEGREE
+        row_min, _ = self._cell(max(lat - dlat, -90.0), lon)
+        row_max, _ = self._cell(min(lat + dlat, 90.0), lon)
+        # longitude degrees get shorter towards the poles, use the widest span of the covered latitudes
+        cos = math.cos(math.radians(min(abs(lat) + dlat, 90.0)))
+        if cos * 180 * KM_PER_DEGREE <= radius:
+            columns: Iterable[int] = range(self._columns)
+        else:
+            span = math.ceil(radius / (KM_PER_DEGREE * cos) / size) + 1
+            _, column = self._cell(lat, lon)
+            columns = {(column + offset) % self._columns for offset in range(-span, span + 1)}
+        cells = self._cells
+        for row in range(row_min, row_max + 1):
+            for column in columns:
+                points = cells.get((row, column))
+                if points:
+                    for item, (item_lat, item_lon) in points.items():
+                        yield item, item_lat, item_lon
+
+    def within(self, lat: float, lon: float, radius: float) -> List[Tuple[Hashable, float]]:
+        """Find items within a radius
+
+        Parameters
+        ------------
+        lat: :class:`float`
+            Latitude of the center
+        lon: :class:`float`
+            Longitude of the center
+        radius: :class:`float`
+            Radius in kilometers
+
+        Returns
+        ---------
+        List[Tuple[Hashable, :class:`float`]]
+            Pairs of (item, distance in kilometers), nearest first
+        """
+        found = []
+        for item, item_lat, item_lon in self._candidates(lat, lon, radius):
+            distance = haversine(lat, lon, item_lat, item_lon)
+            if distance <= radius:
+                found.append((item, distance))
+        found.sort(key=lambda pair: pair[1])
+        return found
+
+    def nearest(self, lat: float, lon: float, max_distance: Optional[float] = None) -> Optional[Tuple[Hashable, float]]:
+        """Find the nearest item
+
+        Parameters
+        ------------
+        lat: :class:`float`
+            Latitude of the point
+        lon: :class:`float`
+            Longitude of the point
+        max_distance: Optional[:class:`float`]
+            Ignore items further than this many kilometers
+
+        Returns
+        ---------
+        Optional[Tuple[Hashable, :class:`float`]]
+            The nearest item and its distance in kilometers, ``None`` if there is no (close enough) item
+        """
+        if not self._items:
+            return None
+        radius = self.cell_size * KM_PER_DEGREE
+        limit = math.pi * EARTH_RADIUS_KM if max_distance is None else max_distance
+        while True:
+            radius = min(radius, limit)
+            best = None
+            for item, item_lat, item_lon in self._candidates(lat, lon, radius):
+                distance = haversine(lat, lon, item_lat, item_lon)
+                if distance <= radius and (best is None or distance < best[1]):
+                    best = (item, distance)
+            if best is not None or radius >= limit:
+                return best
+            radius *= 4
@@ -0,0 +1,237 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import ipaddress
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+__all__ = (
+    "IPCache",
+)
+
+class _Node():
+    __slots__ = ("children", "entry")
+
+    def __init__(self) -> None:
+        self.children: List[Optional["_Node"]] = [None, None]
+        self.entry: Optional[Tuple[float, Mapping[str, Any]]] = None # expires, raw IP data
+
+def _network_key(version: int, bits: int, width: int, length: int) -> Tuple[int, int, int]:
+    shift = width - length
+    return (version, (bits >> shift) << shift, length)
+
+class IPCache():
+    """A cache of :meth:`Client.get_ip_data` results by network, stored in a binary prefix (radix) tree.
+
+    Addresses of the same network (e.g. the same ``/24`` IPv4 block) almost always have the same location, so a result
+    is cached for the whole network of the address. A lookup returns the cached data of the longest matching network,
+    with the ``ip`` field set to the looked up address.
+
+    When more than ``maxsize`` networks are cached, the least recently used ones are evicted. Branches of the tree
+    left without cached networks (after eviction or expiry) are removed.
+
+    .. container:: operations
+
+        .. describe:: len(x)
+
+            Number of cached networks
+
+    Parameters
+    ------------
+    ipv4_prefix: :class:`int`
+        Prefix length of cached IPv4 networks. Defaults to ``24``
+    ipv6_prefix: :class:`int`
+        Prefix length of cached IPv6 networks. Defaults to ``48``
+    ttl: :class:`float`
+        Number of seconds a result is cached for. Defaults to one day
+    maxsize: :class:`int`
+        Maximum number of cached networks, the least recently used ones are evicted first. Defaults to ``65536``
+    clock: Callable[[], :class:`float`]
+        Function returning the current time in seconds. Defaults to :func:`time.monotonic`
+
+    Attributes
+    ------------
+    ipv4_prefix: :class:`int`
+        Prefix length of cached IPv4 networks
+    ipv6_prefix: :class:`int`
+        Prefix length of cached IPv6 networks
+    ttl: :class:`float`
+        Number of seconds a result is cached for
+    maxsize: :class:`int`
+        Maximum number of cached networks
+    hits: :class:`int`
+        Number of lookups answered from the cache
+    """
+    def __init__(
+        self,
+        ipv4_prefix: int = 24,
+        ipv6_prefix: int = 48,
+        ttl: float = 86400,
+        maxsize: int = 65536,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0 <= ipv4_prefix <= 32 or not 0 <= ipv6_prefix <= 128:
+            raise ValueError("Invalid prefix length")
+        self.ipv4_prefix: int = ipv4_prefix
+        self.ipv6_prefix: int = ipv6_prefix
+        self.ttl: float = ttl
+        self.maxsize: int = maxsize
+        self.clock = clock
+        self.hits: int = 0
+        self._roots: Dict[int, _Node] = {4: _Node(), 6: _Node()}
+        # cached networks as (version, network bits, prefix length), least recently used first
+        self._networks: "OrderedDict[Tuple[int, int, int], None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._networks)
+
+    def _remove(self, network: Tuple[int, int, int]) -> None:
+        """Remove a cached network and the branch of the tree left without cached networks"""
+        version, bits, length = network
+        width = 32 if version == 4 else 128
+        path = [self._roots[version]]
+        for i in range(length):
+            child = path[-1].children[(bits >> (width - 1 - i)) & 1]
+            if child is None:
+                break
+            path.append(child)
+        else:
+            path[-1].entry = None
+            # walk back up, unlinking nodes without an entry and children
+            for i in range(length, 0, -1):
+                node = path[i]
+                if node.entry is not None or node.children[0] is not None or node.children[1] is not None:
+                    break
+                path[i - 1].children[(bits >> (width - i)) & 1] = None
+        self._networks.pop(network, None)
+
+    @staticmethod
+    def _parse(address: str) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+        try:
+            parsed = ipaddress.ip_address(address.strip())
+        except (AttributeError, ValueError):
+            return None # e.g. "auto:ip"
+        if isinstance(parsed, ipaddress.IPv6Address) and parsed.ipv4_mapped is not None:
+            return parsed.ipv4_mapped
+        return parsed
+
+    def add(self, network: Union[str, ipaddress.IPv4Network, ipaddress.IPv6Network], raw: Mapping[str, Any]) -> None:
+        """Cache raw IP data for a network, e.g. to preload known networks
+
+        Parameters
+        ------------
+        network: Union[:class:`str`, :class:`ipaddress.IPv4Network`, :class:`ipaddress.IPv6Network`]
+            Network in CIDR notation, e.g. ``"203.0.113.0/24"``
+        raw: Mapping[:class:`str`, Any]
+            Raw data of an ``ip.json`` response
+        """
+        network = ipaddress.ip_network(network, strict=False)
+        bits, length = int(network.network_address), network.prefixlen
+        width = network.max_prefixlen
+        with self._lock:
+            node = self._roots[network.version]
+            for i in range(length):
+                bit = (bits >> (width - 1 - i)) & 1
+                child = node.children[bit]
+                if child is None:
+                    child = node.children[bit] = _Node()
+                node = child
+            node.entry = (self.clock() + self.ttl, raw)
+            key = (network.version, bits, length)
+            self._networks[key] = None
+            self._networks.move_to_end(key)
+            while len(self._networks) > self.maxsize:
+                self._remove(next(iter(self._networks)))
+
+    def put(self, address: str, raw: Mapping[str, Any]) -> bool:
+        """Cache raw IP data for the network of an address
+
+        Returns
+        ---------
+        :class:`bool`
+            ``False`` if the address is not a valid IP address
+        """
+        parsed = self._parse(address)
+        if parsed is None:
+            return False
+        prefix = self.ipv4_prefix if parsed.version == 4 else self.ipv6_prefix
+        self.add(ipaddress.ip_network((parsed, prefix), strict=False), raw)
+        return True
+
+    def get(self, address: str) -> Optional[Dict[str, Any]]:
+        """Get cached raw IP data of the longest network containing an address
+
+        Returns
+        ---------
+        Optional[Dict[:class:`str`, Any]]
+            A copy of cached data with the ``ip`` field set to ``address`` as given (and the ``type`` of the address),
+            ``None`` if nothing is cached
+        """
+        parsed = self._parse(address)
+        if parsed is None:
+            return None
+        bits, width, version = int(parsed), parsed.max_prefixlen, parsed.version
+        now = self.clock()
+        with self._lock:
+            node: Optional[_Node] = self._roots[version]
+            found, found_depth = None, 0
+            expired = []
+            depth = 0
+            while node is not None:
+                entry = node.entry
+                if entry is not None:
+                    if entry[0] > now:
+                        found, found_depth = entry[1], depth
+                    else:
+                        expired.append(depth)
+                if depth == width:
+                    break
+                node = node.children[(bits >> (width - 1 - depth)) & 1]
+                depth += 1
+            for length in expired:
+                self._remove(_network_key(version, bits, width, length))
+            if found is None:
+                return None
+            self._networks.move_to_end(_network_key(version, bits, width, found_depth))
+            self.hits += 1
+        # IPv4-mapped IPv6 addresses are looked up as IPv4, but the result keeps the address and type that was asked for
+        queried = address.strip()
+        return {**found, "ip": queried, "type": "ipv4" if ":" not in queried else "ipv6"}
+
+    def clear(self) -> None:
+        """Remove all cached data"""
+        with self._lock:
+            self._roots = {4: _Node(), 6: _Node()}
+            self._networks.clear()
@@ -0,0 +1,81 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import threading
+import time
+from typing import (
+    Optional,
+)
+
+__all__ = (
+    "RateLimiter",
+)
+
+class RateLimiter():
+    """A thread-safe token bucket limiting how many API calls are made per second.
+
+    Parameters
+    ------------
+    rate: :class:`float`
+        Maximum number of calls per second
+    burst: Optional[:class:`int`]
+        Maximum number of calls that can be made at once, after the limiter was idle. Defaults to ``1``
+
+    Attributes
+    ------------
+    rate: :class:`float`
+        Maximum number of calls per second
+    burst: :class:`int`
+        Size of the bucket
+    """
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        if rate <= 0:
+            raise ValueError("Rate should be a positive number")
+        self.rate: float = rate
+        self.burst: int = burst or 1
+        self._tokens: float = float(self.burst)
+        self._updated: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token from the bucket, without waiting.
+
+        Returns
+        ---------
+        :class:`float`
+            Number of seconds the caller should wait before making the call
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """Wait until a call can be made"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,181 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import logging
+import threading
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+__all__ = (
+    "Ok",
+    "Err",
+    "ErrorStats",
+)
+
+T = TypeVar("T")
+
+class Ok(Generic[T]):
+    """A successful result of a client method, returned when the client was created with ``results=True``.
+
+    .. container:: operations
+
+        .. describe:: bool(x)
+
+            Always ``True``
+
+    Attributes
+    ------------
+    value: Any
+        Returned model
+    """
+    __slots__ = ("value",)
+    ok = True
+
+    def __init__(self, value: T) -> None:
+        self.value: T = value
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Ok) and other.value == self.value
+
+    def __hash__(self) -> int:
+        return hash((Ok, self.value))
+
+    def __repr__(self) -> str:
+        return f"Ok({self.value!r})"
+
+    def unwrap(self) -> T:
+        """Get the returned model"""
+        return self.value
+
+class Err():
+    """A failed result of a client method, returned when the client was created with ``results=True``.
+
+    .. container:: operations
+
+        .. describe:: bool(x)
+
+            Always ``False``
+
+    Attributes
+    ------------
+    error: :exc:`Exception`
+        The raised exception. Its traceback is not formatted
+    func: :class:`str`
+        Name of the failed method
+    """
+    __slots__ = ("error", "func")
+    ok = False
+
+    def __init__(self, error: Exception, func: str) -> None:
+        self.error: Exception = error
+        self.func: str = func
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return f"Err({self.func!r}, {self.error!r})"
+
+    def unwrap(self) -> Any:
+        """Raise the exception of this result"""
+        raise self.error
+
+Result = Union[Ok[T], Err]
+
+def unwrap_or_none(result: Any) -> Any:
+    """Get the model of a result, ``None`` for errors. Values that are not results are returned as they are"""
+    if isinstance(result, Ok):
+        return result.value
+    if isinstance(result, Err):
+        return None
+    return result
+
+class ErrorStats():
+    """Counts errors of a client by method and exception type, logging only a sample of them.
+
+    The first error of every method and exception type is logged, then every ``log_every``-th one.
+    Errors are logged as warnings of the ``weatherly`` logger, without tracebacks.
+
+    .. container:: operations
+
+        .. describe:: len(x)
+
+            Total number of errors
+
+    Parameters
+    ------------
+    log_every: :class:`int`
+        Log every n-th error of a method and exception type. Defaults to ``100``
+    logger: Optional[:class:`logging.Logger`]
+        Logger to use, defaults to the ``weatherly`` logger
+
+    Attributes
+    ------------
+    counts: Dict[Tuple[:class:`str`, :class:`str`], :class:`int`]
+        Number of errors by (method name, exception class name)
+    """
+    def __init__(self, log_every: int = 100, logger: Optional[logging.Logger] = None) -> None:
+        self.log_every: int = max(1, log_every)
+        self.logger: logging.Logger = logger or logging.getLogger("weatherly")
+        self.counts: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    def record(self, func: str, exc: Exception, log: bool = True) -> int:
+        """Count an error, and log it if it is sampled
+
+        Returns
+        ---------
+        :class:`int`
+            Number of errors of this method and exception type so far
+        """
+        key = (func, type(exc).__name__)
+        with self._lock:
+            count = self.counts[key] = self.counts.get(key, 0) + 1
+        if log and (count == 1 or count % self.log_every == 0):
+            self.logger.warning("%s failed with %s: %s (%d times)", func, key[1], exc, count)
+        return count
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[Tuple[str, str], int]]:
+        """Get the most common errors as ((method name, exception class name), count) pairs"""
+        with self._lock:
+            items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return items if n is None else items[:n]
+
+    def reset(self) -> None:
+        """Forget all counted errors"""
+        with self._lock:
+            self.counts.clear()
@@ -0,0 +1,338 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from ..models import CurrentWeatherData
+from .ratelimit import RateLimiter
+from .results import unwrap_or_none
+
+if TYPE_CHECKING:
+    from .client import Client
+
+__all__ = (
+    "PollScheduler",
+)
+
+class _PollState():
+    __slots__ = ("last_updated", "interval", "next_at", "stale", "failures")
+
+    def __init__(self, interval: float, next_at: float) -> None:
+        self.last_updated: Optional[int] = None
+        self.interval: float = interval # estimated time between updates of the API
+        self.next_at: float = next_at
+        self.stale: int = 0 # fetches in a row that returned already seen data
+        self.failures: int = 0
+
+class PollScheduler():
+    """Polls current weather of many locations, fetching a location only when new data is expected.
+
+    WeatherAPI updates current weather every few minutes. For every location, the scheduler tracks
+    ``last_updated_epoch`` of :class:`CurrentWeatherData`, estimates the update interval (an exponentially weighted
+    moving average of observed intervals) and fetches the location again shortly after the next update is expected.
+    When a fetch returns already seen data, the location is retried after a growing delay.
+    A random jitter is added to every planned fetch, so calls of many locations are spread over time instead of being made in bursts.
+
+    .. code:: python
+
+        scheduler = weatherly.PollScheduler(client, queries, rate_limit=20)
+        scheduler.run(lambda query, weather: print(query, weather.temp_c))
+
+    Parameters
+    ------------
+    client: :class:`Client`
+        Client used to fetch data
+    queries: Iterable[:class:`str`]
+        Locations to poll
+    interval: :class:`float`
+        Initial estimate of the update interval, in seconds. Defaults to ``900`` (15 minutes)
+    min_interval: :class:`float`
+        Minimum update interval estimate, in seconds. Defaults to ``300``
+    max_interval: :class:`float`
+        Maximum update interval estimate, in seconds. Defaults to ``3600``
+    smoothing: :class:`float`
+        Weight of the newest observed interval in the moving average, between ``0`` and ``1``. Defaults to ``0.3``
+    grace: :class:`float`
+        Seconds to wait after the expected update before fetching, as the API publishes updates with a delay. Defaults to ``60``
+    retry: :class:`float`
+        Delay before fetching again after stale data or an error, doubled with every retry (up to the interval). Defaults to ``60``
+    jitter: :class:`float`
+        Maximum random delay added to every planned fetch, as a fraction of the interval. Defaults to ``0.05``
+    stagger: :class:`float`
+        The first fetch of an added location is planned at a random time within this fraction of the interval,
+        so many locations added at once are not all due at once. ``0`` fetches them on the next :meth:`poll`. Defaults to ``1``
+    max_workers: :class:`int`
+        Maximum number of concurrent calls, made from a thread pool kept until :meth:`close`. Defaults to ``4``
+    rate_limit: Optional[Union[:class:`float`, :class:`RateLimiter`]]
+        Maximum number of calls per second, or a rate limiter shared with other jobs. No limit by default
+    clock: Callable[[], :class:`float`]
+        Function returning the current time as an epoch. Defaults to :func:`time.time`
+    kwargs: Dict[:class:`str`, Any]
+        Additional keyword arguments passed to :meth:`Client.get_current_weather`
+
+    Attributes
+    ------------
+    calls: :class:`int`
+        Number of made calls
+    stale_calls: :class:`int`
+        Number of calls that returned already seen data
+    """
+    def __init__(
+        self,
+        client: "Client",
+        queries: Iterable[str] = (),
+        *,
+        interval: float = 900,
+        min_interval: float = 300,
+        max_interval: float = 3600,
+        smoothing: float = 0.3,
+        grace: float = 60,
+        retry: float = 60,
+        jitter: float = 0.05,
+        stagger: float = 1.0,
+        max_workers: int = 4,
+        rate_limit: Optional[Union[float, RateLimiter]] = None,
+        clock: Callable[[], float] = time.time,
+        **kwargs: Any
+    ) -> None:
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing should be between 0 and 1")
+        self.client = client
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.grace = grace
+        self.retry = retry
+        self.jitter = jitter
+        self.stagger = stagger
+        self.max_workers = max_workers
+        self.limiter: Optional[RateLimiter] = (
+            RateLimiter(rate_limit) if isinstance(rate_limit, (int, float)) else rate_limit
+        )
+        self.clock = clock
+        self.kwargs = kwargs
+        self.calls: int = 0
+        self.stale_calls: int = 0
+
+        self._states: Dict[str, _PollState] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._random = random.Random()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        for query in queries:
+            self.add(query)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, query: str) -> bool:
+        return query in self._states
+
+    def add(self, query: str) -> None:
+        """Start polling a location, its first fetch is planned within ``stagger`` of the interval"""
+        with self._lock:
+            if query in self._states:
+                return
+            next_at = self.clock() + self._random.uniform(0, self.stagger * self.interval)
+            state = self._states[query] = _PollState(self.interval, next_at)
+            heapq.heappush(self._heap, (state.next_at, query))
+
+    def remove(self, query: str) -> None:
+        """Stop polling a location"""
+        with self._lock:
+            self._states.pop(query, None) # its heap entry is skipped when popped
+
+    def last_updated(self, query: str) -> Optional[int]:
+        """Get the latest seen ``last_updated_epoch`` of a location"""
+        return self._states[query].last_updated
+
+    def estimated_interval(self, query: str) -> float:
+        """Get the estimated update interval of a location, in seconds"""
+        return self._states[query].interval
+
+    def next_due(self) -> Optional[float]:
+        """Get the time of the next planned fetch as an epoch, ``None`` if no location is polled"""
+        with self._lock:
+            self._drop_outdated()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_outdated(self) -> None:
+        heap = self._heap
+        while heap:
+            next_at, query = heap[0]
+            state = self._states.get(query)
+            if state is not None and state.next_at == next_at:
+                return
+            heapq.heappop(heap)
+
+    def _pop_due(self, now: float) -> List[str]:
+        due = []
+        with self._lock:
+            while True:
+                self._drop_outdated()
+                if not self._heap or self._heap[0][0] > now:
+                    return due
+                due.append(heapq.heappop(self._heap)[1])
+
+    def _plan(self, query: str, state: _PollState, delay: float, now: float) -> None:
+        state.next_at = now + max(delay, 0.0) + self._random.uniform(0, self.jitter * state.interval)
+        heapq.heappush(self._heap, (state.next_at, query))
+
+    def update(self, query: str, data: Optional[CurrentWeatherData], now: Optional[float] = None) -> bool:
+        """Update the estimate of a location with fetched data and plan its next fetch.
+
+        This is called by :meth:`poll`, but can also be used with data fetched elsewhere.
+
+        Parameters
+        ------------
+        query: :class:`str`
+            Polled location
+        data: Optional[:class:`CurrentWeatherData`]
+            Fetched data, or ``None`` if the fetch failed
+        now: Optional[:class:`float`]
+            Time of the fetch, defaults to the current time
+
+        Returns
+        ---------
+        :class:`bool`
+            ``True`` if the data is newer than the previously seen data
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            state = self._states.get(query)
+            if state is None:
+                return False
+            if data is None:
+                state.failures += 1
+                self._plan(query, state, min(self.retry * 2 ** (state.failures - 1), state.interval), now)
+                return False
+            state.failures = 0
+
+            last_updated = data.last_updated_epoch
+            fresh = state.last_updated is None or last_updated > state.last_updated
+            if not fresh:
+                self.stale_calls += 1
+                state.stale += 1
+                self._plan(query, state, min(self.retry * 2 ** (state.stale - 1), state.interval), now)
+                return False
+
+            if state.last_updated is not None:
+                # when updates were missed, the observed gap spans many intervals
+                observed = last_updated - state.last_updated
+                observed /= max(1, round(observed / state.interval))
+                state.interval += self.smoothing * (observed - state.interval)
+                state.interval = min(max(state.interval, self.min_interval), self.max_interval)
+            state.last_updated = last_updated
+            state.stale = 0
+
+            expected = last_updated + state.interval + self.grace
+            if expected <= now: # the update is already late, check again soon
+                expected = now + self.retry
+            self._plan(query, state, expected - now, now)
+            return True
+
+    def _fetch(self, query: str) -> Optional[CurrentWeatherData]:
+        if self.limiter is not None:
+            self.limiter.acquire()
+        return unwrap_or_none(self.client.get_current_weather(query, **self.kwargs))
+
+    def poll(self, now: Optional[float] = None) -> List[Tuple[str, CurrentWeatherData]]:
+        """Fetch all locations that are due, and return the ones with new data.
+
+        Errors are passed to :meth:`Client.on_error`, and failed locations are retried later.
+
+        Parameters
+        ------------
+        now: Optional[:class:`float`]
+            Current time, defaults to the time returned by ``clock``
+
+        Returns
+        ---------
+        List[Tuple[:class:`str`, :class:`CurrentWeatherData`]]
+            Pairs of (query, data) with new data, stale data is skipped
+        """
+        now = self.clock() if now is None else now
+        due = self._pop_due(now)
+        if not due:
+            return []
+        if self.max_workers > 1 and len(due) > 1:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="weatherly-poll")
+            results = list(self._executor.map(self._fetch, due))
+        else:
+            results = [self._fetch(query) for query in due]
+
+        self.calls += len(due)
+        fresh = []
+        for query, data in zip(due, results):
+            if self.update(query, data, now) and data is not None:
+                fresh.append((query, data))
+        return fresh
+
+    def close(self) -> None:
+        """Shut down the thread pool used for concurrent calls. Polling again creates a new one"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def run(
+        self,
+        callback: Callable[[str, CurrentWeatherData], Any],
+        stop: Optional[threading.Event] = None,
+    ) -> None:
+        """Poll until ``stop`` is set, calling ``callback`` with every new data.
+
+        Parameters
+        ------------
+        callback: Callable[[:class:`str`, :class:`CurrentWeatherData`], Any]
+            Function called with the query and new data
+        stop: Optional[:class:`threading.Event`]
+            Event stopping the loop. Without it, this function never returns
+        """
+        stop = stop or threading.Event()
+        try:
+            while not stop.is_set():
+                for query, data in self.poll():
+                    callback(query, data)
+                due = self.next_due()
+                delay = 1.0 if due is None else due - self.clock()
+                if delay > 0:
+                    stop.wait(delay)
+        finally:
+            self.close()
@@ -0,0 +1,440 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import functools
+import hashlib
+import multiprocessing
+import queue
+from types import MappingProxyType
+from bisect import bisect, insort
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from ..models import CurrentWeatherData
+from .scheduler import PollScheduler
+
+if TYPE_CHECKING:
+    from .client import Client
+
+__all__ = (
+    "HashRing",
+    "ShardedPoller",
+)
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+class HashRing():
+    """A consistent hash ring, assigning keys (e.g. queries) to nodes (e.g. worker processes or machines).
+
+    Every node is placed on the ring many times (virtual nodes), so keys are spread evenly.
+    When a node joins or leaves, only keys of that node move, the rest keep their node.
+
+    Parameters
+    ------------
+    nodes: Iterable[:class:`str`]
+        Initial nodes of the ring
+    vnodes: :class:`int`
+        Number of virtual nodes per node. Defaults to ``64``
+
+    Attributes
+    ------------
+    vnodes: :class:`int`
+        Number of virtual nodes per node
+    """
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 64) -> None:
+        if vnodes < 1:
+            raise ValueError("vnodes should be at least 1")
+        self.vnodes: int = vnodes
+        self._nodes: Set[str] = set()
+        self._ring: List[Tuple[int, str]] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        """List[:class:`str`]: Nodes of the ring, sorted"""
+        return sorted(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self._nodes
+
+    def add(self, node: str) -> None:
+        """Add a node to the ring"""
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for i in range(self.vnodes):
+            insort(self._ring, (_hash(f"{node}#{i}"), node))
+
+    def remove(self, node: str) -> None:
+        """Remove a node from the ring"""
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        self._ring = [point for point in self._ring if point[1] != node]
+
+    def node_for(self, key: str) -> str:
+        """Get the node of a key
+
+        Raises
+        --------
+        LookupError
+            The ring is empty
+        """
+        if not self._ring:
+            raise LookupError("The hash ring has no nodes")
+        # first virtual node clockwise from the key, wrapping around
+        index = bisect(self._ring, (_hash(key), "")) % len(self._ring)
+        return self._ring[index][1]
+
+    def assign(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """Assign many keys to nodes
+
+        Returns
+        ---------
+        Dict[:class:`str`, List[:class:`str`]]
+            Keys by node, every node of the ring is included
+        """
+        assignment: Dict[str, List[str]] = {node: [] for node in self._nodes}
+        for key in keys:
+            assignment[self.node_for(key)].append(key)
+        return assignment
+
+def _plain(value: Any) -> Any:
+    # raw data of frozen models holds read-only mappings, which cannot be pickled
+    if isinstance(value, MappingProxyType):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_plain(item) for item in value]
+    return value
+
+def _worker(
+    name: str,
+    factory: Callable[[], "Client"],
+    queries: List[str],
+    commands: "multiprocessing.Queue[Tuple[str, Any]]",
+    results: "multiprocessing.Queue[Tuple[str, str, Tuple[Any, int, bool]]]",
+    handler: Optional[Callable[[str, CurrentWeatherData], Any]],
+    options: Dict[str, Any],
+) -> None:
+    scheduler = PollScheduler(factory(), queries, **options)
+    while True:
+        due = scheduler.next_due()
+        delay = 1.0 if due is None else min(max(due - scheduler.clock(), 0.0), 1.0)
+        try:
+            command, argument = commands.get(timeout=delay) if delay > 0 else commands.get_nowait()
+        except queue.Empty:
+            pass
+        else:
+            if command == "stop":
+                scheduler.close()
+                return
+            for query in argument:
+                (scheduler.add if command == "add" else scheduler.remove)(query)
+            continue
+        for query, data in scheduler.poll():
+            if handler is not None:
+                handler(query, data)
+                continue
+            # only the raw data is sent, the parent builds models when they are read
+            raw = _plain(data.raw) if data.frozen else data.raw
+            results.put((name, query, (raw, data.status, data.frozen)))
+
+class ShardedPoller():
+    """Polls current weather of many locations in many worker processes, every worker running a :class:`PollScheduler`.
+
+    Locations are assigned to workers by consistent hashing (see :class:`HashRing`). When a worker is added or removed,
+    only the locations that changed their worker are moved. New data of every worker is sent to a shared result queue,
+    or processed by ``handler`` right in the worker, so the parent process does not become a bottleneck.
+
+    To scale across many machines, run a poller on every machine with the same ``nodes`` list and its own ``node`` name.
+    Every machine then polls only the locations assigned to it. When a machine joins or leaves, call :meth:`set_nodes`
+    with the new list on every machine, only the locations of that machine move.
+
+    .. note::
+        Pollers do not discover other machines, keeping ``nodes`` in sync (e.g. from a service registry) is up to the caller.
+        Until :meth:`set_nodes` is called, locations of a machine that went down are not polled.
+
+    .. code:: python
+
+        with weatherly.ShardedPoller("api-key", queries, workers=8, rate_limit=5) as poller:
+            for query, weather in poller.results():
+                print(query, weather.temp_c)
+
+        # process data in the workers, nothing is sent to this process
+        with weatherly.ShardedPoller("api-key", queries, workers=8, handler=save_weather) as poller:
+            time.sleep(3600)
+
+    Parameters
+    ------------
+    client: Union[:class:`str`, Callable[[], :class:`Client`]]
+        API key, or a function creating a :class:`Client` in every worker. It has to be picklable (e.g. a module-level function)
+    queries: Iterable[:class:`str`]
+        Locations to poll
+    workers: :class:`int`
+        Number of worker processes. Defaults to the number of CPUs
+    node: Optional[:class:`str`]
+        Name of this machine, one of ``nodes``
+    nodes: Optional[Iterable[:class:`str`]]
+        Names of all machines polling the same locations
+    vnodes: :class:`int`
+        Number of virtual nodes per worker or machine on the hash rings. Defaults to ``64``
+    handler: Optional[Callable[[:class:`str`, :class:`CurrentWeatherData`], Any]]
+        Function called in the worker processes with (query, data) of new data. It has to be picklable (e.g. a module-level function).
+        When given, data is not sent to :meth:`results`
+    context: Optional[:class:`str`]
+        :mod:`multiprocessing` start method, e.g. ``"spawn"``. Defaults to the platform default
+    kwargs: Dict[:class:`str`, Any]
+        Keyword arguments passed to :class:`PollScheduler` in every worker (``rate_limit`` is a limit per worker)
+
+    Attributes
+    ------------
+    node: Optional[:class:`str`]
+        Name of this machine
+    queries: List[:class:`str`]
+        Locations polled by this machine
+    """
+    def __init__(
+        self,
+        client: Union[str, Callable[[], "Client"]],
+        queries: Iterable[str],
+        *,
+        workers: Optional[int] = None,
+        node: Optional[str] = None,
+        nodes: Optional[Iterable[str]] = None,
+        vnodes: int = 64,
+        handler: Optional[Callable[[str, CurrentWeatherData], Any]] = None,
+        context: Optional[str] = None,
+        **kwargs: Any
+    ) -> None:
+        if isinstance(client, str):
+            from .client import Client
+            client = functools.partial(Client, client)
+        self._factory: Callable[[], "Client"] = client
+        self._options = kwargs
+        self._handler = handler
+        self._context = multiprocessing.get_context(context)
+        self._results = self._context.Queue()
+
+        if nodes is not None and node is None:
+            raise ValueError("node is required when nodes are given")
+        self.node: Optional[str] = node
+        self._all_queries: List[str] = list(dict.fromkeys(queries))
+        self._machines: Optional[HashRing] = HashRing(nodes, vnodes) if nodes is not None else None
+        self.queries: List[str] = self._own_queries()
+
+        self._ring = HashRing((f"worker-{i}" for i in range(workers or multiprocessing.cpu_count())), vnodes)
+        self._assignment: Dict[str, List[str]] = self._ring.assign(self.queries)
+        self._processes: Dict[str, Any] = {}
+        self._commands: Dict[str, Any] = {}
+        self._next_worker = len(self._ring)
+
+    @property
+    def workers(self) -> List[str]:
+        """List[:class:`str`]: Names of the workers"""
+        return self._ring.nodes
+
+    @property
+    def assignment(self) -> Dict[str, List[str]]:
+        """Dict[:class:`str`, List[:class:`str`]]: Locations of every worker"""
+        return {worker: list(queries) for worker, queries in self._assignment.items()}
+
+    def _spawn(self, worker: str) -> None:
+        commands = self._context.Queue()
+        process = self._context.Process(
+            target=_worker,
+            args=(worker, self._factory, self._assignment[worker], commands, self._results, self._handler, self._options),
+            name=f"weatherly-{worker}",
+            daemon=True,
+        )
+        process.start()
+        self._commands[worker] = commands
+        self._processes[worker] = process
+
+    def start(self) -> None:
+        """Start all worker processes"""
+        for worker in self._assignment:
+            if worker not in self._processes:
+                self._spawn(worker)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop all worker processes, waiting up to ``timeout`` seconds for each of them"""
+        for commands in self._commands.values():
+            commands.put(("stop", None))
+        for process in self._processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes.clear()
+        self._commands.clear()
+
+    def __enter__(self) -> "ShardedPoller":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def _rebalance(self) -> Dict[str, List[str]]:
+        assignment = self._ring.assign(self.queries)
+        moved: Dict[str, List[str]] = {}
+        for worker, queries in self._assignment.items():
+            if worker not in assignment:
+                continue
+            kept = set(assignment[worker])
+            lost = [query for query in queries if query not in kept]
+            if lost and worker in self._commands:
+                self._commands[worker].put(("remove", lost))
+        for worker, queries in assignment.items():
+            previous = set(self._assignment.get(worker, ()))
+            gained = [query for query in queries if query not in previous]
+            if gained:
+                moved[worker] = gained
+                if worker in self._commands:
+                    self._commands[worker].put(("add", gained))
+        self._assignment = assignment
+        return moved
+
+    def _own_queries(self) -> List[str]:
+        if self._machines is None:
+            return list(self._all_queries)
+        return [query for query in self._all_queries if self._machines.node_for(query) == self.node]
+
+    def set_nodes(self, nodes: Iterable[str]) -> Dict[str, List[str]]:
+        """Change the machines polling the same locations, e.g. when a machine joins or leaves.
+
+        Locations that moved to other machines stop being polled here, locations that moved to this machine
+        are given to its workers (running workers get them right away).
+
+        Parameters
+        ------------
+        nodes: Iterable[:class:`str`]
+            Names of all machines, including this one
+
+        Returns
+        ---------
+        Dict[:class:`str`, List[:class:`str`]]
+            Locations that this machine took over, by worker
+
+        Raises
+        --------
+        ValueError
+            This poller was created without ``nodes``, or its ``node`` is not in ``nodes``
+        """
+        if self._machines is None:
+            raise ValueError("set_nodes requires a poller created with node and nodes")
+        nodes = set(nodes)
+        if self.node not in nodes:
+            raise ValueError(f"nodes should include this machine ({self.node!r})")
+        for machine in set(self._machines.nodes) - nodes:
+            self._machines.remove(machine)
+        for machine in nodes:
+            self._machines.add(machine)
+        self.queries = self._own_queries()
+        return self._rebalance()
+
+    def add_worker(self) -> str:
+        """Add a worker, moving some locations of other workers to it.
+
+        Returns
+        ---------
+        :class:`str`
+            Name of the new worker
+        """
+        worker = f"worker-{self._next_worker}"
+        self._next_worker += 1
+        self._ring.add(worker)
+        started = bool(self._processes)
+        self._rebalance()
+        if started:
+            self._spawn(worker)
+        return worker
+
+    def remove_worker(self, worker: str) -> None:
+        """Stop a worker, moving its locations to other workers
+
+        Raises
+        --------
+        KeyError
+            No worker with given name
+        ValueError
+            The last worker cannot be removed
+        """
+        if worker not in self._ring:
+            raise KeyError(worker)
+        if len(self._ring) == 1:
+            raise ValueError("Cannot remove the last worker")
+        self._ring.remove(worker)
+        commands, process = self._commands.pop(worker, None), self._processes.pop(worker, None)
+        if commands is not None:
+            commands.put(("stop", None))
+            process.join(5.0)
+            if process.is_alive():
+                process.terminate()
+        self._rebalance()
+
+    def results(
+        self,
+        timeout: Optional[float] = None,
+        *,
+        raw: bool = False
+    ) -> Iterator[Tuple[str, Union[CurrentWeatherData, Dict[str, Any]]]]:
+        """Iterate over new data from all workers.
+
+        Parameters
+        ------------
+        timeout: Optional[:class:`float`]
+            Stop iterating when no data arrives for this many seconds. Without it, iterate forever
+        raw: :class:`bool`
+            Yield raw data (as returned by the API) instead of building :class:`CurrentWeatherData`. Defaults to ``False``
+
+        Returns
+        ---------
+        Iterator[Tuple[:class:`str`, Union[:class:`CurrentWeatherData`, Dict[:class:`str`, Any]]]]
+            Pairs of (query, data)
+        """
+        while True:
+            try:
+                _, query, (data, status, frozen) = self._results.get(timeout=timeout)
+            except queue.Empty:
+                return
+            if raw:
+                yield query, data
+                continue
+            weather = CurrentWeatherData(data, status, None)
+            yield query, weather.freeze() if frozen else weather
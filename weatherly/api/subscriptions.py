@@ -0,0 +1,413 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from ..models import BulkResponse, CurrentWeatherData, ForecastData, HourlyColumns
+
+if TYPE_CHECKING:
+    from .client import Client
+
+__all__ = (
+    "ChangeEvent",
+    "Subscription",
+    "Subscriptions",
+)
+
+class ChangeEvent(NamedTuple):
+    """A meaningful change of weather data, passed to subscription callbacks.
+
+    Attributes
+    ------------
+    kind: :class:`str`
+        ``"change"``, ``"crossing"`` or ``"alert"``
+    location: Hashable
+        Key of the location, see :class:`Subscriptions`
+    field: Optional[:class:`str`]
+        Changed field, ``None`` for alerts
+    time_epoch: Optional[:class:`int`]
+        Target hour of a forecast change, ``None`` for current weather and alerts
+    old: Any
+        Previous value (the value of the last fired event for ``"change"``), ``None`` for alerts
+    new: Any
+        New value, or the new :class:`AlertData`
+    data: Any
+        Model the change was found in
+    """
+    kind: str
+    location: Hashable
+    field: Optional[str]
+    time_epoch: Optional[int]
+    old: Any
+    new: Any
+    data: Any
+
+class Subscription():
+    """A registered callback of :class:`Subscriptions`, use it to unsubscribe.
+
+    Attributes
+    ------------
+    kind: :class:`str`
+        ``"change"``, ``"crossing"`` or ``"alert"``
+    field: Optional[:class:`str`]
+        Watched field
+    value: Optional[:class:`float`]
+        Threshold of a change, or level of a crossing
+    direction: :class:`str`
+        Direction of a crossing, ``"up"``, ``"down"`` or ``"both"``
+    source: :class:`str`
+        Watched data, ``"current"``, ``"forecast"`` or ``"any"``
+    callback: Callable[[:class:`ChangeEvent`], Any]
+        Function called with every event
+    """
+    def __init__(
+        self,
+        kind: str,
+        field: Optional[str],
+        value: Optional[float],
+        direction: str,
+        source: str,
+        callback: Callable[[ChangeEvent], Any],
+    ) -> None:
+        self.kind = kind
+        self.field = field
+        self.value = value
+        self.direction = direction
+        self.source = source
+        self.callback = callback
+        # last reported value of "change" subscriptions: location -> time_epoch -> value
+        self._baselines: Dict[Hashable, Dict[Optional[int], float]] = {}
+
+    def __repr__(self) -> str:
+        return f"<Subscription kind={self.kind!r} field={self.field!r} value={self.value!r}>"
+
+def _location_key(data: Any) -> Hashable:
+    location = data.location
+    return (location.name, location.region, location.country)
+
+def _expires_epoch(expires: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(expires).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+class Subscriptions():
+    """Fires callbacks when weather data of a location changes meaningfully, instead of on every fetched model.
+
+    Successive :class:`CurrentWeatherData` of a location are compared field by field, and successive :class:`ForecastData`
+    are compared hour by hour (hours are matched by ``time_epoch``). Only watched fields are converted into
+    :class:`HourlyColumns` and compared, so unchanged data costs very little.
+
+    Attach it to a client to process every model the client returns (through the ``on_data`` event),
+    or pass models to :meth:`process` directly. Events of a client are processed in its event thread,
+    use :meth:`EventBus.flush` to wait for them.
+
+    .. code:: python
+
+        subscriptions = weatherly.Subscriptions(client)
+        subscriptions.on_change("temp_c", 2, lambda event: print(f"{event.old} -> {event.new}"))
+        subscriptions.on_crossing("chance_of_rain", 50, notify, source="forecast", direction="up")
+        subscriptions.on_alert(lambda event: print(event.new.headline))
+
+    Parameters
+    ------------
+    client: Optional[:class:`Client`]
+        Client to attach to, see :meth:`attach`
+    key: Optional[Callable[[Any], Hashable]]
+        Function returning the location key of a model. Defaults to name, region and country of ``data.location``
+    clock: Callable[[], :class:`float`]
+        Function returning the current time as an epoch, used to forget expired alerts. Defaults to :func:`time.time`
+    """
+    def __init__(
+        self,
+        client: Optional["Client"] = None,
+        key: Optional[Callable[[Any], Hashable]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.key: Callable[[Any], Hashable] = key or _location_key
+        self.clock = clock
+        self._subscriptions: List[Subscription] = []
+        self._current: Dict[Hashable, Dict[str, float]] = {}
+        self._forecasts: Dict[Hashable, HourlyColumns] = {}
+        # seen alerts of every location, with their expiry time (None when it cannot be parsed)
+        self._alerts: Dict[Hashable, Dict[Tuple[str, str, str], Optional[float]]] = {}
+        self._lock = threading.RLock()
+        if client is not None:
+            self.attach(client)
+
+    def attach(self, client: "Client") -> None:
+        """Process every model returned by a client, by listening to its ``on_data`` event"""
+        client.events.add_listener("on_data", self.process)
+
+    def detach(self, client: "Client") -> None:
+        """Stop processing models returned by a client"""
+        client.events.remove_listener("on_data", self.process)
+
+    def _add(self, *args: Any) -> Subscription:
+        subscription = Subscription(*args)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def on_change(
+        self,
+        field: str,
+        threshold: float,
+        callback: Callable[[ChangeEvent], Any],
+        *,
+        source: Literal["current", "forecast", "any"] = "any",
+    ) -> Subscription:
+        """Call ``callback`` when a field moves by at least ``threshold`` since the last event (or the first seen value).
+
+        Parameters
+        ------------
+        field: :class:`str`
+            Numeric field, e.g. ``"temp_c"``
+        threshold: :class:`float`
+            Minimum absolute change
+        callback: Callable[[:class:`ChangeEvent`], Any]
+            Function called with every event
+        source: :class:`str`
+            Watch ``"current"`` weather, ``"forecast"`` hours or ``"any"`` of them. Defaults to ``"any"``
+
+        Returns
+        ---------
+        :class:`Subscription`
+            The created subscription
+        """
+        if threshold <= 0:
+            raise ValueError("threshold should be positive")
+        return self._add("change", field, threshold, "both", source, callback)
+
+    def on_crossing(
+        self,
+        field: str,
+        level: float,
+        callback: Callable[[ChangeEvent], Any],
+        *,
+        direction: Literal["up", "down", "both"] = "both",
+        source: Literal["current", "forecast", "any"] = "any",
+    ) -> Subscription:
+        """Call ``callback`` when a field crosses ``level`` between two successive models.
+
+        A value crosses the level upwards when it goes from below ``level`` to ``level`` or above, and downwards otherwise.
+
+        Parameters
+        ------------
+        field: :class:`str`
+            Numeric field, e.g. ``"chance_of_rain"``
+        level: :class:`float`
+            Watched level
+        callback: Callable[[:class:`ChangeEvent`], Any]
+            Function called with every event
+        direction: :class:`str`
+            Watch crossings ``"up"``, ``"down"`` or ``"both"``. Defaults to ``"both"``
+        source: :class:`str`
+            Watch ``"current"`` weather, ``"forecast"`` hours or ``"any"`` of them. Defaults to ``"any"``
+
+        Returns
+        ---------
+        :class:`Subscription`
+            The created subscription
+        """
+        return self._add("crossing", field, level, direction, source, callback)
+
+    def on_alert(self, callback: Callable[[ChangeEvent], Any]) -> Subscription:
+        """Call ``callback`` with every new alert of a :class:`ForecastData`
+
+        Returns
+        ---------
+        :class:`Subscription`
+            The created subscription
+        """
+        return self._add("alert", None, None, "both", "forecast", callback)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription"""
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def process(self, data: Any) -> List[ChangeEvent]:
+        """Compare a model with the previous model of its location and fire events.
+
+        :class:`BulkResponse` objects are processed model by model, other models are ignored.
+
+        Parameters
+        ------------
+        data: Any
+            A :class:`CurrentWeatherData`, :class:`ForecastData` or :class:`BulkResponse`
+
+        Returns
+        ---------
+        List[:class:`ChangeEvent`]
+            Fired events
+        """
+        if isinstance(data, BulkResponse):
+            return [event for _, item in data.data for event in self.process(item)]
+        if isinstance(data, CurrentWeatherData):
+            source = "current"
+        elif isinstance(data, ForecastData):
+            source = "forecast"
+        else:
+            return []
+
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if s.source in (source, "any")]
+            if not subscriptions:
+                return []
+            location = self.key(data)
+            fields = list(dict.fromkeys(s.field for s in subscriptions if s.field is not None))
+            if source == "current":
+                events = self._compare_current(location, data, fields, subscriptions)
+            else:
+                events = self._compare_forecast(location, data, fields, subscriptions)
+        for event, subscription in events:
+            subscription.callback(event)
+        return [event for event, _ in events]
+
+    def _compare_current(
+        self, location: Hashable, data: CurrentWeatherData, fields: List[str], subscriptions: List[Subscription]
+    ) -> List[Tuple[ChangeEvent, Subscription]]:
+        columns = HourlyColumns.from_current(data, fields)
+        new = {field: columns.columns[field][0] for field in fields}
+        old = self._current.get(location, {})
+        self._current[location] = new
+        events = []
+        for subscription in subscriptions:
+            field = subscription.field
+            if field is None:
+                continue
+            event = self._check(subscription, location, None, old.get(field), new[field], data)
+            if event is not None:
+                events.append((event, subscription))
+        return events
+
+    def _compare_forecast(
+        self, location: Hashable, data: ForecastData, fields: List[str], subscriptions: List[Subscription]
+    ) -> List[Tuple[ChangeEvent, Subscription]]:
+        events = []
+        alert_subscriptions = [s for s in subscriptions if s.kind == "alert"]
+        if alert_subscriptions:
+            now = self.clock()
+            seen = self._alerts.setdefault(location, {})
+            present: Set[Tuple[str, str, str]] = set()
+            for alert in data.alerts:
+                key = (alert.headline, alert.event, alert.effective)
+                present.add(key)
+                if key in seen:
+                    continue
+                expires = _expires_epoch(alert.expires)
+                if expires is not None and expires <= now:
+                    continue
+                seen[key] = expires
+                for subscription in alert_subscriptions:
+                    events.append((ChangeEvent("alert", location, None, None, None, alert, data), subscription))
+            # forget expired alerts, and alerts without a valid expiry time once they are not returned anymore
+            for key, expires in list(seen.items()):
+                if (expires is not None and expires <= now) or (expires is None and key not in present):
+                    del seen[key]
+            if not seen:
+                del self._alerts[location]
+
+        if not fields:
+            return events
+        columns = HourlyColumns.from_hours(data.iter_hours(), fields)
+        previous = self._forecasts.get(location)
+        self._forecasts[location] = columns
+
+        # join the hours of both forecasts once, every subscription reuses the matched rows
+        rows: List[Tuple[int, int]] = []
+        if previous is not None:
+            index = {epoch: i for i, epoch in enumerate(previous.epochs)}
+            rows = [(i, index[epoch]) for i, epoch in enumerate(columns.epochs) if epoch in index]
+        for subscription in subscriptions:
+            field = subscription.field
+            if field is None or field not in columns:
+                continue
+            new_values = columns.columns[field]
+            if subscription.kind == "change":
+                # hours before the first hour of the forecast are in the past, their baselines are not needed anymore
+                baselines = subscription._baselines.get(location)
+                if baselines and len(columns.epochs):
+                    first = min(columns.epochs)
+                    for epoch in [epoch for epoch in baselines if epoch is not None and epoch < first]:
+                        del baselines[epoch]
+                # compared with the last reported value of every hour, not with the previous forecast
+                for i, epoch in enumerate(columns.epochs):
+                    event = self._check(subscription, location, epoch, None, new_values[i], data)
+                    if event is not None:
+                        events.append((event, subscription))
+                continue
+            if previous is None or field not in previous:
+                continue
+            old_values = previous.columns[field]
+            # compare values of all matched hours first, and only check the few that differ
+            for i, j in [(i, j) for i, j in rows if new_values[i] != old_values[j]]:
+                event = self._check(subscription, location, columns.epochs[i], old_values[j], new_values[i], data)
+                if event is not None:
+                    events.append((event, subscription))
+        return events
+
+    def _check(
+        self,
+        subscription: Subscription,
+        location: Hashable,
+        time_epoch: Optional[int],
+        old: Optional[float],
+        new: float,
+        data: Any,
+    ) -> Optional[ChangeEvent]:
+        if new != new: # missing value
+            return None
+        if subscription.kind == "change":
+            baselines = subscription._baselines.setdefault(location, {})
+            base = baselines.setdefault(time_epoch, new)
+            if abs(new - base) < subscription.value: # type: ignore
+                return None
+            baselines[time_epoch] = new
+            return ChangeEvent("change", location, subscription.field, time_epoch, base, new, data)
+
+        if old is None or old != old:
+            return None
+        level = subscription.value
+        up = old < level <= new # type: ignore
+        down = new < level <= old # type: ignore
+        if (up and subscription.direction != "down") or (down and subscription.direction != "up"):
+            return ChangeEvent("crossing", location, subscription.field, time_epoch, old, new, data)
+        return None
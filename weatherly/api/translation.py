@@ -0,0 +1,170 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import functools
+import json
+import os
+import threading
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from ..enums import Languages
+from ..utils import find_language
+
+__all__ = (
+    "ConditionTranslator",
+)
+
+# endpoints returning weather conditions, their text depends on the requested language
+TRANSLATED_ENDPOINTS: Tuple[str, ...] = ("current.json", "forecast.json", "history.json", "future.json", "marine.json")
+
+# texts of every weather condition, WeatherAPI's conditions.json bundled as package data
+CONDITIONS_FILE: str = os.path.join(os.path.dirname(__file__), "conditions.json")
+
+@functools.lru_cache(maxsize=None)
+def _bundled_conditions() -> List[Dict[str, Any]]:
+    with open(CONDITIONS_FILE, encoding="utf-8") as file:
+        return json.load(file)
+
+def _language(lang: Optional[Union[str, Languages]]) -> Optional[str]:
+    # language code of a Languages member, name or code. None stands for English, the language of the API by default
+    if lang is None:
+        return None
+    return find_language(lang) or str(lang)
+
+class ConditionTranslator():
+    """Translates weather condition texts locally, by condition code.
+
+    Weather data differs between languages only in condition texts, so with ``Client(translate=...)`` a request
+    in any language is made (and cached) once without ``lang``, and its condition texts are translated with this table.
+
+    WeatherAPI's ``conditions.json`` (https://www.weatherapi.com/docs/conditions.json) is bundled and loaded by default.
+    Texts can be added from another table in the same format, and are learned from responses requested in a language.
+
+    .. container:: operations
+
+        .. describe:: x in y
+
+            Whether the table has texts of a language (a :class:`Languages` member, name or code)
+
+    Parameters
+    ------------
+    table: Optional[Union[:class:`str`, :class:`os.PathLike`, Iterable[Mapping[:class:`str`, Any]]]]
+        Path to a ``conditions.json`` file, or its parsed content. Texts are added to the bundled ones
+
+    Attributes
+    ------------
+    hits: :class:`int`
+        Number of responses translated locally
+    misses: :class:`int`
+        Number of responses with a condition that has no text in the requested language
+    """
+    def __init__(self, table: Optional[Union[str, os.PathLike, Iterable[Mapping[str, Any]]]] = None) -> None:
+        self.hits: int = 0
+        self.misses: int = 0
+        # language code (None for English) -> (condition code, is_day) -> text
+        self._texts: Dict[Optional[str], Dict[Tuple[int, bool], str]] = {}
+        self._lock = threading.Lock()
+        self.load(_bundled_conditions())
+        if table is not None:
+            self.load(table)
+
+    def __contains__(self, lang: Union[str, Languages]) -> bool:
+        return _language(lang) in self._texts
+
+    def load(self, table: Union[str, os.PathLike, Iterable[Mapping[str, Any]]]) -> None:
+        """Add texts from a table in the format of WeatherAPI's ``conditions.json``, or a path to such a file"""
+        if isinstance(table, (str, os.PathLike)):
+            with open(table, encoding="utf-8") as file:
+                table = json.load(file)
+        with self._lock:
+            for condition in table:
+                code = int(condition["code"])
+                english = self._texts.setdefault(None, {})
+                english[code, True] = condition["day"]
+                english[code, False] = condition["night"]
+                for language in condition.get("languages", []):
+                    texts = self._texts.setdefault(_language(language["lang_iso"]), {})
+                    texts[code, True] = language["day_text"]
+                    texts[code, False] = language["night_text"]
+
+    def text(self, code: int, lang: Optional[Union[str, Languages]] = None, is_day: bool = True) -> Optional[str]:
+        """Get text of a condition in a language (English by default), ``None`` if it is not known"""
+        return self._texts.get(_language(lang), {}).get((code, bool(is_day)))
+
+    def _walk(self, raw: Any, texts: Dict[Tuple[int, bool], str]) -> Any:
+        # a copy of raw data with translated conditions, KeyError if a text is missing
+        if isinstance(raw, list):
+            return [self._walk(elem, texts) for elem in raw]
+        if not isinstance(raw, Mapping):
+            return raw
+        translated = {key: self._walk(value, texts) for key, value in raw.items() if key != "condition"}
+        condition = raw.get("condition")
+        if isinstance(condition, Mapping) and "code" in condition:
+            translated["condition"] = {**condition, "text": texts[condition["code"], bool(raw.get("is_day", 1))]}
+        elif "condition" in raw:
+            translated["condition"] = condition
+        return translated
+
+    def translate(self, raw: Any, lang: Optional[Union[str, Languages]]) -> Optional[Any]:
+        """Translate condition texts of raw response data.
+
+        Returns
+        ---------
+        Optional[Any]
+            A translated copy of raw data, ``None`` if a condition has no text in the language
+        """
+        texts = self._texts.get(_language(lang))
+        try:
+            if texts is None:
+                raise KeyError(lang)
+            translated = self._walk(raw, texts)
+        except KeyError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return translated
+
+    def learn(self, raw: Any, lang: Optional[Union[str, Languages]]) -> None:
+        """Remember condition texts of raw response data requested in a language"""
+        texts: Dict[Tuple[int, bool], str] = {}
+        stack = [raw]
+        while stack:
+            elem = stack.pop()
+            if isinstance(elem, list):
+                stack.extend(elem)
+            elif isinstance(elem, Mapping):
+                condition = elem.get("condition")
+                if isinstance(condition, Mapping) and "code" in condition and "text" in condition:
+                    texts[condition["code"], bool(elem.get("is_day", 1))] = condition["text"]
+                stack.extend(value for value in elem.values() if isinstance(value, (list, Mapping)))
+        with self._lock:
+            self._texts.setdefault(_language(lang), {}).update(texts)
@@ -0,0 +1,356 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import datetime
+import math
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from zoneinfo import ZoneInfo
+
+from .models import AstronomicalData
+
+__all__ = (
+    "sun_times",
+    "moon_times",
+    "moon_phase",
+    "compute",
+    "compute_many",
+    "astronomical_data",
+)
+
+Date = Union[str, datetime.date]
+
+SUN_ALTITUDE = -0.833 # refraction and radius of the sun
+MOON_ALTITUDE = 0.125 # refraction, radius and mean horizontal parallax of the moon
+OBLIQUITY = math.radians(23.43929111)
+ARC = 206264.8062 # arcseconds in a radian
+
+PHASES = (
+    "New Moon", "Waxing Crescent", "First Quarter", "Waxing Gibbous",
+    "Full Moon", "Waning Gibbous", "Last Quarter", "Waning Crescent",
+)
+
+def _julian(epoch: float) -> float:
+    return epoch / 86400 + 2440587.5
+
+def _frac(x: float) -> float:
+    return x - math.floor(x)
+
+def _date(date: Date) -> datetime.date:
+    return datetime.date.fromisoformat(date) if isinstance(date, str) else date
+
+def _midnight(date: datetime.date, tz: datetime.tzinfo) -> Tuple[float, float]:
+    # epochs of the local midnight starting the day and the next one
+    start = datetime.datetime(date.year, date.month, date.day, tzinfo=tz).timestamp()
+    following = date + datetime.timedelta(days=1)
+    return start, datetime.datetime(following.year, following.month, following.day, tzinfo=tz).timestamp()
+
+def _format(epoch: Optional[float], tz: datetime.tzinfo, missing: str) -> str:
+    if epoch is None:
+        return missing
+    return datetime.datetime.fromtimestamp(round(epoch / 60) * 60, tz).strftime("%I:%M %p")
+
+def _sun(jd: float) -> Tuple[float, float, float]:
+    """Apparent longitude and declination (radians) and equation of time (minutes) of the sun, NOAA algorithm"""
+    jc = (jd - 2451545) / 36525
+    mean_long = math.radians((280.46646 + jc * (36000.76983 + jc * 0.0003032)) % 360)
+    mean_anom = math.radians(357.52911 + jc * (35999.05029 - 0.0001537 * jc))
+    ecc = 0.016708634 - jc * (0.000042037 + 0.0000001267 * jc)
+    center = (
+        math.sin(mean_anom) * (1.914602 - jc * (0.004817 + 0.000014 * jc))
+        + math.sin(2 * mean_anom) * (0.019993 - 0.000101 * jc)
+        + math.sin(3 * mean_anom) * 0.000289
+    )
+    omega = math.radians(125.04 - 1934.136 * jc)
+    app_long = math.radians(math.degrees(mean_long) + center - 0.00569 - 0.00478 * math.sin(omega))
+    mean_obliq = 23 + (26 + (21.448 - jc * (46.815 + jc * (0.00059 - jc * 0.001813))) / 60) / 60
+    obliq = math.radians(mean_obliq + 0.00256 * math.cos(omega))
+    declination = math.asin(math.sin(obliq) * math.sin(app_long))
+    y = math.tan(obliq / 2) ** 2
+    eq_time = 4 * math.degrees(
+        y * math.sin(2 * mean_long)
+        - 2 * ecc * math.sin(mean_anom)
+        + 4 * ecc * y * math.sin(mean_anom) * math.cos(2 * mean_long)
+        - 0.5 * y * y * math.sin(4 * mean_long)
+        - 1.25 * ecc * ecc * math.sin(2 * mean_anom)
+    )
+    return app_long, declination, eq_time
+
+def _moon(jd: float) -> Tuple[float, float, float, float]:
+    """Ecliptic longitude and latitude, right ascension and declination (radians) of the moon.
+
+    Low precision series of Montenbruck and Pfleger, accurate to a few arcminutes.
+    """
+    t = (jd - 2451545) / 36525
+    mean_long = _frac(0.606433 + 1336.855225 * t)
+    l = 2 * math.pi * _frac(0.374897 + 1325.552410 * t) # mean anomaly of the moon
+    ls = 2 * math.pi * _frac(0.993133 + 99.997361 * t) # mean anomaly of the sun
+    d = 2 * math.pi * _frac(0.827361 + 1236.853086 * t) # mean elongation
+    f = 2 * math.pi * _frac(0.259086 + 1342.227825 * t) # mean distance from the ascending node
+    dl = (
+        22640 * math.sin(l) - 4586 * math.sin(l - 2 * d) + 2370 * math.sin(2 * d) + 769 * math.sin(2 * l)
+        - 668 * math.sin(ls) - 412 * math.sin(2 * f) - 212 * math.sin(2 * l - 2 * d)
+        - 206 * math.sin(l + ls - 2 * d) + 192 * math.sin(l + 2 * d) - 165 * math.sin(ls - 2 * d)
+        - 125 * math.sin(d) - 110 * math.sin(l + ls) + 148 * math.sin(l - ls) - 55 * math.sin(2 * f - 2 * d)
+    )
+    s = f + (dl + 412 * math.sin(2 * f) + 541 * math.sin(ls)) / ARC
+    h = f - 2 * d
+    n = (
+        -526 * math.sin(h) + 44 * math.sin(l + h) - 31 * math.sin(-l + h) - 23 * math.sin(ls + h)
+        + 11 * math.sin(-ls + h) - 25 * math.sin(-2 * l + f) + 21 * math.sin(-l + f)
+    )
+    longitude = 2 * math.pi * _frac(mean_long + dl / 1296000)
+    latitude = (18520 * math.sin(s) + n) / ARC
+
+    x = math.cos(latitude) * math.cos(longitude)
+    y = math.cos(latitude) * math.sin(longitude)
+    z = math.sin(latitude)
+    y, z = y * math.cos(OBLIQUITY) - z * math.sin(OBLIQUITY), y * math.sin(OBLIQUITY) + z * math.cos(OBLIQUITY)
+    return longitude, latitude, math.atan2(y, x), math.atan2(z, math.hypot(x, y))
+
+def _sidereal(jd: float, lon: float) -> float:
+    # local mean sidereal time in radians
+    return math.radians((280.46061837 + 360.98564736629 * (jd - 2451545) + lon) % 360)
+
+def sun_times(lat: float, lon: float, date: Date, tz: Union[str, datetime.tzinfo] = "UTC") -> Tuple[Optional[float], Optional[float]]:
+    """Compute sunrise and sunset of a local date with the NOAA solar algorithm.
+
+    Parameters
+    ------------
+    lat: :class:`float`
+        Latitude in degrees
+    lon: :class:`float`
+        Longitude in degrees
+    date: Union[:class:`str`, :class:`datetime.date`]
+        Local date, a string in format ``yyyy-MM-dd`` or a date
+    tz: Union[:class:`str`, :class:`datetime.tzinfo`]
+        Time zone of the location, e.g. ``tz_id`` of :class:`LocationData`. Defaults to UTC
+
+    Returns
+    ---------
+    Tuple[Optional[:class:`float`], Optional[:class:`float`]]
+        Epochs of sunrise and sunset, ``None`` if the sun does not rise or set (polar day or night)
+    """
+    tz = ZoneInfo(tz) if isinstance(tz, str) else tz
+    start, end = _midnight(_date(date), tz)
+    # the solar noon closest to the middle of the local day
+    noon = start + (end - start) / 2
+    noon = math.floor(noon / 86400 + lon / 360) * 86400 + 43200 - lon * 240
+    if noon < start:
+        noon += 86400
+    elif noon >= end:
+        noon -= 86400
+    phi = math.radians(lat)
+    events: List[Optional[float]] = []
+    for sign in (-1, 1):
+        epoch = noon
+        for _ in range(3):
+            _, declination, eq_time = _sun(_julian(epoch))
+            cos_ha = (
+                (math.sin(math.radians(SUN_ALTITUDE)) - math.sin(phi) * math.sin(declination))
+                / (math.cos(phi) * math.cos(declination))
+            )
+            if not -1 <= cos_ha <= 1:
+                epoch = None # type: ignore
+                break
+            epoch = noon - eq_time * 60 + sign * math.degrees(math.acos(cos_ha)) * 240
+        events.append(epoch)
+    return events[0], events[1]
+
+def _moon_altitudes(epochs: Sequence[float], lat: float, lon: float, ephemeris: Dict[float, Tuple[float, float]]) -> List[float]:
+    phi = math.radians(lat)
+    altitudes = []
+    for epoch in epochs:
+        position = ephemeris.get(epoch)
+        if position is None:
+            position = ephemeris[epoch] = _moon(_julian(epoch))[2:]
+        ra, dec = position
+        hour_angle = _sidereal(_julian(epoch), lon) - ra
+        altitudes.append(math.degrees(math.asin(
+            math.sin(phi) * math.sin(dec) + math.cos(phi) * math.cos(dec) * math.cos(hour_angle)
+        )) - MOON_ALTITUDE)
+    return altitudes
+
+def _moon_times(
+    lat: float, lon: float, start: float, end: float, ephemeris: Dict[float, Tuple[float, float]]
+) -> Tuple[Optional[float], Optional[float]]:
+    # moon altitude is sampled hourly and interpolated with parabolas through three samples (Montenbruck and Pfleger)
+    hours = round((end - start) / 3600)
+    epochs = [start + 3600 * i for i in range(hours + 1)]
+    altitudes = _moon_altitudes(epochs, lat, lon, ephemeris)
+    rise: Optional[float] = None
+    setting: Optional[float] = None
+    for i in range(1, hours, 2):
+        ym, y0, yp = altitudes[i - 1], altitudes[i], altitudes[i + 1]
+        a = 0.5 * (yp + ym) - y0
+        b = 0.5 * (yp - ym)
+        roots = []
+        if abs(a) < 1e-12:
+            if b != 0 and -1 <= -y0 / b <= 1:
+                roots.append(-y0 / b)
+        else:
+            discriminant = b * b - 4 * a * y0
+            if discriminant >= 0:
+                dx = 0.5 * math.sqrt(discriminant) / abs(a)
+                xe = -b / (2 * a)
+                roots = [x for x in (xe - dx, xe + dx) if -1 <= x <= 1]
+        for x in roots:
+            rising = (2 * a * x + b) > 0 # altitude increases at the root
+            epoch = epochs[i] + x * 3600
+            if rising and rise is None:
+                rise = epoch
+            elif not rising and setting is None:
+                setting = epoch
+    if hours % 2:
+        # an odd number of hours (a DST change) leaves the last hour, interpolated linearly
+        ym, yp = altitudes[-2], altitudes[-1]
+        if (ym < 0) != (yp < 0):
+            epoch = epochs[-2] + ym / (ym - yp) * 3600
+            if ym < 0 and rise is None:
+                rise = epoch
+            elif ym >= 0 and setting is None:
+                setting = epoch
+    return rise, setting
+
+def moon_times(lat: float, lon: float, date: Date, tz: Union[str, datetime.tzinfo] = "UTC") -> Tuple[Optional[float], Optional[float]]:
+    """Compute moonrise and moonset of a local date, with a low precision lunar theory (within a few minutes).
+
+    Parameters are the same as in :func:`sun_times`.
+
+    Returns
+    ---------
+    Tuple[Optional[:class:`float`], Optional[:class:`float`]]
+        Epochs of moonrise and moonset, ``None`` if the moon does not rise or set that day
+    """
+    tz = ZoneInfo(tz) if isinstance(tz, str) else tz
+    return _moon_times(lat, lon, *_midnight(_date(date), tz), {})
+
+def moon_phase(epoch: float) -> Tuple[str, int]:
+    """Compute the moon phase and illumination at a time.
+
+    Parameters
+    ------------
+    epoch: :class:`float`
+        Time as an epoch
+
+    Returns
+    ---------
+    Tuple[:class:`str`, :class:`int`]
+        Name of the phase (as returned by the API, e.g. ``Waxing Crescent``) and illuminated percentage of the disc
+    """
+    jd = _julian(epoch)
+    sun_long = _sun(jd)[0]
+    moon_long, moon_lat = _moon(jd)[:2]
+    elongation = (moon_long - sun_long) % (2 * math.pi)
+    illumination = (1 - math.cos(moon_lat) * math.cos(elongation)) / 2
+    phase = PHASES[int((math.degrees(elongation) + 22.5) % 360 // 45)]
+    return phase, round(illumination * 100)
+
+def _compute(
+    lat: float, lon: float, date: datetime.date, tz: datetime.tzinfo, ephemeris: Dict[float, Tuple[float, float]]
+) -> Dict[str, Any]:
+    start, end = _midnight(date, tz)
+    sunrise, sunset = sun_times(lat, lon, date, tz)
+    moonrise, moonset = _moon_times(lat, lon, start, end, ephemeris)
+    phase, illumination = moon_phase((start + end) / 2)
+    return {
+        "sunrise": _format(sunrise, tz, "No sunrise"),
+        "sunset": _format(sunset, tz, "No sunset"),
+        "moonrise": _format(moonrise, tz, "No moonrise"),
+        "moonset": _format(moonset, tz, "No moonset"),
+        "moon_phase": phase,
+        "moon_illumination": illumination,
+    }
+
+def compute(lat: float, lon: float, date: Date, tz: Union[str, datetime.tzinfo] = "UTC") -> Dict[str, Any]:
+    """Compute astronomical data of a location and a local date, without calling the API.
+
+    Sunrise and sunset follow the NOAA solar algorithm (within a minute), moonrise and moonset a low precision
+    lunar theory (within a few minutes). Moon phase and illumination are computed at local noon.
+
+    Parameters are the same as in :func:`sun_times`.
+
+    Returns
+    ---------
+    Dict[:class:`str`, Any]
+        Raw astronomical data in the format of the ``astro`` object of the API, e.g. ``{"sunrise": "04:43 AM", ...}``
+    """
+    return _compute(lat, lon, _date(date), ZoneInfo(tz) if isinstance(tz, str) else tz, {})
+
+def compute_many(
+    locations: Iterable[Tuple[float, float, Union[str, datetime.tzinfo]]],
+    dates: Iterable[Date],
+) -> List[List[Dict[str, Any]]]:
+    """Compute astronomical data of many locations and dates at once.
+
+    Positions of the moon depend only on time, so they are computed once for every sampled time
+    and shared by all locations with the same local midnight (e.g. locations in one time zone).
+
+    Parameters
+    ------------
+    locations: Iterable[Tuple[:class:`float`, :class:`float`, Union[:class:`str`, :class:`datetime.tzinfo`]]]
+        Latitude, longitude and time zone of every location
+    dates: Iterable[Union[:class:`str`, :class:`datetime.date`]]
+        Local dates
+
+    Returns
+    ---------
+    List[List[Dict[:class:`str`, Any]]]
+        Raw astronomical data (see :func:`compute`) of every location and date, indexed ``[location][date]``
+    """
+    parsed = [_date(date) for date in dates]
+    ephemeris: Dict[float, Tuple[float, float]] = {}
+    zones: Dict[str, datetime.tzinfo] = {}
+    results = []
+    for lat, lon, tz in locations:
+        if isinstance(tz, str):
+            tz = zones.get(tz) or zones.setdefault(tz, ZoneInfo(tz))
+        results.append([_compute(lat, lon, date, tz, ephemeris) for date in parsed])
+    return results
+
+def astronomical_data(location: Dict[str, Any], date: Date) -> AstronomicalData:
+    """Compute astronomical data of a location, in the format of :meth:`Client.get_astronomical_data`.
+
+    Parameters
+    ------------
+    location: Dict[:class:`str`, Any]
+        Raw location data with ``lat``, ``lon`` and ``tz_id``, e.g. :attr:`LocationData.raw`
+    date: Union[:class:`str`, :class:`datetime.date`]
+        Local date
+
+    Returns
+    ---------
+    :class:`AstronomicalData`
+        Computed astronomical data with its location
+    """
+    astro = compute(location["lat"], location["lon"], date, location.get("tz_id") or "UTC")
+    return AstronomicalData({"location": location, "astronomy": {"astro": astro}}, 200, None)
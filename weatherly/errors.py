@@ -32,6 +32,8 @@ __all__ = (
     "AccessDenied",
     "InternalApplicationError",
     "InvalidDate",
+    "SerializationError",
+    "FrozenModelError",
 )
 
 class WeatherlyException(Exception):
@@ -50,6 +52,22 @@ class InvalidDate(WeatherlyException):
     """
     pass
 
+class SerializationError(WeatherlyException):
+    """
+    Raised when a serialized model cannot be loaded, e.g. the data is corrupted or was made by an unsupported version.
+
+    Inherits from :class:`WeatherlyException`.
+    """
+    pass
+
+class FrozenModelError(WeatherlyException, AttributeError):
+    """
+    Raised when trying to modify a frozen model (see :meth:`PartialAPIResponse.freeze`).
+
+    Inherits from :class:`WeatherlyException` and :exc:`AttributeError`.
+    """
+    pass
+
 class WeatherAPIException(WeatherlyException): 
     """
     The base class for :class:`Client` weather requests exceptions.
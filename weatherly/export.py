@@ -0,0 +1,243 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import importlib
+from array import array
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Tuple,
+    Type,
+)
+
+from .models import (
+    CurrentWeatherData,
+    ForecastData,
+    HourlyColumns,
+    MarineData,
+)
+
+__all__ = (
+    "schema",
+    "to_arrow",
+    "to_parquet",
+    "to_pandas",
+)
+
+LOCATION_STRING_FIELDS = ("name", "region", "country", "tz_id")
+LOCATION_FLOAT_FIELDS = ("lat", "lon")
+
+_WEATHER_FIELDS = (
+    "temp_c", "temp_f", "is_day", "wind_mph", "wind_kph", "wind_degree", "pressure_mb", "pressure_in",
+    "precip_mm", "precip_in", "humidity", "cloud", "feelslike_c", "feelslike_f", "vis_km", "vis_miles",
+    "gust_mph", "gust_kph", "uv", "condition_code",
+)
+_HOUR_FIELDS = _WEATHER_FIELDS + (
+    "windchill_c", "windchill_f", "heatindex_c", "heatindex_f", "dewpoint_c", "dewpoint_f",
+)
+
+# numeric fields exported for every model class, the order is the column order
+NUMERIC_FIELDS: Dict[Type[Any], Tuple[str, ...]] = {
+    CurrentWeatherData: _WEATHER_FIELDS,
+    ForecastData: _HOUR_FIELDS + ("will_it_rain", "chance_of_rain", "will_it_snow", "chance_of_snow"),
+    MarineData: _HOUR_FIELDS + (
+        "sig_ht_mt", "swell_ht_mt", "swell_ht_ft", "swell_dir", "swell_period_secs", "water_temp_c", "water_temp_f",
+    ),
+}
+STRING_FIELDS: Dict[Type[Any], Tuple[str, ...]] = {
+    CurrentWeatherData: ("condition_text", "wind_dir"),
+    ForecastData: ("condition_text", "wind_dir"),
+    MarineData: ("condition_text", "wind_dir", "swell_dir_16_point"),
+}
+TIME_FIELDS: Dict[Type[Any], str] = {
+    CurrentWeatherData: "last_updated_epoch",
+    ForecastData: "time_epoch",
+    MarineData: "time_epoch",
+}
+
+def _import(name: str) -> Any:
+    # optional dependencies are only imported when an exporter is used
+    try:
+        return importlib.import_module(name)
+    except ImportError as exc:
+        raise ImportError(f"{name} is required to export models, install it with: pip install weatherly[export]") from exc
+
+def _model_class(models: List[Any]) -> Type[Any]:
+    if not models:
+        raise ValueError("At least one model is required to export")
+    for cls in NUMERIC_FIELDS:
+        if all(isinstance(model, cls) for model in models):
+            return cls
+    raise TypeError("All models should be of the same class: CurrentWeatherData, ForecastData or MarineData")
+
+def _columns(models: List[Any]) -> Tuple[Type[Any], Dict[str, array], Dict[str, List[str]]]:
+    """Build numeric buffers and string lists for a batch of models of the same class"""
+    cls = _model_class(models)
+    numeric = NUMERIC_FIELDS[cls]
+    strings = STRING_FIELDS[cls]
+
+    buffers: Dict[str, array] = {f"location_{field}": array("d") for field in LOCATION_FLOAT_FIELDS}
+    buffers[TIME_FIELDS[cls]] = array("q")
+    buffers.update({field: array("d") for field in numeric})
+    texts: Dict[str, List[str]] = {f"location_{field}": [] for field in LOCATION_STRING_FIELDS}
+    texts.update({field: [] for field in strings})
+
+    for model in models:
+        if cls is CurrentWeatherData:
+            columns = HourlyColumns.from_current(model, numeric)
+            rows = [model.raw["current"]]
+        else:
+            hours = list(model.iter_hours())
+            columns = HourlyColumns.from_hours(hours, numeric)
+            rows = [hour.raw for hour in hours]
+        n = len(columns)
+
+        location = model.location.raw
+        for field in LOCATION_FLOAT_FIELDS:
+            buffers[f"location_{field}"].extend(array("d", [location[field]]) * n)
+        for field in LOCATION_STRING_FIELDS:
+            texts[f"location_{field}"].extend([location.get(field)] * n)
+
+        buffers[TIME_FIELDS[cls]].extend(columns.epochs)
+        for field in numeric:
+            buffers[field].extend(columns.columns[field])
+        for field in strings:
+            if field == "condition_text":
+                texts[field].extend([row["condition"]["text"] for row in rows])
+            else:
+                texts[field].extend([row.get(field) for row in rows])
+    return cls, buffers, texts
+
+def schema(cls: Type[Any]) -> Any:
+    """Get the Arrow schema used when exporting models of the given class.
+
+    .. note::
+        This function requires ``pyarrow`` to be installed.
+
+    Parameters
+    ------------
+    cls: Type[Union[:class:`CurrentWeatherData`, :class:`ForecastData`, :class:`MarineData`]]
+        Model class
+
+    Returns
+    ---------
+    :class:`pyarrow.Schema`
+        Schema of exported record batches
+    """
+    pa = _import("pyarrow")
+    category = pa.dictionary(pa.int32(), pa.string())
+    fields = [pa.field(f"location_{field}", category) for field in LOCATION_STRING_FIELDS]
+    fields.extend(pa.field(f"location_{field}", pa.float64()) for field in LOCATION_FLOAT_FIELDS)
+    fields.append(pa.field(TIME_FIELDS[cls], pa.int64()))
+    fields.extend(pa.field(field, pa.float64()) for field in NUMERIC_FIELDS[cls])
+    fields.extend(pa.field(field, category) for field in STRING_FIELDS[cls])
+    return pa.schema(fields)
+
+def to_arrow(models: Iterable[Any]) -> Any:
+    """Export a batch of models to an Arrow record batch.
+
+    Current weather data is exported as one row per model, forecast and marine data as one row per hour.
+    Numeric columns are passed to Arrow without copying, missing values are ``NaN``.
+    Repeated strings (location names, condition text, etc.) are dictionary encoded.
+
+    .. note::
+        This function requires ``pyarrow`` to be installed.
+
+    Parameters
+    ------------
+    models: Iterable[Union[:class:`CurrentWeatherData`, :class:`ForecastData`, :class:`MarineData`]]
+        Models to export, all of the same class
+
+    Returns
+    ---------
+    :class:`pyarrow.RecordBatch`
+        Exported data, using the schema from :func:`schema`
+    """
+    pa = _import("pyarrow")
+    cls, buffers, texts = _columns(list(models))
+    target = schema(cls)
+
+    arrays = []
+    for field in target:
+        if field.name in buffers:
+            buffer = buffers[field.name]
+            arrays.append(pa.Array.from_buffers(field.type, len(buffer), [None, pa.py_buffer(buffer)]))
+        else:
+            arrays.append(pa.array(texts[field.name], type=pa.string()).dictionary_encode())
+    return pa.RecordBatch.from_arrays(arrays, schema=target)
+
+def to_parquet(models: Iterable[Any], path: str, **kwargs: Any) -> None:
+    """Export a batch of models to a Parquet file.
+
+    .. note::
+        This function requires ``pyarrow`` to be installed.
+
+    Parameters
+    ------------
+    models: Iterable[Union[:class:`CurrentWeatherData`, :class:`ForecastData`, :class:`MarineData`]]
+        Models to export, all of the same class
+    path: :class:`str`
+        Path of the file to write
+    kwargs: Dict[:class:`str`, Any]
+        Additional keyword arguments passed to :func:`pyarrow.parquet.write_table`
+    """
+    pa = _import("pyarrow")
+    parquet = _import("pyarrow.parquet")
+    parquet.write_table(pa.Table.from_batches([to_arrow(models)]), path, **kwargs)
+
+def to_pandas(models: Iterable[Any]) -> Any:
+    """Export a batch of models to a pandas DataFrame.
+
+    Numeric columns are built on top of the exported buffers, repeated strings become categorical columns.
+
+    .. note::
+        This function requires ``pandas`` to be installed, ``pyarrow`` is not needed.
+
+    Parameters
+    ------------
+    models: Iterable[Union[:class:`CurrentWeatherData`, :class:`ForecastData`, :class:`MarineData`]]
+        Models to export, all of the same class
+
+    Returns
+    ---------
+    :class:`pandas.DataFrame`
+        Exported data, with the same columns as :func:`to_arrow`
+    """
+    pd = _import("pandas")
+    np = _import("numpy")
+    cls, buffers, texts = _columns(list(models))
+
+    data = {}
+    for field in (
+        [f"location_{field}" for field in LOCATION_STRING_FIELDS + LOCATION_FLOAT_FIELDS]
+        + [TIME_FIELDS[cls]] + list(NUMERIC_FIELDS[cls]) + list(STRING_FIELDS[cls])
+    ):
+        if field in buffers:
+            buffer = buffers[field]
+            data[field] = np.frombuffer(buffer, dtype=np.int64 if buffer.typecode == "q" else np.float64)
+        else:
+            data[field] = pd.Categorical(texts[field])
+    return pd.DataFrame(data, copy=False)
@@ -26,6 +26,11 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 from .base import *
+from .serialization import *
+from .condition import *
+from .intern import *
+from .columns import *
+from .series import *
 from .current_weather import *
 from .forecast import *
 from .marine import *
@@ -28,6 +28,7 @@ from typing import (
 )
 
 from .base import PartialAPIResponse
+from .intern import intern_string
 
 __all__ = (
     "AlertData",
@@ -74,14 +75,14 @@ class AlertData(PartialAPIResponse):
         super().__init__(raw)
         
         self.headline: str = raw["headline"]
-        self.msg_type: str = raw["msgType"]
-        self.severity: str = raw["severity"]
-        self.urgency: str = raw["urgency"]
-        self.areas: str = raw["areas"]
-        self.category: str = raw["category"]
-        self.certainty: str = raw["certainty"]
-        self.event: str = raw["event"]
-        self.note: str = raw["note"]
+        self.msg_type: str = intern_string(raw["msgType"])
+        self.severity: str = intern_string(raw["severity"])
+        self.urgency: str = intern_string(raw["urgency"])
+        self.areas: str = intern_string(raw["areas"])
+        self.category: str = intern_string(raw["category"])
+        self.certainty: str = intern_string(raw["certainty"])
+        self.event: str = intern_string(raw["event"])
+        self.note: str = intern_string(raw["note"])
         self.effective: str = raw["effective"]
         self.expires: str = raw["expires"]
         self.description: str = raw["desc"]
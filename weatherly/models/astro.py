@@ -86,7 +86,7 @@ class AstronomicalData(APIResponse):
                 
         if raw.get("astronomy") is not None:
             # first type
-            self.location = LocationData(raw["location"], status, code)
+            self.location = LocationData.shared(raw["location"], status, code)
             raw = raw["astronomy"]["astro"]
         
         self.sunrise: str = raw["sunrise"]
@@ -22,28 +22,157 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from types import MappingProxyType
 from typing import (
     Dict,
     Any,
     Optional,
+    Tuple,
 )
 
+from . import serialization
+from ..errors import FrozenModelError
+
 __all__ = (
     "PartialAPIResponse",
     "APIResponse",
 )
 
+def _freeze_value(value: Any, memo: Dict[int, Any]) -> Any:
+    """Make a read-only version of a value, lists become tuples and dictionaries become read-only mappings"""
+    if isinstance(value, PartialAPIResponse):
+        return value.freeze(_memo=memo)
+    if isinstance(value, (list, tuple, dict)):
+        # shared objects (e.g. raw data of nested models) are converted only once
+        try:
+            return memo[id(value)]
+        except KeyError:
+            pass
+        if isinstance(value, dict):
+            frozen = MappingProxyType({k: _freeze_value(v, memo) for k, v in value.items()})
+        else:
+            frozen = tuple(_freeze_value(item, memo) for item in value)
+        memo[id(value)] = frozen
+        return frozen
+    return value
+
+def _frozen_setattr(self: Any, name: str, value: Any) -> None:
+    raise FrozenModelError(f"Cannot set attribute {name!r}, {self.__class__.__name__} is frozen")
+
+def _frozen_delattr(self: Any, name: str) -> None:
+    raise FrozenModelError(f"Cannot delete attribute {name!r}, {self.__class__.__name__} is frozen")
+
+# frozen variants of model classes, with the same name and guarded attribute assignment
+_frozen_classes: Dict[type, type] = {}
+
+def _frozen_class(cls: type) -> type:
+    frozen = _frozen_classes.get(cls)
+    if frozen is None:
+        frozen = _frozen_classes[cls] = type(cls.__name__, (cls,), {
+            "__module__": cls.__module__,
+            "__qualname__": cls.__qualname__,
+            "__setattr__": _frozen_setattr,
+            "__delattr__": _frozen_delattr,
+            "_model_class": cls,
+        })
+    return frozen
+
+def _hash_key(value: Any) -> Any:
+    if isinstance(value, MappingProxyType):
+        return tuple((k, _hash_key(v)) for k, v in value.items())
+    if isinstance(value, tuple):
+        return tuple(_hash_key(item) for item in value)
+    return value
+
 class PartialAPIResponse():
     """Represents a partial response, or a part of a response class from WeatherAPI
+
+    Models can be frozen with :meth:`freeze`, making them immutable and hashable so one instance can
+    be safely shared (e.g. by caches) between many readers.
+
+    .. container:: operations
+
+        .. describe:: x == y
+
+            Checks if two frozen models of the same class hold the same data.
+            Models that are not frozen are only equal to themselves.
+
+        .. describe:: hash(x)
+
+            Returns a hash of the model data for frozen models, or an identity based hash otherwise.
     
     Attributes
     ------------
     raw: Dict[:class:`str`, Any]
         A raw dictionary representing the partial response body
     """
+    _model_class: Optional[type] = None # set on frozen variants of model classes
+
     def __init__(self, raw: Dict[str, Any]) -> None:
         self.raw: Dict[str, Any] = raw
 
+    @property
+    def frozen(self) -> bool:
+        """:class:`bool`: Whether the model is frozen (immutable), see :meth:`freeze`"""
+        return self.__dict__.get("_frozen", False)
+
+    def freeze(self, *, _memo: Optional[Dict[int, Any]] = None):
+        """Freeze the model, making it (and all nested models) immutable and hashable.
+
+        Lists (e.g. ``forecast_days`` or ``hour_data``) are turned into tuples and dictionaries (e.g. ``raw``)
+        into read-only mappings. Setting or deleting an attribute of a frozen model raises :exc:`FrozenModelError`.
+
+        .. note::
+            Models hold shared :class:`LocationData` objects (see :class:`InternTable`), which are always frozen.
+
+        Returns
+        ---------
+        Self
+            The same model, now frozen
+        """
+        if self.frozen:
+            return self
+        memo = {} if _memo is None else _memo
+        attrs = self.__dict__
+        for name, value in list(attrs.items()):
+            if not name.startswith("_"):
+                attrs[name] = _freeze_value(value, memo)
+        attrs["_frozen"] = True
+        # only frozen models pay for guarded attribute assignment, their class is swapped for a frozen variant
+        self.__class__ = _frozen_class(self.__class__)
+        return self
+
+    @classmethod
+    def _unfrozen_class(cls) -> type:
+        """The model class, also for frozen models (whose class is a frozen variant of it)"""
+        return cls._model_class or cls
+
+    def __hash__(self) -> int:
+        if not self.frozen:
+            return object.__hash__(self)
+        value = self.__dict__.get("_hash")
+        if value is None:
+            value = self.__dict__["_hash"] = hash((self.__class__, self._serialize_args(), _hash_key(self.raw)))
+        return value
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__ or not (self.frozen and other.frozen):
+            return NotImplemented
+        return (
+            hash(self) == hash(other)
+            and self._serialize_args() == other._serialize_args()
+            and _hash_key(self.raw) == _hash_key(other.raw)
+        )
+
+    def _serialize_args(self) -> Tuple[Any, ...]:
+        """Constructor arguments after ``raw``, used when serializing"""
+        return ()
+
+    def __reduce_ex__(self, protocol: int):
+        return serialization.reduce_model(self, protocol)
+
     def flatten(self) -> Dict[str, str]:
         """Converts a Dict[:class:`str`, Any] into a flatten dictionary of type Dict[:class:`str`, :class:`str`]
         
@@ -92,7 +221,7 @@ class PartialAPIResponse():
             d = elem[0]
             for k,v in d.items():
                 k = str(k)
-                if isinstance(v, dict):
+                if isinstance(v, (dict, MappingProxyType)):
                     queue = [((v, key + "." + k if key else k))] + queue # idx: front
                 else:
                     res[key + "." + k if k else k] = v
@@ -118,4 +247,7 @@ class APIResponse(PartialAPIResponse):
     ) -> None:
         self.raw: Dict[str, Any] = raw
         self.status: int = status
-        self.code: Optional[int] = code
\ No newline at end of file
+        self.code: Optional[int] = code
+
+    def _serialize_args(self) -> Tuple[Any, ...]:
+        return (self.status, self.code)
@@ -21,20 +21,27 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+import math
+from array import array
 from typing import (
     Dict,
     Any,
     Optional,
+    Sequence,
     Tuple,
     List
 )
 
 from .base import APIResponse
+from .columns import AGGREGATIONS, HourlyColumns, NAN
+from .current_weather import CurrentWeatherData
+from .series import HourlySeries
 from ..enums import WeatherEndpoints
 
 __all__ = (
     "BulkRequest",
     "BulkResponse",
+    "BulkFrame",
 )
 
 class BulkRequest():
@@ -133,4 +140,235 @@ class BulkResponse(APIResponse):
         
         self.endpoint: WeatherEndpoints = endpoint
         self.data: List[Tuple[str, Any]] = data # too lazy to do it here check Client.bulk_request
-    
\ No newline at end of file
+        self._index: Dict[str, Any] = dict(data)
+
+    def _serialize_args(self) -> Tuple[Any, ...]:
+        return (self.status, self.code, self.endpoint, self.data)
+
+    @property
+    def ids(self) -> List[str]:
+        """List[:class:`str`]: Custom IDs of all responses, in the order they were returned"""
+        return [custom_id for custom_id, _ in self.data]
+
+    def get(self, custom_id: str, default: Any = None) -> Any:
+        """Get a response by its custom ID.
+
+        .. container:: operations
+
+            .. describe:: x[custom_id]
+
+                Get a response by its custom ID, raises :exc:`KeyError` if it is missing.
+
+            .. describe:: custom_id in x
+
+                Check if there is a response with the given custom ID.
+
+        Parameters
+        -------------
+        custom_id: :class:`str`
+            Custom ID of the query
+        default: Any
+            Value returned when there is no response for the given ID
+
+        Returns
+        ---------
+        Any
+            Response for the given ID, e.g. :class:`CurrentWeatherData`
+        """
+        return self._index.get(custom_id, default)
+
+    def __getitem__(self, custom_id: str) -> Any:
+        return self._index[custom_id]
+
+    def __contains__(self, custom_id: str) -> bool:
+        return custom_id in self._index
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def stack(self, fields: Optional[Sequence[str]] = None) -> "BulkFrame":
+        """Stack numeric data of all responses into a single locations × hours × fields frame.
+
+        Works for current weather, forecast, history and marine responses.
+        Current weather responses have a single "hour" (the last update).
+
+        Parameters
+        -------------
+        fields: Optional[Sequence[:class:`str`]]
+            Fields to include. When ``None``, numeric fields present in every response are used
+
+        Returns
+        ---------
+        :class:`BulkFrame`
+            Stacked data
+
+        Raises
+        ---------
+        :exc:`TypeError`
+            Raised when responses of this endpoint have no hourly data to stack
+        """
+        columns = []
+        for _, model in self.data:
+            if isinstance(model, HourlySeries):
+                columns.append(model.columns if fields is None else HourlyColumns.from_hours(model.iter_hours(), fields))
+            elif isinstance(model, CurrentWeatherData):
+                columns.append(HourlyColumns.from_current(model, fields))
+            else:
+                raise TypeError(f"Cannot stack responses of type {model.__class__.__name__}")
+        return BulkFrame(self.ids, columns, fields)
+
+
+class BulkFrame():
+    """Numeric data of many locations stacked into one locations × hours × fields array.
+
+    Hours are aligned by position (first hour of every location, second hour, ...),
+    locations with fewer hours are padded with ``NaN``.
+
+    .. note::
+        You should not create this class manually, use :meth:`BulkResponse.stack` instead.
+
+    Attributes
+    ------------
+    ids: List[:class:`str`]
+        Custom IDs of stacked locations
+    fields: List[:class:`str`]
+        Names of stacked fields
+    shape: Tuple[:class:`int`, :class:`int`, :class:`int`]
+        Shape of the frame, as (locations, hours, fields)
+    values: :class:`array.array`
+        All values as a flat array of doubles, ordered by location, then hour, then field
+    epochs: :class:`array.array`
+        ``time_epoch`` of every (location, hour) pair as a flat array, ``0`` for padding
+    """
+    def __init__(
+        self,
+        ids: List[str],
+        columns: List[HourlyColumns],
+        fields: Optional[Sequence[str]] = None,
+    ) -> None:
+        if fields is None:
+            fields = [field for field in columns[0].columns if all(field in col for col in columns)] if columns else []
+        hours = max((len(col) for col in columns), default=0)
+
+        self.ids: List[str] = list(ids)
+        self.fields: List[str] = list(fields)
+        self.shape: Tuple[int, int, int] = (len(columns), hours, len(self.fields))
+        self._positions: Dict[str, int] = {custom_id: i for i, custom_id in enumerate(self.ids)}
+        self._field_positions: Dict[str, int] = {field: i for i, field in enumerate(self.fields)}
+
+        n_fields = len(self.fields)
+        self.values: array = array("d", [NAN]) * (len(columns) * hours * n_fields)
+        self.epochs: array = array("q", [0]) * (len(columns) * hours)
+        for loc, col in enumerate(columns):
+            base = loc * hours
+            self.epochs[base:base + len(col)] = col.epochs
+            for f, field in enumerate(self.fields):
+                start = base * n_fields + f
+                # strided assignment writes the whole column at once
+                self.values[start:start + len(col) * n_fields:n_fields] = col.columns[field]
+
+    def _field(self, field: str) -> int:
+        try:
+            return self._field_positions[field]
+        except KeyError:
+            raise KeyError(f"Field {field!r} is not in this frame") from None
+
+    def series(self, custom_id: str, field: str) -> array:
+        """Get hourly values of a field for a single location.
+
+        Parameters
+        ------------
+        custom_id: :class:`str`
+            Custom ID of the location
+        field: :class:`str`
+            Field name
+
+        Returns
+        ---------
+        :class:`array.array`
+            Values for every hour
+        """
+        _, hours, n_fields = self.shape
+        start = self._positions[custom_id] * hours * n_fields + self._field(field)
+        return self.values[start:start + hours * n_fields:n_fields]
+
+    def column(self, field: str, hour: int = 0) -> array:
+        """Get values of a field at the given hour position for all locations.
+
+        Parameters
+        ------------
+        field: :class:`str`
+            Field name
+        hour: :class:`int`
+            Hour position, ``0`` is the first hour of every location
+
+        Returns
+        ---------
+        :class:`array.array`
+            One value per location, in the order of :py:attr:`ids`
+        """
+        _, hours, n_fields = self.shape
+        if not 0 <= hour < hours:
+            raise IndexError("Hour position out of range")
+        step = hours * n_fields
+        start = hour * n_fields + self._field(field)
+        return self.values[start::step]
+
+    def reduce(self, field: str, func: str = "mean") -> array:
+        """Aggregate a field over hours, separately for every location.
+
+        Parameters
+        ------------
+        field: :class:`str`
+            Field name
+        func: :class:`str`
+            Aggregation name, see :meth:`HourlyColumns.aggregate`
+
+        Returns
+        ---------
+        :class:`array.array`
+            One value per location, in the order of :py:attr:`ids`
+        """
+        reducer = AGGREGATIONS[func]
+        return array("d", [reducer(self.series(custom_id, field)) for custom_id in self.ids])
+
+    def rank(
+        self,
+        field: str,
+        *,
+        hour: Optional[int] = None,
+        func: str = "mean",
+        descending: bool = True,
+    ) -> List[Tuple[str, float]]:
+        """Rank locations by a field.
+
+        Parameters
+        ------------
+        field: :class:`str`
+            Field name
+        hour: Optional[:class:`int`]
+            Rank by values at this hour position. When ``None``, values are aggregated over all hours with ``func``
+        func: :class:`str`
+            Aggregation used when ``hour`` is ``None``
+        descending: :class:`bool`
+            Whether the highest values come first. Defaults to ``True``
+
+        Returns
+        ---------
+        List[Tuple[:class:`str`, :class:`float`]]
+            Pairs of (custom ID, value), sorted. Locations without a value (``NaN``) are always last
+        """
+        values = self.column(field, hour) if hour is not None else self.reduce(field, func)
+        pairs = list(zip(self.ids, values))
+        sign = -1 if descending else 1
+        pairs.sort(key=lambda pair: (math.isnan(pair[1]), sign * pair[1] if not math.isnan(pair[1]) else 0))
+        return pairs
+
+    def to_numpy(self) -> Any:
+        """Get the frame as a 3-dimensional :class:`numpy.ndarray` without copying.
+
+        .. note::
+            This method requires ``numpy`` to be installed.
+        """
+        import numpy
+        return numpy.frombuffer(self.values, dtype=numpy.float64).reshape(self.shape)
@@ -0,0 +1,440 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import math
+from array import array
+from collections import deque
+from datetime import date
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+__all__ = (
+    "HourlyColumns",
+)
+
+NAN = float("nan")
+RESAMPLE_STEPS = {"1h": 3600, "3h": 3 * 3600, "6h": 6 * 3600, "12h": 12 * 3600, "daily": 86400}
+
+def _valid(values: Iterable[float]) -> List[float]:
+    return [value for value in values if value == value] # NaN != NaN
+
+def _mean(values: Sequence[float]) -> float:
+    values = _valid(values)
+    return math.fsum(values) / len(values) if values else NAN
+
+def _sum(values: Sequence[float]) -> float:
+    return math.fsum(_valid(values))
+
+def _add_compensated(total: float, compensation: float, value: float) -> Tuple[float, float]:
+    # Neumaier summation, compensation keeps the low-order bits lost by rounding the total
+    new = total + value
+    if abs(total) >= abs(value):
+        compensation += (total - new) + value
+    else:
+        compensation += (value - new) + total
+    return new, compensation
+
+def _min(values: Sequence[float]) -> float:
+    values = _valid(values)
+    return min(values) if values else NAN
+
+def _max(values: Sequence[float]) -> float:
+    values = _valid(values)
+    return max(values) if values else NAN
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    values = sorted(_valid(values))
+    if not values:
+        return NAN
+    # linear interpolation between closest ranks
+    pos = (len(values) - 1) * q / 100
+    lower = math.floor(pos)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (pos - lower)
+
+def _circular_mean(values: Sequence[float]) -> float:
+    values = _valid(values)
+    if not values:
+        return NAN
+    sin_sum = math.fsum(math.sin(math.radians(value)) for value in values)
+    cos_sum = math.fsum(math.cos(math.radians(value)) for value in values)
+    if abs(sin_sum) < 1e-9 and abs(cos_sum) < 1e-9:
+        return NAN # opposite directions cancel out, mean is undefined
+    return math.degrees(math.atan2(sin_sum, cos_sum)) % 360
+
+AGGREGATIONS: Dict[str, Callable[[Sequence[float]], float]] = {
+    "mean": _mean,
+    "sum": _sum,
+    "min": _min,
+    "max": _max,
+    "median": lambda values: _percentile(values, 50),
+    "circular_mean": _circular_mean,
+}
+
+def _local_epoch(time: str, cache: Dict[str, int]) -> int:
+    # local time is formatted as yyyy-MM-dd HH:mm, treat it as if it was UTC
+    day = cache.get(time[:10])
+    if day is None:
+        day = cache[time[:10]] = (date.fromisoformat(time[:10]).toordinal() - 719163) * 86400
+    return day + int(time[11:13]) * 3600 + int(time[14:16]) * 60
+
+class HourlyColumns():
+    """Columnar (structure of arrays) view of hourly data, used for fast aggregations.
+
+    Every numeric field of the hours is stored as an :class:`array.array` of doubles, and missing values are ``NaN``.
+    The columns are built once from raw hour data, then every aggregation works on flat arrays
+    instead of :class:`ForecastHour` objects.
+
+    .. note::
+        You will usually get this class from :py:attr:`HourlySeries.columns`, e.g. ``forecast.columns``.
+        To aggregate many forecasts at once, merge their columns with :meth:`concat`.
+
+    Parameters
+    ------------
+    epochs: :class:`array.array`
+        ``time_epoch`` values of the hours
+    local_epochs: :class:`array.array`
+        Local time of the hours as epochs (local date and time treated as if they were UTC)
+    columns: Dict[:class:`str`, :class:`array.array`]
+        Numeric columns by field name
+
+    Attributes
+    ------------
+    epochs: :class:`array.array`
+        ``time_epoch`` values of the hours, typecode ``q``
+    local_epochs: :class:`array.array`
+        Local time of the hours as epochs, typecode ``q``. Used for resampling by local days
+    columns: Dict[:class:`str`, :class:`array.array`]
+        Numeric columns by field name, typecode ``d``
+    """
+    def __init__(
+        self,
+        epochs: array,
+        local_epochs: array,
+        columns: Dict[str, array],
+    ) -> None:
+        self.epochs: array = epochs
+        self.local_epochs: array = local_epochs
+        self.columns: Dict[str, array] = columns
+
+    @classmethod
+    def from_hours(cls, hours: Iterable[Any], fields: Optional[Sequence[str]] = None) -> "HourlyColumns":
+        """Build columns from hours, e.g. :class:`ForecastHour` or :class:`MarineHour` objects.
+
+        Parameters
+        ------------
+        hours: Iterable[Any]
+            Hours to convert, their ``raw`` data is read directly
+        fields: Optional[Sequence[:class:`str`]]
+            Fields to convert. When ``None``, every numeric field of the first hour is used
+
+        Returns
+        ---------
+        :class:`HourlyColumns`
+            Columns built from given hours
+        """
+        return cls.from_raw([hour.raw for hour in hours], fields)
+
+    @classmethod
+    def from_current(cls, current: Any, fields: Optional[Sequence[str]] = None) -> "HourlyColumns":
+        """Build single-row columns from a :class:`CurrentWeatherData` object.
+
+        ``last_updated_epoch`` is used as the time of the row.
+
+        Parameters
+        ------------
+        current: :class:`CurrentWeatherData`
+            Current weather data to convert
+        fields: Optional[Sequence[:class:`str`]]
+            Fields to convert. When ``None``, every numeric field is used
+
+        Returns
+        ---------
+        :class:`HourlyColumns`
+            Columns with a single row
+        """
+        raw = current.raw["current"]
+        raw = {**raw, "time_epoch": raw["last_updated_epoch"], "time": raw["last_updated"]}
+        del raw["last_updated_epoch"]
+        return cls.from_raw([raw], fields)
+
+    @classmethod
+    def from_raw(cls, raws: List[Dict[str, Any]], fields: Optional[Sequence[str]] = None) -> "HourlyColumns":
+        """Build columns from raw hour dictionaries (with ``time_epoch`` and ``time`` keys).
+
+        Parameters
+        ------------
+        raws: List[Dict[:class:`str`, Any]]
+            Raw hour data
+        fields: Optional[Sequence[:class:`str`]]
+            Fields to convert. When ``None``, every numeric field of the first hour is used
+
+        Returns
+        ---------
+        :class:`HourlyColumns`
+            Columns built from given data
+        """
+        if fields is None:
+            fields = []
+            if raws:
+                fields = [
+                    k for k, v in raws[0].items()
+                    if k != "time_epoch" and isinstance(v, (int, float)) and not isinstance(v, bool)
+                ]
+                fields.append("condition_code")
+
+        date_cache: Dict[str, int] = {}
+        epochs = array("q", [raw["time_epoch"] for raw in raws])
+        local_epochs = array("q", [_local_epoch(raw["time"], date_cache) for raw in raws])
+        columns = {}
+        for field in fields:
+            if field == "condition_code":
+                values = [raw["condition"]["code"] if "condition" in raw else NAN for raw in raws]
+            else:
+                values = [raw.get(field) for raw in raws]
+                values = [NAN if value is None else value for value in values]
+            columns[field] = array("d", values)
+        return cls(epochs, local_epochs, columns)
+
+    @classmethod
+    def concat(cls, items: Iterable["HourlyColumns"]) -> "HourlyColumns":
+        """Merge columns of many series (e.g. many forecasts) into one.
+
+        Only fields present in all merged objects are kept.
+
+        Parameters
+        ------------
+        items: Iterable[:class:`HourlyColumns`]
+            Columns to merge
+
+        Returns
+        ---------
+        :class:`HourlyColumns`
+            Merged columns
+        """
+        items = list(items)
+        epochs, local_epochs = array("q"), array("q")
+        fields = [field for field in items[0].columns if all(field in item.columns for item in items)] if items else []
+        columns = {field: array("d") for field in fields}
+        for item in items:
+            epochs.extend(item.epochs)
+            local_epochs.extend(item.local_epochs)
+            for field in fields:
+                columns[field].extend(item.columns[field])
+        return cls(epochs, local_epochs, columns)
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    def __getitem__(self, field: str) -> array:
+        return self.columns[field]
+
+    def __contains__(self, field: str) -> bool:
+        return field in self.columns
+
+    def _resolve(self, func: Union[str, Callable[[Sequence[float]], float]]) -> Callable[[Sequence[float]], float]:
+        if callable(func):
+            return func
+        try:
+            return AGGREGATIONS[func]
+        except KeyError:
+            raise ValueError(f"Unknown aggregation {func!r}, expected one of: {', '.join(AGGREGATIONS)}") from None
+
+    def aggregate(self, field: str, func: Union[str, Callable[[Sequence[float]], float]] = "mean") -> float:
+        """Aggregate a whole column into a single value. ``NaN`` values are skipped.
+
+        Parameters
+        ------------
+        field: :class:`str`
+            Field name, e.g. ``temp_c``
+        func: Union[:class:`str`, Callable]
+            Aggregation name (``mean``, ``sum``, ``min``, ``max``, ``median``, ``circular_mean``)
+            or a function taking a sequence of floats
+
+        Returns
+        ---------
+        :class:`float`
+            Aggregated value, ``NaN`` if there were no values
+        """
+        return self._resolve(func)(self.columns[field])
+
+    def min(self, field: str) -> float:
+        """Minimum of a column"""
+        return _min(self.columns[field])
+
+    def max(self, field: str) -> float:
+        """Maximum of a column"""
+        return _max(self.columns[field])
+
+    def mean(self, field: str) -> float:
+        """Arithmetic mean of a column"""
+        return _mean(self.columns[field])
+
+    def sum(self, field: str) -> float:
+        """Sum of a column"""
+        return _sum(self.columns[field])
+
+    def percentile(self, field: str, q: float) -> float:
+        """Percentile of a column, linearly interpolated between the closest ranks.
+
+        Parameters
+        ------------
+        field: :class:`str`
+            Field name
+        q: :class:`float`
+            Percentile, from 0 to 100
+        """
+        if not 0 <= q <= 100:
+            raise ValueError("Percentile should be between 0 and 100")
+        return _percentile(self.columns[field], q)
+
+    def circular_mean(self, field: str = "wind_degree") -> float:
+        """Circular mean of a column of angles in degrees (e.g. wind direction).
+
+        Returns
+        ---------
+        :class:`float`
+            Mean direction from 0 to 360, ``NaN`` when undefined
+        """
+        return _circular_mean(self.columns[field])
+
+    def rolling(self, field: str, window: int, func: str = "mean") -> array:
+        """Compute a rolling (moving window) aggregation over a column.
+
+        Windows are counted in hours and computed in a single pass, regardless of the window size.
+        Running sums use compensated (Neumaier) summation, so rounding errors of values entering and leaving the window do not accumulate.
+
+        Parameters
+        ------------
+        field: :class:`str`
+            Field name
+        window: :class:`int`
+            Window length in hours
+        func: :class:`str`
+            One of ``mean``, ``sum``, ``min`` or ``max``
+
+        Returns
+        ---------
+        :class:`array.array`
+            One value per full window, i.e. ``len(self) - window + 1`` values
+        """
+        if window < 1:
+            raise ValueError("Window should be a positive integer")
+        values = self.columns[field]
+        out = array("d")
+
+        if func in ("mean", "sum"):
+            total, compensation, count = 0.0, 0.0, 0
+            for i, value in enumerate(values):
+                if value == value:
+                    total, compensation = _add_compensated(total, compensation, value)
+                    count += 1
+                if i >= window:
+                    old = values[i - window]
+                    if old == old:
+                        total, compensation = _add_compensated(total, compensation, -old)
+                        count -= 1
+                if i >= window - 1:
+                    result = total + compensation
+                    if func == "sum":
+                        out.append(result)
+                    else:
+                        out.append(result / count if count else NAN)
+            return out
+
+        if func in ("min", "max"):
+            # monotonic queue of indexes, the best value is always at the front
+            better = (lambda a, b: a <= b) if func == "min" else (lambda a, b: a >= b)
+            queue: deque = deque()
+            for i, value in enumerate(values):
+                if value == value:
+                    while queue and better(value, values[queue[-1]]):
+                        queue.pop()
+                    queue.append(i)
+                while queue and queue[0] <= i - window:
+                    queue.popleft()
+                if i >= window - 1:
+                    out.append(values[queue[0]] if queue else NAN)
+            return out
+
+        raise ValueError("Rolling aggregation should be one of: mean, sum, min, max")
+
+    def resample(
+        self,
+        field: str,
+        rule: Union[str, int] = "daily",
+        func: Union[str, Callable[[Sequence[float]], float]] = "mean",
+    ) -> Tuple[array, array]:
+        """Resample a column into fixed, local time buckets (e.g. 3 hours or whole days).
+
+        Buckets are aligned to local midnight. When columns of many series were merged with :meth:`concat`,
+        hours from all of them falling into the same bucket are aggregated together.
+
+        Parameters
+        ------------
+        field: :class:`str`
+            Field name
+        rule: Union[:class:`str`, :class:`int`]
+            Bucket size: ``1h``, ``3h``, ``6h``, ``12h``, ``daily`` or a number of seconds
+        func: Union[:class:`str`, Callable]
+            Aggregation used for every bucket, see :meth:`aggregate`
+
+        Returns
+        ---------
+        Tuple[:class:`array.array`, :class:`array.array`]
+            Local start epochs of the buckets (sorted) and aggregated values
+        """
+        step = RESAMPLE_STEPS.get(rule, rule) if isinstance(rule, str) else rule
+        if not isinstance(step, int) or step <= 0:
+            raise ValueError(f"Invalid resample rule {rule!r}")
+        reducer = self._resolve(func)
+
+        values = self.columns[field]
+        buckets: Dict[int, List[float]] = {}
+        for local, value in zip(self.local_epochs, values):
+            bucket = local - local % step
+            try:
+                buckets[bucket].append(value)
+            except KeyError:
+                buckets[bucket] = [value]
+
+        starts = array("q", sorted(buckets))
+        return starts, array("d", [reducer(buckets[start]) for start in starts])
+
+    def to_numpy(self, field: str) -> Any:
+        """Get a column as a :class:`numpy.ndarray` without copying.
+
+        .. note::
+            This method requires ``numpy`` to be installed.
+        """
+        import numpy
+        return numpy.frombuffer(self.columns[field], dtype=numpy.float64)
@@ -0,0 +1,49 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from typing import (
+    NamedTuple,
+)
+
+__all__ = (
+    "Condition",
+)
+
+class Condition(NamedTuple):
+    """Weather condition, part of most weather models (e.g. :class:`CurrentWeatherData` or :class:`ForecastHour`).
+
+    Conditions are immutable and shared between models through an intern table,
+    so two models with the same condition usually hold the very same object.
+
+    Attributes
+    ------------
+    text: :class:`str`
+        Weather condition text
+    icon: :class:`str`
+        Link to the weather condition icon
+    code: :class:`int`
+        Weather condition code
+    """
+    text: str
+    icon: str
+    code: int
@@ -29,6 +29,8 @@ from typing import (
 
 from .base import APIResponse
 from .location import LocationData
+from .condition import Condition
+from .intern import intern_condition, intern_string
 from .air_quality import AirQualityData
 
 __all__ = (
@@ -56,6 +58,8 @@ class CurrentWeatherData(APIResponse):
         Weather temperature in Fahrenheit
     is_day: :class:`bool`
         Wherever the current time is considered day time.
+    condition: :class:`Condition`
+        Weather condition, shared with other models that have the same condition
     condition_text: :class:`str`
         Weather condition text
     condition_icon: :class:`str`
@@ -99,7 +103,7 @@ class CurrentWeatherData(APIResponse):
     ) -> None:
         super().__init__(raw, status, code)
         
-        self.location: LocationData = LocationData(raw["location"], status, code)
+        self.location: LocationData = LocationData.shared(raw["location"], status, code)
         raw = raw["current"]
         
         self.aqi: Optional[AirQualityData] = AirQualityData(raw["air_quality"]) if raw.get("air_quality") else None
@@ -107,13 +111,14 @@ class CurrentWeatherData(APIResponse):
         self.temp_c: float = raw["temp_c"]
         self.temp_f: float = raw["temp_f"]
         self.is_day: bool = bool(raw["is_day"])
-        self.condition_text: str = raw["condition"]["text"]
-        self.condition_icon: str = raw["condition"]["icon"]
-        self.condition_code: int = raw["condition"]["code"]
+        self.condition: Condition = intern_condition(raw["condition"])
+        self.condition_text: str = self.condition.text
+        self.condition_icon: str = self.condition.icon
+        self.condition_code: int = self.condition.code
         self.wind_mph: float = raw["wind_mph"]
         self.wind_kph: float = raw["wind_kph"]
         self.wind_degree: int = raw["wind_degree"]
-        self.wind_dir: str = raw["wind_dir"]
+        self.wind_dir: str = intern_string(raw["wind_dir"])
         self.pressure_mb: float = raw["pressure_mb"]
         self.pressure_in: float = raw["pressure_in"]
         self.precip_mm: float = raw["precip_mm"]
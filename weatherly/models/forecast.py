@@ -30,8 +30,11 @@ from typing import (
 )
 
 from .base import APIResponse, PartialAPIResponse
+from .series import HourlySeries
 from .air_quality import AirQualityData
 from .location import LocationData
+from .condition import Condition
+from .intern import intern_condition, intern_string
 from .astro import AstronomicalData
 from .alert import AlertData
 
@@ -56,6 +59,8 @@ class ForecastHour(PartialAPIResponse):
         Temperature in celsius
     temp_f: :class:`float`
         Temperature in fahrenheit
+    condition: :class:`Condition`
+        Weather condition, shared with other models that have the same condition
     condition_text: :class:`str`
         Weather condition text
     condition_icon: :class:`str`
@@ -131,13 +136,14 @@ class ForecastHour(PartialAPIResponse):
         self.time: str = raw["time"]
         self.temp_c: float = raw["temp_c"]
         self.temp_f: float = raw["temp_f"]
-        self.condition_text: str = raw["condition"]["text"]
-        self.condition_icon: str = raw["condition"]["icon"]
-        self.condition_code: int = raw["condition"]["code"]
+        self.condition: Condition = intern_condition(raw["condition"])
+        self.condition_text: str = self.condition.text
+        self.condition_icon: str = self.condition.icon
+        self.condition_code: int = self.condition.code
         self.wind_mph: float = raw["wind_mph"]
         self.wind_kph: float = raw["wind_kph"]
         self.wind_degree: int = raw["wind_degree"]
-        self.wind_dir: str = raw["wind_dir"]
+        self.wind_dir: str = intern_string(raw["wind_dir"])
         self.pressure_mb: float = raw["pressure_mb"]
         self.pressure_in: float = raw["pressure_in"]
         self.precip_mm: float = raw["precip_mm"]
@@ -207,6 +213,8 @@ class ForecastDay(PartialAPIResponse):
         Average humidity as percentage
     uv: Optional[:class:`float`]
         UV Index. Can be ``None`` when this class is returned from Future API
+    condition: :class:`Condition`
+        Weather condition, shared with other models that have the same condition
     condition_text: :class:`str`
         Weather condition text
     condition_icon: :class:`str`
@@ -245,9 +253,10 @@ class ForecastDay(PartialAPIResponse):
         self.avgvis_miles: float = raw["avgvis_miles"]
         self.avghumidity: int = raw["avghumidity"]
         self.uv: Optional[float] = raw.get("uv")
-        self.condition_text: str = raw["condition"]["text"]
-        self.condition_icon: str = raw["condition"]["icon"]
-        self.condition_code: int = raw["condition"]["code"]
+        self.condition: Condition = intern_condition(raw["condition"])
+        self.condition_text: str = self.condition.text
+        self.condition_icon: str = self.condition.icon
+        self.condition_code: int = self.condition.code
         if raw.get("air_quality"): self.aqi: AirQualityData = AirQualityData(raw["air_quality"])
         else: self.aqi = None
         
@@ -258,8 +267,11 @@ class ForecastDay(PartialAPIResponse):
         self.astro: AstronomicalData = AstronomicalData(raw["astro"], 0, None)
 
     
-class ForecastData(APIResponse):
+class ForecastData(HourlySeries, APIResponse):
     """Forecast data returned from Forecast API
+
+    Hours can be looked up by time with :meth:`~HourlySeries.at`, :meth:`~HourlySeries.nearest`,
+    :meth:`~HourlySeries.between` and :meth:`~HourlySeries.hour_of_day`, see :class:`HourlySeries`.
     
     Attributes
     -------------
@@ -284,7 +296,7 @@ class ForecastData(APIResponse):
     ) -> None:
         super().__init__(raw, status, code)
         
-        self.location: LocationData = LocationData(raw["location"], status, code)
+        self.location: LocationData = LocationData.shared(raw["location"], status, code)
         self.forecast_days: List[ForecastDay] = list([ForecastDay(elem) for elem in raw["forecast"]["forecastday"]])
         self.alerts: List[AlertData] = []
         alert_data = raw.get("alerts", {})
@@ -59,5 +59,5 @@ class FutureData(APIResponse):
     ) -> None:
         super().__init__(raw, status, code)
         
-        self.location: LocationData = LocationData(raw["location"], status, code)
+        self.location: LocationData = LocationData.shared(raw["location"], status, code)
         self.day: ForecastDay = ForecastDay(raw["forecast"]["forecastday"][0])
@@ -0,0 +1,143 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Optional,
+    TypeVar,
+)
+
+from .condition import Condition
+
+T = TypeVar("T")
+
+__all__ = (
+    "InternTable",
+)
+
+class InternTable():
+    """A bounded table of shared, immutable values.
+
+    Looking up a value that is already in the table returns the stored instance, so equal values
+    built from different responses end up being the same object. When the table is full the least recently
+    used entry is dropped, which keeps memory usage bounded for long running processes.
+
+    Parameters
+    ------------
+    maxsize: :class:`int`
+        Maximum number of entries kept in the table. ``0`` disables interning.
+
+    Attributes
+    ------------
+    maxsize: :class:`int`
+        Maximum number of entries kept in the table
+    hits: :class:`int`
+        Number of lookups that returned an already stored value
+    misses: :class:`int`
+        Number of lookups that stored a new value
+    """
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._table: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def intern(self, key: Hashable, factory: Optional[Callable[[], T]] = None) -> T:
+        """Get the shared value for ``key``, storing a new one if it is missing.
+
+        Parameters
+        ------------
+        key: Hashable
+            Key of the value. When ``factory`` is ``None`` the key is the value itself (e.g. a string)
+        factory: Optional[Callable[[], Any]]
+            Called to build the value when the key is not in the table yet
+
+        Returns
+        ---------
+        Any
+            The shared value
+        """
+        table = self._table
+        try:
+            value = table[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            table.move_to_end(key)
+            return value
+
+        value = key if factory is None else factory()
+        self.misses += 1
+        if self.maxsize <= 0:
+            return value # type: ignore
+
+        table[key] = value
+        if len(table) > self.maxsize:
+            table.popitem(last=False)
+        return value # type: ignore
+
+    def clear(self) -> None:
+        """Remove all entries from the table and reset counters"""
+        self._table.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._table
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} size={len(self)} maxsize={self.maxsize} hits={self.hits} misses={self.misses}>"
+
+# tables shared by all models
+strings = InternTable(maxsize=8192)
+conditions = InternTable(maxsize=1024)
+locations = InternTable(maxsize=4096)
+
+def intern_string(value: T) -> T:
+    """Intern a string value, other values (e.g. ``None``) are returned as they are"""
+    if value.__class__ is not str:
+        return value
+    return strings.intern(value)
+
+def intern_condition(raw: Dict[str, Any]) -> Condition:
+    """Get a shared :class:`Condition` from a raw ``condition`` dictionary"""
+    key = (raw["text"], raw["icon"], raw["code"])
+    return conditions.intern(key, lambda: Condition(
+        intern_string(raw["text"]),
+        intern_string(raw["icon"]),
+        raw["code"],
+    ))
+
+def clear() -> None:
+    """Clear all intern tables used by the models"""
+    strings.clear()
+    conditions.clear()
+    locations.clear()
@@ -29,6 +29,8 @@ from typing import (
 )
 
 from .base import APIResponse
+from .intern import intern_string
+from .location import local_time
 
 __all__ = (
     "IPData",
@@ -72,9 +74,10 @@ class IPData(APIResponse):
     tz_id: :class:`str`
         Time zone
     localtime_epoch: :class:`int`
-        Local time epoch
+        Current local time epoch, computed from :attr:`tz_id` (the time of the response if the time zone is not known)
     localtime_formatted: :class:`str`
-        Formatted local time string (e.g. 2023-04-30 17:54)
+        Current formatted local time string (e.g. 2023-04-30 17:54), computed from :attr:`tz_id`
+        (the time of the response if the time zone is not known)
     """
     def __init__(
         self,
@@ -86,16 +89,24 @@ class IPData(APIResponse):
         
         self.ip: str = raw["ip"]
         self.type: Literal["ipv4", "ipv6"] = raw["type"]
-        self.continent_code: str = raw["continent_code"]
-        self.continent_name: str = raw["continent_name"]
-        self.country_code: str = raw["country_code"]
-        self.country_name: str = raw["country_name"]
+        self.continent_code: str = intern_string(raw["continent_code"])
+        self.continent_name: str = intern_string(raw["continent_name"])
+        self.country_code: str = intern_string(raw["country_code"])
+        self.country_name: str = intern_string(raw["country_name"])
         self.is_eu: bool = bool(raw["is_eu"])
         self.geoname_id: int = raw["geoname_id"]
-        self.city: str = raw["city"]
-        self.region: str = raw["region"]
+        self.city: str = intern_string(raw["city"])
+        self.region: str = intern_string(raw["region"])
         self.latitude: float = raw["lat"]
         self.longitude: float = raw["lon"]
-        self.tz_id: str = raw["tz_id"]
-        self.localtime_epoch: int = raw["localtime_epoch"]
-        self.localtime_formatted: str = raw["localtime"]
\ No newline at end of file
+        self.tz_id: str = intern_string(raw["tz_id"])
+
+    @property
+    def localtime_epoch(self) -> int:
+        now = local_time(self.tz_id)
+        return now[0] if now is not None else self.raw["localtime_epoch"]
+
+    @property
+    def localtime_formatted(self) -> str:
+        now = local_time(self.tz_id)
+        return now[1] if now is not None else self.raw["localtime"]
\ No newline at end of file
@@ -21,18 +21,50 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+import datetime
+import functools
+import time
 from typing import (
     Dict,
     Any,
-    Optional
+    Optional,
+    Tuple,
 )
+from zoneinfo import ZoneInfo
 
 from .base import APIResponse
+from . import intern as _intern
+from .intern import intern_string
 
 __all__ = (
     "LocationData",
 )
 
+# fields identifying a location, local time changes with every response so it is not part of the intern key
+_KEY_FIELDS = ("id", "name", "region", "country", "lat", "lon", "tz_id")
+
+@functools.lru_cache(maxsize=1024)
+def _zone(tz_id: Optional[str]) -> Optional[ZoneInfo]:
+    try:
+        return ZoneInfo(tz_id) if tz_id else None
+    except (ValueError, LookupError): # unknown or malformed time zone ID
+        return None
+
+def local_time(tz_id: Optional[str]) -> Optional[Tuple[int, str]]:
+    """Get the current local time in a time zone, ``None`` if the time zone is not known.
+
+    Returns
+    ---------
+    Optional[Tuple[:class:`int`, :class:`str`]]
+        Current epoch and local time formatted like in API responses (e.g. ``2023-06-21 9:05``)
+    """
+    zone = _zone(tz_id)
+    if zone is None:
+        return None
+    epoch = time.time()
+    now = datetime.datetime.fromtimestamp(epoch, zone)
+    return int(epoch), f"{now:%Y-%m-%d} {now.hour}:{now.minute:02d}"
+
 class LocationData(APIResponse):
     """Location data, returned with most requests.
     
@@ -59,9 +91,11 @@ class LocationData(APIResponse):
     timezone_id: Optional[:class:`str`]
         Timezone ID of the location (e.g. Europe/London). Could be ``None`` when using the Search/Autocomplete API.
     localtime_epoch: Optional[:class:`int`]
-        Local time of the location as a timestamp
+        Current local time of the location as a timestamp, computed from :attr:`timezone_id`
+        (the time of the response if the time zone is not known)
     localtime_formatted: Optional[:class:`str`]
-        Formatted local time of the location
+        Current formatted local time of the location, computed from :attr:`timezone_id`
+        (the time of the response if the time zone is not known)
     """
     def __init__(
         self, 
@@ -72,11 +106,54 @@ class LocationData(APIResponse):
         super().__init__(raw, status, code)
 
         self.id: int = raw.get('id', None)
-        self.name: str = raw['name']
-        self.region: str = raw['region']
-        self.country: str = raw['country']
+        self.name: str = intern_string(raw['name'])
+        self.region: str = intern_string(raw['region'])
+        self.country: str = intern_string(raw['country'])
         self.latitude: float = raw['lat']
         self.longitude: float = raw['lon']
-        self.timezone_id: str = raw.get('tz_id', None)
-        self.localtime_epoch: int = raw.get('localtime_epoch')
-        self.localtime_formatted: str = raw.get('localtime', None)
\ No newline at end of file
+        self.timezone_id: str = intern_string(raw.get('tz_id', None))
+
+    # local time is computed on access, so cached and shared objects never report a stale time
+
+    @property
+    def localtime_epoch(self) -> Optional[int]:
+        now = local_time(self.timezone_id)
+        return now[0] if now is not None else self.raw.get('localtime_epoch')
+
+    @property
+    def localtime_formatted(self) -> Optional[str]:
+        now = local_time(self.timezone_id)
+        return now[1] if now is not None else self.raw.get('localtime', None)
+
+    @classmethod
+    def shared(
+        cls,
+        raw: Dict[str, Any],
+        status: int,
+        code: Optional[int]
+    ) -> "LocationData":
+        """Get a :class:`LocationData` instance for the given data, shared with other models built from data of the same location.
+
+        Used by other models when parsing responses, so many forecasts for the same location hold a single object.
+        Locations are identified by their ID, name, region, country, coordinates and time zone.
+        Shared instances are frozen (see :meth:`PartialAPIResponse.freeze`), so changing one cannot change other models.
+
+        Parameters
+        ------------
+        raw: Dict[:class:`str`, Any]
+            Raw location data
+        status: :class:`int`
+            HTTP status of the response
+        code: Optional[:class:`int`]
+            Response code
+
+        Returns
+        ---------
+        :class:`LocationData`
+            A shared, frozen location data object
+        """
+        try:
+            key = (cls, status, code, tuple(raw.get(field) for field in _KEY_FIELDS))
+            return _intern.locations.intern(key, lambda: cls(raw, status, code).freeze())
+        except TypeError: # unhashable values, nothing to share
+            return cls(raw, status, code).freeze()
@@ -30,7 +30,10 @@ from typing import (
 )
 
 from .base import APIResponse, PartialAPIResponse
+from .series import HourlySeries
 from .location import LocationData
+from .condition import Condition
+from .intern import intern_condition, intern_string
 from .forecast import ForecastHour
 from .astro import AstronomicalData
 from ..enums import TideHeight
@@ -81,6 +84,8 @@ class MarineHour(ForecastHour):
         Temperature in celsius
     temp_f: :class:`float`
         Temperature in fahrenheit
+    condition: :class:`Condition`
+        Weather condition, shared with other models that have the same condition
     condition_text: :class:`str`
         Weather condition text
     condition_icon: :class:`str`
@@ -168,7 +173,7 @@ class MarineHour(ForecastHour):
         self.swell_ht_mt: float = raw["swell_ht_mt"]
         self.swell_ht_ft: float = raw["swell_ht_ft"]
         self.swell_dir: float = raw["swell_dir"]
-        self.swell_dir_16_point: str = raw["swell_dir_16_point"]
+        self.swell_dir_16_point: str = intern_string(raw["swell_dir_16_point"])
         self.swell_period_secs: float = raw["swell_period_secs"]
         self.water_temp_c: float = raw["water_temp_c"]
         self.water_temp_f: float = raw["water_temp_f"]
@@ -212,6 +217,8 @@ class MarineDay(PartialAPIResponse):
         Average humidity as percentage
     uv: :class:`float`
         UV Index
+    condition: :class:`Condition`
+        Weather condition, shared with other models that have the same condition
     condition_text: :class:`str`
         Weather condition text
     condition_icon: :class:`str`
@@ -251,9 +258,10 @@ class MarineDay(PartialAPIResponse):
         self.avgvis_miles: float = raw["avgvis_miles"]
         self.avghumidity: int = raw["avghumidity"]
         self.uv: float = raw["uv"]
-        self.condition_text: str = raw["condition"]["text"]
-        self.condition_icon: str = raw["condition"]["icon"]
-        self.condition_code: int = raw["condition"]["code"]
+        self.condition: Condition = intern_condition(raw["condition"])
+        self.condition_text: str = self.condition.text
+        self.condition_icon: str = self.condition.icon
+        self.condition_code: int = self.condition.code
 
         _all_tides = []
         for tide in raw["tides"]:
@@ -269,8 +277,11 @@ class MarineDay(PartialAPIResponse):
         self.astro: AstronomicalData = AstronomicalData(raw["astro"], 0, None)
     
 
-class MarineData(APIResponse):
+class MarineData(HourlySeries, APIResponse):
     """Marine data, response from Marine API as a class
+
+    Hours can be looked up by time with :meth:`~HourlySeries.at`, :meth:`~HourlySeries.nearest`,
+    :meth:`~HourlySeries.between` and :meth:`~HourlySeries.hour_of_day`, see :class:`HourlySeries`.
     
     Attributes
     ------------
@@ -293,7 +304,7 @@ class MarineData(APIResponse):
     ) -> None:
         super().__init__(raw, status, code)
         
-        self.location: LocationData = LocationData(raw["location"], status, code)
+        self.location: LocationData = LocationData.shared(raw["location"], status, code)
         self.marine_days: List[MarineDay] = list([
             MarineDay(daydata) for daydata in raw["forecast"]["forecastday"]
         ])
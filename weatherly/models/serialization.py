@@ -0,0 +1,151 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import pickle
+import struct
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Tuple,
+)
+
+from ..errors import SerializationError
+
+__all__ = (
+    "dumps",
+    "loads",
+)
+
+MAGIC = b"WTLY"
+VERSION = 1
+_HEADER = struct.Struct("<4sB")
+_PREFIX = _HEADER.pack(MAGIC, VERSION)
+
+def _compact(obj: Any, strings: Dict[str, str]) -> Any:
+    """Copy of raw data where equal strings are the same object, so pickle stores every distinct string once"""
+    # frozen models hold read-only mappings and tuples instead of dicts and lists
+    cls = obj.__class__
+    if cls is dict or cls is MappingProxyType:
+        compact = {}
+        for key, value in obj.items():
+            cls = value.__class__
+            if cls is str:
+                value = strings.setdefault(value, value)
+            elif cls is dict or cls is list or cls is MappingProxyType or cls is tuple:
+                value = _compact(value, strings)
+            compact[strings.setdefault(key, key)] = value
+        return compact
+    if cls is not list and cls is not tuple:
+        return obj
+    items = []
+    for value in obj:
+        cls = value.__class__
+        if cls is str:
+            value = strings.setdefault(value, value)
+        elif cls is dict or cls is list or cls is MappingProxyType or cls is tuple:
+            value = _compact(value, strings)
+        items.append(value)
+    return items
+
+_classes: Dict[str, type] = {}
+
+def _find_class(name: str) -> type:
+    cls = _classes.get(name)
+    if cls is None:
+        # only model classes exported by weatherly.models can be loaded
+        from .. import models
+        cls = getattr(models, name, None)
+        if not isinstance(cls, type) or not issubclass(cls, models.PartialAPIResponse):
+            raise SerializationError(f"Refusing to load unknown model class {name}")
+        _classes[name] = cls
+    return cls
+
+def _state(model: Any) -> Tuple[str, Tuple[Any, ...], Any, bool]:
+    return (model._unfrozen_class().__name__, model._serialize_args(), _compact(model.raw, {}), model.frozen)
+
+def reduce_model(model: Any, protocol: int) -> Tuple[Callable[..., Any], Tuple[Any, ...]]:
+    """Implementation of ``__reduce_ex__`` for models, used by :mod:`pickle`"""
+    return (_rebuild, _state(model))
+
+def _rebuild(name: str, args: Tuple[Any, ...], raw: Any, frozen: bool = False) -> Any:
+    model = _find_class(name)(raw, *args)
+    return model.freeze() if frozen else model
+
+def dumps(model: Any) -> bytes:
+    """Serialize a model into a compact, versioned binary format.
+
+    The raw data of the model is stored with :mod:`pickle` (every distinct string only once), and the model
+    is rebuilt from it when loading, which is faster than parsing JSON. Forecasts take about half the size of the JSON response.
+
+    .. note::
+        Pickled models store the same data, so ``pickle.dumps(model)`` works too.
+
+    .. warning::
+        Like :mod:`pickle`, only load data you trust.
+
+    Parameters
+    ------------
+    model: Union[:class:`APIResponse`, :class:`PartialAPIResponse`]
+        The model to serialize
+
+    Returns
+    ---------
+    :class:`bytes`
+        Serialized model
+    """
+    return _PREFIX + pickle.dumps(_state(model), protocol=5)
+
+def loads(data: bytes) -> Any:
+    """Load a model serialized with :func:`dumps`.
+
+    Parameters
+    ------------
+    data: :class:`bytes`
+        Serialized model
+
+    Returns
+    ---------
+    Union[:class:`APIResponse`, :class:`PartialAPIResponse`]
+        Loaded model
+
+    Raises
+    ---------
+    :exc:`SerializationError`
+        Raised when the data is not a serialized model or was serialized by an unsupported version
+    """
+    if data[:_HEADER.size] != _PREFIX:
+        if len(data) < _HEADER.size:
+            raise SerializationError("Data is too short to be a serialized model")
+        magic, version = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise SerializationError("Data is not a serialized weatherly model")
+        raise SerializationError(f"Unsupported serialization version {version} (supported: {VERSION})")
+
+    try:
+        return _rebuild(*pickle.loads(memoryview(data)[_HEADER.size:]))
+    except SerializationError:
+        raise
+    except Exception as exc:
+        raise SerializationError("Failed to load serialized model") from exc
@@ -0,0 +1,209 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import abc
+from bisect import bisect_left, bisect_right
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
+
+from .columns import HourlyColumns
+
+__all__ = (
+    "HourIndex",
+    "HourlySeries",
+)
+
+class HourIndex():
+    """An index of hourly data sorted by ``time_epoch``, used for fast lookups.
+
+    All lookups use binary search over the sorted epochs, so they take ``O(log n)`` time.
+    Selecting by hour of day uses precomputed buckets.
+
+    .. note::
+        You should not create this class manually, use :py:attr:`HourlySeries.hour_index` instead.
+
+    Parameters
+    ------------
+    hours: Iterator[Any]
+        Hours to index, e.g. :class:`ForecastHour` or :class:`MarineHour` objects
+
+    Attributes
+    ------------
+    epochs: List[:class:`int`]
+        Sorted ``time_epoch`` values of the indexed hours
+    hours: List[Any]
+        Indexed hours, in the same order as :py:attr:`epochs`
+    """
+    def __init__(self, hours: Iterator[Any]) -> None:
+        self.hours: List[Any] = sorted(hours, key=lambda hour: hour.time_epoch)
+        self.epochs: List[int] = [hour.time_epoch for hour in self.hours]
+
+        self._by_hour_of_day: Dict[int, List[Any]] = {}
+        for hour in self.hours:
+            # local time is formatted as yyyy-MM-dd HH:mm
+            self._by_hour_of_day.setdefault(int(hour.time[11:13]), []).append(hour)
+
+    def at(self, epoch: int) -> Optional[Any]:
+        """Get the hour containing the given timestamp.
+
+        Parameters
+        ------------
+        epoch: :class:`int`
+            Unix timestamp
+
+        Returns
+        ---------
+        Optional[Any]
+            The hour that started at or before ``epoch`` and lasts until it, ``None`` if the timestamp is out of range
+        """
+        idx = bisect_right(self.epochs, epoch) - 1
+        if idx < 0 or epoch - self.epochs[idx] >= 3600:
+            return None
+        return self.hours[idx]
+
+    def nearest(self, epoch: int) -> Optional[Any]:
+        """Get the hour whose ``time_epoch`` is the closest to the given timestamp.
+
+        Parameters
+        ------------
+        epoch: :class:`int`
+            Unix timestamp
+
+        Returns
+        ---------
+        Optional[Any]
+            The nearest hour. ``None`` only when the index is empty
+        """
+        epochs = self.epochs
+        if not epochs:
+            return None
+        idx = bisect_left(epochs, epoch)
+        if idx == 0:
+            return self.hours[0]
+        if idx == len(epochs):
+            return self.hours[-1]
+        if epoch - epochs[idx - 1] <= epochs[idx] - epoch:
+            return self.hours[idx - 1]
+        return self.hours[idx]
+
+    def between(self, start: int, end: int) -> List[Any]:
+        """Get all hours with ``start <= time_epoch < end``.
+
+        Parameters
+        ------------
+        start: :class:`int`
+            Start timestamp (inclusive)
+        end: :class:`int`
+            End timestamp (exclusive)
+
+        Returns
+        ---------
+        List[Any]
+            Hours in the given range, sorted by time
+        """
+        return self.hours[bisect_left(self.epochs, start):bisect_left(self.epochs, end)]
+
+    def hour_of_day(self, hour: int) -> List[Any]:
+        """Get all hours with the given local hour of day, e.g. every 12:00.
+
+        Parameters
+        ------------
+        hour: :class:`int`
+            Hour of day, from 0 to 23
+
+        Returns
+        ---------
+        List[Any]
+            Matching hours, sorted by time
+        """
+        return list(self._by_hour_of_day.get(hour, []))
+
+    def __len__(self) -> int:
+        return len(self.hours)
+
+class HourlySeries(abc.ABC):
+    """An abstract mixin for models with hourly data, providing time-indexed lookups.
+
+    Classes using this mixin have to implement ``iter_hours``.
+    The index and the columns are built on first use and reused afterwards.
+
+    .. container:: operations
+
+        .. describe:: x.at(epoch)
+
+            Get the hour containing the timestamp, see :meth:`HourIndex.at`
+
+        .. describe:: x.nearest(epoch)
+
+            Get the hour nearest to the timestamp, see :meth:`HourIndex.nearest`
+
+        .. describe:: x.between(start, end)
+
+            Get hours in a time range, see :meth:`HourIndex.between`
+
+        .. describe:: x.hour_of_day(hour)
+
+            Get hours with the given local hour, see :meth:`HourIndex.hour_of_day`
+    """
+    @abc.abstractmethod
+    def iter_hours(self) -> Iterator[Any]:
+        """Iterate over all hours, implemented by subclasses"""
+
+    @property
+    def hour_index(self) -> HourIndex:
+        """:class:`HourIndex`: An index of all hours of this object, sorted by time"""
+        index = self.__dict__.get("_hour_index")
+        if index is None:
+            index = HourIndex(self.iter_hours())
+            self.__dict__["_hour_index"] = index
+        return index
+
+    @property
+    def columns(self) -> HourlyColumns:
+        """:class:`HourlyColumns`: Numeric hourly data as columns, used for aggregations (e.g. rolling windows or resampling)"""
+        columns = self.__dict__.get("_columns")
+        if columns is None:
+            columns = HourlyColumns.from_hours(self.iter_hours())
+            self.__dict__["_columns"] = columns
+        return columns
+
+    def at(self, epoch: int) -> Optional[Any]:
+        """Get the hour containing the given timestamp, see :meth:`HourIndex.at`"""
+        return self.hour_index.at(epoch)
+
+    def nearest(self, epoch: int) -> Optional[Any]:
+        """Get the hour nearest to the given timestamp, see :meth:`HourIndex.nearest`"""
+        return self.hour_index.nearest(epoch)
+
+    def between(self, start: int, end: int) -> List[Any]:
+        """Get hours with ``start <= time_epoch < end``, see :meth:`HourIndex.between`"""
+        return self.hour_index.between(start, end)
+
+    def hour_of_day(self, hour: int) -> List[Any]:
+        """Get hours with the given local hour of day, see :meth:`HourIndex.hour_of_day`"""
+        return self.hour_index.hour_of_day(hour)
@@ -25,7 +25,8 @@ from typing import (
     Dict,
     Any,
     Optional,
-    List
+    List,
+    Tuple
 )
 
 from .base import APIResponse, PartialAPIResponse
@@ -72,6 +73,9 @@ class SportsEvent(PartialAPIResponse):
         self.start_time = raw["start"]
         self.match = raw["match"]
 
+    def _serialize_args(self) -> Tuple[Any, ...]:
+        return (self.event_type,)
+
 class SportsData(APIResponse):
     """Represents sports data returned from the Sports API
 
@@ -0,0 +1,435 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections.abc import Mapping
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+from urllib.parse import quote, unquote
+
+from ..models import ForecastData, HourlyColumns, MarineData
+
+__all__ = (
+    "SnapshotArchive",
+)
+
+_MODELS: Dict[str, Type[Union[ForecastData, MarineData]]] = {
+    "ForecastData": ForecastData,
+    "MarineData": MarineData,
+}
+_REMOVED = object()
+
+def _plain(value: Any) -> Any:
+    # frozen models keep tuples and mapping proxies, make the value JSON friendly
+    if isinstance(value, Mapping):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+def _flatten_into(out: Dict[str, Any], prefix: str, data: Mapping) -> None:
+    for key, value in data.items():
+        if isinstance(value, Mapping):
+            _flatten_into(out, f"{prefix}{key}.", value)
+        else:
+            out[prefix + key] = _plain(value)
+
+def flatten(raw: Mapping) -> Dict[str, Any]:
+    """Flatten raw forecast data into ``{path: value}``, with days and hours keyed by their epochs.
+
+    Day fields are keyed as ``day:<date_epoch>.<path>`` and hour fields as ``hour:<date_epoch>:<time_epoch>.<path>``,
+    so the same target day or hour of two snapshots shares its keys.
+    """
+    out: Dict[str, Any] = {}
+    for section, value in raw.items():
+        if section != "forecast":
+            if isinstance(value, Mapping):
+                _flatten_into(out, section + ".", value)
+            else:
+                out[section] = _plain(value)
+            continue
+        for day in value["forecastday"]:
+            prefix = f"day:{day['date_epoch']}."
+            for key, item in day.items():
+                if key == "hour":
+                    for hour in item:
+                        _flatten_into(out, f"hour:{day['date_epoch']}:{hour['time_epoch']}.", hour)
+                elif isinstance(item, Mapping):
+                    _flatten_into(out, f"{prefix}{key}.", item)
+                else:
+                    out[prefix + key] = _plain(item)
+    return out
+
+def _set_path(target: Dict[str, Any], path: str, value: Any) -> None:
+    *parents, last = path.split(".")
+    for parent in parents:
+        target = target.setdefault(parent, {})
+    target[last] = value
+
+def unflatten(flat: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild raw forecast data from :func:`flatten` output. Days and hours are sorted by their epochs."""
+    raw: Dict[str, Any] = {}
+    days: Dict[int, Dict[str, Any]] = {}
+    hours: Dict[int, Dict[int, Dict[str, Any]]] = {}
+    for key, value in flat.items():
+        head, _, path = key.partition(".")
+        if head.startswith("day:"):
+            _set_path(days.setdefault(int(head[4:]), {}), path, value)
+        elif head.startswith("hour:"):
+            date_epoch, time_epoch = head[5:].split(":")
+            _set_path(hours.setdefault(int(date_epoch), {}).setdefault(int(time_epoch), {}), path, value)
+        else:
+            _set_path(raw, key, value)
+
+    forecastday = []
+    for date_epoch in sorted(days.keys() | hours.keys()):
+        day = days.get(date_epoch, {})
+        day["hour"] = [hour for _, hour in sorted(hours.get(date_epoch, {}).items())]
+        forecastday.append(day)
+    raw["forecast"] = {"forecastday": forecastday}
+    return raw
+
+class _Location():
+    """Loaded snapshots of a single location"""
+    def __init__(self) -> None:
+        self.records: List[Dict[str, Any]] = []
+        self.issued: List[int] = []
+        self.keyframes: List[int] = [] # indexes of full snapshots
+        self.state: Dict[str, Any] = {} # flat data of the latest snapshot
+        # change points of every key: key -> ([snapshot index], [value or _REMOVED])
+        self.changes: Dict[str, Tuple[List[int], List[Any]]] = {}
+        self.hour_keys: Dict[Tuple[int, str], str] = {} # (time_epoch, field) -> key
+
+    def add(self, record: Dict[str, Any]) -> None:
+        index = len(self.records)
+        self.records.append(record)
+        self.issued.append(record["issued"])
+        if record["keyframe"]:
+            self.keyframes.append(index)
+            removed = [key for key in self.state if key not in record["set"]]
+            self.state = {}
+        else:
+            removed = record["del"]
+        for key in removed:
+            self.state.pop(key, None)
+            self._change(key, index, _REMOVED)
+        for key, value in record["set"].items():
+            if record["keyframe"] and self._last(key) == value:
+                self.state[key] = value
+                continue
+            self.state[key] = value
+            self._change(key, index, value)
+
+    def _last(self, key: str) -> Any:
+        change = self.changes.get(key)
+        return change[1][-1] if change else _REMOVED
+
+    def _change(self, key: str, index: int, value: Any) -> None:
+        change = self.changes.get(key)
+        if change is None:
+            change = self.changes[key] = ([], [])
+            if key.startswith("hour:"):
+                head, _, field = key.partition(".")
+                self.hour_keys[(int(head.rsplit(":", 1)[1]), field)] = key
+        positions, values = change
+        positions.append(index)
+        values.append(value)
+
+    def rebuild(self, index: int) -> Dict[str, Any]:
+        # start at the closest keyframe and apply deltas up to the snapshot
+        start = self.keyframes[bisect_right(self.keyframes, index) - 1]
+        flat = dict(self.records[start]["set"])
+        for record in self.records[start + 1:index + 1]:
+            for key in record["del"]:
+                flat.pop(key, None)
+            flat.update(record["set"])
+        return flat
+
+class SnapshotArchive():
+    """An archive of forecasts, recorded per location and issue time, used to study how forecasts change over time.
+
+    Every snapshot is stored as a field-level delta against the previous snapshot of the location,
+    only values that changed (or were removed) are saved. Days and hours are matched by ``date_epoch`` and ``time_epoch``,
+    so an hour that did not change between two forecasts takes no space.
+    A full snapshot (keyframe) is stored every ``keyframe_interval`` snapshots to keep reconstruction fast.
+
+    Snapshots are kept in a JSON lines file per location, and are loaded (and indexed) on first access.
+
+    .. code:: python
+
+        archive = weatherly.SnapshotArchive("forecasts")
+        archive.add("London", client.get_forecast_data("London", days=3))
+        # how did the forecast temperature for 12:00 change?
+        for issued, temp in archive.hour_series("London", 1687348800, "temp_c"):
+            print(issued, temp)
+
+    Parameters
+    ------------
+    path: :class:`str`
+        Directory of the archive, created if it does not exist
+    keyframe_interval: :class:`int`
+        Number of snapshots between full snapshots. Defaults to ``24``
+
+    Attributes
+    ------------
+    path: :class:`str`
+        Directory of the archive
+    keyframe_interval: :class:`int`
+        Number of snapshots between full snapshots
+    """
+    def __init__(self, path: str, keyframe_interval: int = 24) -> None:
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.path: str = path
+        self.keyframe_interval: int = keyframe_interval
+        self._loaded: Dict[str, _Location] = {}
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, location: str) -> str:
+        return os.path.join(self.path, quote(location, safe="") + ".jsonl")
+
+    def _load(self, location: str) -> _Location:
+        loaded = self._loaded.get(location)
+        if loaded is None:
+            loaded = _Location()
+            path = self._file(location)
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as file:
+                    for line in file:
+                        if line.endswith("\n"): # a line without a newline is an interrupted write
+                            loaded.add(json.loads(line))
+            self._loaded[location] = loaded
+        return loaded
+
+    def locations(self) -> List[str]:
+        """Get all locations with stored snapshots
+
+        Returns
+        ---------
+        List[:class:`str`]
+            Location keys
+        """
+        return sorted(unquote(name[:-6]) for name in os.listdir(self.path) if name.endswith(".jsonl"))
+
+    def add(self, location: str, forecast: Union[ForecastData, MarineData], issued: Optional[int] = None) -> bool:
+        """Add a forecast snapshot.
+
+        Parameters
+        ------------
+        location: :class:`str`
+            Location key, e.g. a query string or a location name
+        forecast: Union[:class:`ForecastData`, :class:`MarineData`]
+            Forecast to store
+        issued: Optional[:class:`int`]
+            Issue time of the forecast as an epoch. Defaults to ``current.last_updated_epoch`` of the forecast,
+            or the current time when the forecast has no current weather
+
+        Raises
+        --------
+        ValueError
+            The issue time is older than the latest snapshot of the location
+
+        Returns
+        ---------
+        :class:`bool`
+            ``True`` if the snapshot was added, ``False`` if a snapshot with the same issue time is already stored
+        """
+        if type(forecast).__name__ not in _MODELS:
+            raise TypeError(f"Cannot store {type(forecast).__name__} snapshots")
+        if issued is None:
+            current = forecast.raw.get("current")
+            issued = current["last_updated_epoch"] if current else int(time.time())
+
+        flat = flatten(forecast.raw)
+        with self._lock:
+            loaded = self._load(location)
+            if loaded.issued:
+                if issued == loaded.issued[-1]:
+                    return False
+                if issued < loaded.issued[-1]:
+                    raise ValueError(f"Snapshot issued at {issued} is older than the latest snapshot ({loaded.issued[-1]})")
+
+            record: Dict[str, Any] = {
+                "issued": issued,
+                "model": type(forecast).__name__,
+                "status": forecast.status,
+                "code": forecast.code,
+            }
+            if not loaded.keyframes or len(loaded.records) - loaded.keyframes[-1] >= self.keyframe_interval:
+                record.update({"keyframe": True, "set": flat, "del": []})
+            else:
+                state = loaded.state
+                record.update({
+                    "keyframe": False,
+                    "set": {key: value for key, value in flat.items() if key not in state or state[key] != value},
+                    "del": [key for key in state if key not in flat],
+                })
+
+            with open(self._file(location), "a", encoding="utf-8") as file:
+                file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            loaded.add(record)
+            return True
+
+    def issues(self, location: str) -> List[int]:
+        """Get issue times of all snapshots of a location, oldest first"""
+        with self._lock:
+            return list(self._load(location).issued)
+
+    def __len__(self) -> int:
+        return sum(len(self.issues(location)) for location in self.locations())
+
+    def snapshot(self, location: str, issued: Optional[int] = None) -> Union[ForecastData, MarineData]:
+        """Reconstruct a stored snapshot.
+
+        Parameters
+        ------------
+        location: :class:`str`
+            Location key
+        issued: Optional[:class:`int`]
+            Get the latest snapshot issued at or before this time. Defaults to the latest snapshot
+
+        Raises
+        --------
+        KeyError
+            No snapshot of the location was issued at or before given time
+
+        Returns
+        ---------
+        Union[:class:`ForecastData`, :class:`MarineData`]
+            The reconstructed forecast
+        """
+        with self._lock:
+            loaded = self._load(location)
+            index = len(loaded.issued) - 1 if issued is None else bisect_right(loaded.issued, issued) - 1
+            if index < 0:
+                raise KeyError(f"No snapshot of {location!r} issued at or before {issued}")
+            record = loaded.records[index]
+            flat = loaded.state if index == len(loaded.records) - 1 else loaded.rebuild(index)
+            raw = unflatten(flat)
+        return _MODELS[record["model"]](raw, record["status"], record["code"])
+
+    def _iter_raw(self, location: str) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        with self._lock:
+            loaded = self._load(location)
+            records = list(loaded.records)
+        flat: Dict[str, Any] = {}
+        for record in records:
+            if record["keyframe"]:
+                flat = dict(record["set"])
+            else:
+                for key in record["del"]:
+                    flat.pop(key, None)
+                flat.update(record["set"])
+            yield record, unflatten(flat)
+
+    def iter_snapshots(self, location: str) -> Iterator[Tuple[int, Union[ForecastData, MarineData]]]:
+        """Iterate over all snapshots of a location as ``(issued, forecast)`` tuples, oldest first"""
+        for record, raw in self._iter_raw(location):
+            yield record["issued"], _MODELS[record["model"]](raw, record["status"], record["code"])
+
+    def iter_columns(self, location: str, fields: Optional[Sequence[str]] = None) -> Iterator[Tuple[int, HourlyColumns]]:
+        """Iterate over hours of all snapshots of a location as ``(issued, columns)`` tuples, oldest first.
+
+        This is faster than :meth:`iter_snapshots`, because no models are built.
+
+        Parameters
+        ------------
+        location: :class:`str`
+            Location key
+        fields: Optional[Sequence[:class:`str`]]
+            Fields to convert, see :meth:`HourlyColumns.from_raw`
+        """
+        for record, raw in self._iter_raw(location):
+            hours = [hour for day in raw["forecast"]["forecastday"] for hour in day["hour"]]
+            yield record["issued"], HourlyColumns.from_raw(hours, fields)
+
+    def _series(self, location: str, key: str) -> List[Tuple[int, Any]]:
+        with self._lock:
+            loaded = self._load(location)
+            change = loaded.changes.get(key)
+            if change is None:
+                return []
+            positions, values = change
+            issued = loaded.issued
+            result: List[Tuple[int, Any]] = []
+            # every value holds until the next change point
+            for i, (position, value) in enumerate(zip(positions, values)):
+                if value is _REMOVED:
+                    continue
+                stop = positions[i + 1] if i + 1 < len(positions) else len(issued)
+                result.extend((issued[index], value) for index in range(position, stop))
+            return result
+
+    def hour_series(self, location: str, time_epoch: int, field: str) -> List[Tuple[int, Any]]:
+        """Get values of a field for a target hour, across all snapshots that contain this hour.
+
+        Parameters
+        ------------
+        location: :class:`str`
+            Location key
+        time_epoch: :class:`int`
+            ``time_epoch`` of the target hour
+        field: :class:`str`
+            Field of the hour, nested fields are joined with dots, e.g. ``"condition.code"``
+
+        Returns
+        ---------
+        List[Tuple[:class:`int`, Any]]
+            ``(issued, value)`` tuples, oldest first
+        """
+        with self._lock:
+            key = self._load(location).hour_keys.get((time_epoch, field))
+        return [] if key is None else self._series(location, key)
+
+    def day_series(self, location: str, date_epoch: int, field: str) -> List[Tuple[int, Any]]:
+        """Get values of a field for a target day, across all snapshots that contain this day.
+
+        Parameters
+        ------------
+        location: :class:`str`
+            Location key
+        date_epoch: :class:`int`
+            ``date_epoch`` of the target day
+        field: :class:`str`
+            Field of the day, e.g. ``"day.maxtemp_c"`` or ``"astro.sunrise"``
+
+        Returns
+        ---------
+        List[Tuple[:class:`int`, Any]]
+            ``(issued, value)`` tuples, oldest first
+        """
+        return self._series(location, f"day:{date_epoch}.{field}")
@@ -0,0 +1,464 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import datetime
+import json
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+from urllib.parse import quote, unquote
+
+from ..models import CurrentWeatherData, ForecastData, HourlyColumns
+from ..models.columns import NAN
+
+if TYPE_CHECKING:
+    from ..api import Client
+
+__all__ = (
+    "TimeSeriesStore",
+)
+
+# stored fields and their fixed-point scale (values are stored as integers: round(value * scale))
+FIELDS: Dict[str, int] = {
+    "temp_c": 10,
+    "feelslike_c": 10,
+    "wind_kph": 10,
+    "wind_degree": 1,
+    "gust_kph": 10,
+    "pressure_mb": 10,
+    "precip_mm": 100,
+    "humidity": 1,
+    "cloud": 1,
+    "vis_km": 10,
+    "uv": 10,
+    "is_day": 1,
+    "condition_code": 1,
+}
+EPOCH = "time_epoch"
+OFFSET = "utc_offset" # local time - UTC, in seconds
+
+_INT32_MIN, _INT32_MAX = -(2 ** 31), 2 ** 31 - 1
+MISSING = _INT32_MIN # delta marking a missing value, the running value is left unchanged
+
+class _Segment():
+    """A directory of delta-encoded int32 columns, with strictly increasing epochs"""
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.meta: Dict[str, Any] = {"count": 0, "first": None, "last": None, "origin": {}, "state": {}, "missing": {}}
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as file:
+                self.meta = json.load(file)
+
+    @property
+    def count(self) -> int:
+        return self.meta["count"]
+
+    @property
+    def first(self) -> int:
+        return self.meta["first"]
+
+    @property
+    def last(self) -> int:
+        return self.meta["last"]
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.path, name + ".col")
+
+    def append(self, columns: Dict[str, List[Optional[int]]]) -> None:
+        meta = self.meta
+        count = meta["count"]
+        rows = len(columns[EPOCH])
+        for name, values in columns.items():
+            state = meta["state"].get(name)
+            if state is None:
+                # first value of a new column, older rows of this segment are missing
+                first = next((value for value in values if value is not None), 0)
+                meta["origin"][name] = state = first
+                if count:
+                    meta["missing"][name] = meta["missing"].get(name, 0) + count
+                    self._write(name, array("i", [MISSING]) * count, 0)
+            deltas = array("i")
+            missing = 0
+            for value in values:
+                if value is None:
+                    deltas.append(MISSING)
+                    missing += 1
+                    continue
+                delta = value - state
+                if not _INT32_MIN < delta <= _INT32_MAX:
+                    raise ValueError(f"Value of {name} changed too much to be stored ({delta})")
+                deltas.append(delta)
+                state = value
+            meta["state"][name] = state
+            if missing:
+                meta["missing"][name] = meta["missing"].get(name, 0) + missing
+            self._write(name, deltas, count)
+
+        # columns not present in this batch are missing for the new rows
+        for name in meta["state"]:
+            if name not in columns:
+                meta["missing"][name] = meta["missing"].get(name, 0) + rows
+                self._write(name, array("i", [MISSING]) * rows, count)
+
+        if meta["first"] is None:
+            meta["first"] = columns[EPOCH][0]
+        meta["last"] = columns[EPOCH][-1]
+        meta["count"] = count + rows
+        # meta is written last, rows written without it are ignored (and overwritten) later
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(meta, file)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def _write(self, name: str, deltas: array, count: int) -> None:
+        path = self._column_path(name)
+        with open(path, "ab") as file:
+            file.truncate(count * deltas.itemsize) # drop rows of an interrupted append
+            file.seek(0, os.SEEK_END)
+            file.write(deltas.tobytes())
+
+    def read(self, name: str, start: int = 0, stop: Optional[int] = None) -> List[Optional[int]]:
+        """Decode rows ``start:stop`` of a column straight from the memory-mapped file"""
+        count = self.count
+        stop = count if stop is None else stop
+        origin = self.meta["origin"].get(name)
+        if origin is None or stop <= start:
+            return [None] * max(0, stop - start)
+
+        with open(self._column_path(name), "rb") as file, \
+             mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)[:count * 4].cast("i")
+            try:
+                if not self.meta["missing"].get(name):
+                    # fast path: a running sum of deltas, computed in C
+                    values: List[Optional[int]] = list(accumulate(view[:stop], initial=origin))[start + 1:]
+                else:
+                    values = []
+                    state = origin
+                    for i, delta in enumerate(view[:stop]):
+                        if delta == MISSING:
+                            value = None
+                        else:
+                            state += delta
+                            value = state
+                        if i >= start:
+                            values.append(value)
+            finally:
+                view.release()
+        return values
+
+class TimeSeriesStore():
+    """A local, append-only store of hourly observations, keyed by location and ``time_epoch``.
+
+    Numeric fields are stored as fixed-point integers, delta-encoded into 32-bit columns (one file per field).
+    Reading memory-maps the column files and decodes them directly, without JSON or model construction.
+
+    Data of a location is kept in segments with strictly increasing epochs. Newer rows are appended
+    to the segment they follow, and rows older than all stored data (or filling a gap inside a segment)
+    start a new segment. Rows with an epoch that is already stored are skipped.
+
+    .. code:: python
+
+        store = weatherly.TimeSeriesStore("weather-history")
+        store.sync(client, "London", "2022-01-01", "2023-12-31", rate_limit=5)
+        temperatures = store.read("London", ["temp_c"]).columns["temp_c"]
+
+    Parameters
+    ------------
+    path: :class:`str`
+        Directory of the store, created if it does not exist
+    fields: Optional[Dict[:class:`str`, :class:`int`]]
+        Fields to store and their fixed-point scale (values are stored as ``round(value * scale)``).
+        Defaults to common fields of History API hours and current weather (e.g. ``temp_c`` with scale ``10``)
+
+    Attributes
+    ------------
+    path: :class:`str`
+        Directory of the store
+    fields: Dict[:class:`str`, :class:`int`]
+        Stored fields and their fixed-point scale
+    """
+    def __init__(self, path: str, fields: Optional[Dict[str, int]] = None) -> None:
+        self.path: str = path
+        self.fields: Dict[str, int] = dict(fields or FIELDS)
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+
+    def _location_path(self, location: str) -> str:
+        return os.path.join(self.path, quote(location, safe=""))
+
+    def _segments(self, location: str) -> List[_Segment]:
+        path = self._location_path(location)
+        if not os.path.isdir(path):
+            return []
+        segments = [
+            _Segment(os.path.join(path, name)) for name in sorted(os.listdir(path))
+            if name.startswith("segment-")
+        ]
+        segments = [segment for segment in segments if segment.count]
+        segments.sort(key=lambda segment: segment.first)
+        return segments
+
+    def locations(self) -> List[str]:
+        """Get all locations with stored data
+
+        Returns
+        ---------
+        List[:class:`str`]
+            Location keys
+        """
+        return sorted(unquote(name) for name in os.listdir(self.path) if os.path.isdir(os.path.join(self.path, name)))
+
+    def append(self, location: str, columns: HourlyColumns) -> int:
+        """Append hourly data to the store.
+
+        Parameters
+        ------------
+        location: :class:`str`
+            Location key, e.g. a query string or a location name
+        columns: :class:`HourlyColumns`
+            Data to append. Only fields of this store are saved, ``NaN`` values are stored as missing
+
+        Returns
+        ---------
+        :class:`int`
+            Number of appended rows. Rows with an already stored epoch are skipped
+        """
+        order = sorted(range(len(columns)), key=lambda i: columns.epochs[i])
+        encoded: Dict[str, List[Optional[int]]] = {EPOCH: [], OFFSET: []}
+        fields = [field for field in self.fields if field in columns]
+        for field in fields:
+            encoded[field] = []
+
+        with self._lock:
+            segments = self._segments(location)
+            stored: Dict[int, List[Optional[int]]] = {} # epochs of segments, read when needed
+            previous = None
+            for i in order:
+                epoch = columns.epochs[i]
+                if epoch == previous or self._stored(segments, stored, epoch):
+                    continue
+                previous = epoch
+                encoded[EPOCH].append(epoch)
+                encoded[OFFSET].append(columns.local_epochs[i] - epoch)
+                for field in fields:
+                    value = columns.columns[field][i]
+                    encoded[field].append(None if value != value else round(value * self.fields[field]))
+
+            appended = len(encoded[EPOCH])
+            if appended:
+                self._write(location, segments, encoded)
+            return appended
+
+    @staticmethod
+    def _stored(segments: List[_Segment], stored: Dict[int, List[Optional[int]]], epoch: int) -> bool:
+        # a segment covering the epoch may still have a gap there, so look the epoch up in its column
+        for idx, segment in enumerate(segments):
+            if segment.first <= epoch <= segment.last:
+                epochs = stored.get(idx)
+                if epochs is None:
+                    epochs = stored[idx] = segment.read(EPOCH)
+                pos = bisect_left(epochs, epoch) # type: ignore
+                if pos < len(epochs) and epochs[pos] == epoch:
+                    return True
+        return False
+
+    def _write(self, location: str, segments: List[_Segment], encoded: Dict[str, List[Optional[int]]]) -> None:
+        # split rows by the segment they follow (the one ending last before them),
+        # rows that no segment ends before (e.g. filling a gap of the only segment) start a new one
+        batches: Dict[int, List[int]] = {}
+        order = sorted(range(len(segments)), key=lambda idx: segments[idx].last)
+        lasts = [segments[idx].last for idx in order]
+        for row, epoch in enumerate(encoded[EPOCH]):
+            pos = bisect_left(lasts, epoch) - 1
+            batches.setdefault(order[pos] if pos >= 0 else -1, []).append(row)
+
+        for idx, rows in batches.items():
+            if idx < 0:
+                path = self._location_path(location)
+                existing = [name for name in os.listdir(path) if name.startswith("segment-")] if os.path.isdir(path) else []
+                segment = _Segment(os.path.join(path, f"segment-{len(existing):06d}"))
+                os.makedirs(segment.path, exist_ok=True)
+            else:
+                segment = segments[idx]
+            segment.append({name: [values[row] for row in rows] for name, values in encoded.items()})
+
+    def append_history(self, location: str, data: ForecastData) -> int:
+        """Append hours of :class:`ForecastData` (e.g. returned from :meth:`Client.get_historical_data`)
+
+        Returns
+        ---------
+        :class:`int`
+            Number of appended rows
+        """
+        return self.append(location, HourlyColumns.from_hours(data.iter_hours(), list(self.fields)))
+
+    def append_current(self, location: str, data: CurrentWeatherData) -> int:
+        """Append :class:`CurrentWeatherData` as a single row, using ``last_updated_epoch`` as its time
+
+        Returns
+        ---------
+        :class:`int`
+            Number of appended rows (``0`` if this update is already stored)
+        """
+        return self.append(location, HourlyColumns.from_current(data, list(self.fields)))
+
+    def read(
+        self,
+        location: str,
+        fields: Optional[Sequence[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> HourlyColumns:
+        """Read stored data of a location.
+
+        Parameters
+        ------------
+        location: :class:`str`
+            Location key
+        fields: Optional[Sequence[:class:`str`]]
+            Fields to read, all stored fields by default
+        start: Optional[:class:`int`]
+            Read rows with ``time_epoch >= start``
+        end: Optional[:class:`int`]
+            Read rows with ``time_epoch < end``
+
+        Returns
+        ---------
+        :class:`HourlyColumns`
+            Stored data sorted by time, missing values are ``NaN``
+        """
+        fields = list(self.fields if fields is None else fields)
+        epochs, local_epochs = array("q"), array("q")
+        columns = {field: array("d") for field in fields}
+
+        with self._lock:
+            for segment in self._segments(location):
+                if (end is not None and segment.first >= end) or (start is not None and segment.last < start):
+                    continue
+                segment_epochs = segment.read(EPOCH)
+                lo = 0 if start is None else bisect_left(segment_epochs, start)
+                hi = len(segment_epochs) if end is None else bisect_left(segment_epochs, end)
+                if lo >= hi:
+                    continue
+                epochs.extend(segment_epochs[lo:hi])
+                offsets = segment.read(OFFSET, lo, hi)
+                local_epochs.extend(epoch + (offset or 0) for epoch, offset in zip(segment_epochs[lo:hi], offsets))
+                for field in fields:
+                    scale = self.fields.get(field, 1)
+                    columns[field].extend(NAN if value is None else value / scale for value in segment.read(field, lo, hi))
+
+        if any(epochs[i] > epochs[i + 1] for i in range(len(epochs) - 1)):
+            # segments filling gaps of other segments overlap them in time
+            order = sorted(range(len(epochs)), key=epochs.__getitem__)
+            epochs = array("q", (epochs[i] for i in order))
+            local_epochs = array("q", (local_epochs[i] for i in order))
+            columns = {field: array("d", (values[i] for i in order)) for field, values in columns.items()}
+        return HourlyColumns(epochs, local_epochs, columns)
+
+    def __len__(self) -> int:
+        return sum(segment.count for location in self.locations() for segment in self._segments(location))
+
+    def synced_days(self, location: str) -> Set[str]:
+        """Get days (as yyyy-mm-dd strings) already fetched for a location by :meth:`sync`"""
+        path = os.path.join(self._location_path(location), "days.txt")
+        if not os.path.exists(path):
+            return set()
+        with open(path, encoding="utf-8") as file:
+            return {line.strip() for line in file if line.strip()}
+
+    def sync(
+        self,
+        client: "Client",
+        location: str,
+        start: Union[str, datetime.date],
+        end: Union[str, datetime.date],
+        *,
+        query: Optional[str] = None,
+        **kwargs: Any
+    ) -> int:
+        """Fetch days missing from the store with :meth:`Client.get_historical_range` and append them.
+
+        Parameters
+        ------------
+        client: :class:`Client`
+            Client used to fetch data
+        location: :class:`str`
+            Location key
+        start: Union[:class:`str`, :class:`datetime.date`]
+            First day to sync
+        end: Union[:class:`str`, :class:`datetime.date`]
+            Last day to sync (inclusive)
+        query: Optional[:class:`str`]
+            Query string sent to the API, defaults to ``location``
+        kwargs: Dict[:class:`str`, Any]
+            Additional keyword arguments passed to :meth:`Client.get_historical_range`, e.g. ``rate_limit``
+
+        Returns
+        ---------
+        :class:`int`
+            Number of fetched days
+        """
+        from ..api.backfill import plan_days
+
+        query = location if query is None else query
+        synced = self.synced_days(location)
+        missing = sorted(date for _, date in plan_days([query], start, end) if date not in synced)
+
+        fetched = 0
+        for run_start, run_end in _runs(missing):
+            for _, date, data in client.get_historical_range(query, run_start, run_end, **kwargs):
+                # every day is stored as soon as it arrives, so an interrupted sync keeps the days fetched so far
+                with self._lock:
+                    os.makedirs(self._location_path(location), exist_ok=True)
+                    self.append_history(location, data)
+                    with open(os.path.join(self._location_path(location), "days.txt"), "a", encoding="utf-8") as file:
+                        file.write(date + "\n")
+                fetched += 1
+        return fetched
+
+def _runs(days: Iterable[str]) -> List[Tuple[str, str]]:
+    """Group sorted yyyy-mm-dd strings into runs of consecutive days"""
+    runs: List[Tuple[str, str]] = []
+    for day in days:
+        if runs and datetime.date.fromisoformat(day) - datetime.date.fromisoformat(runs[-1][1]) == datetime.timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
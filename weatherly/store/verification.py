@@ -0,0 +1,268 @@
+"""
+MIT License
+
+Copyright (c) 2023 Konrad (@konradsic)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import math
+from array import array
+from typing import (
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ..models import HourlyColumns
+from .snapshots import SnapshotArchive
+from .timeseries import TimeSeriesStore
+
+__all__ = (
+    "VerificationMetrics",
+    "ForecastVerifier",
+)
+
+DEFAULT_FIELDS: Tuple[str, ...] = ("temp_c", "wind_kph", "precip_mm", "humidity", "pressure_mb", "cloud")
+
+class VerificationMetrics(NamedTuple):
+    """Error metrics of a field, per lead time. Errors are ``forecast - observed``.
+
+    Attributes
+    ------------
+    field: :class:`str`
+        Verified field
+    lead_times: :class:`array.array`
+        Start of every lead time bucket, in seconds after the issue time
+    count: :class:`array.array`
+        Number of forecast/observation pairs in every bucket
+    mae: :class:`array.array`
+        Mean absolute error, ``NaN`` for empty buckets
+    bias: :class:`array.array`
+        Mean error, ``NaN`` for empty buckets
+    rmse: :class:`array.array`
+        Root mean squared error, ``NaN`` for empty buckets
+    """
+    field: str
+    lead_times: array
+    count: array
+    mae: array
+    bias: array
+    rmse: array
+
+class _Accumulator():
+    __slots__ = ("count", "error", "abs_error", "sq_error")
+
+    def __init__(self, size: int) -> None:
+        self.count = array("q", bytes(8 * size))
+        self.error = array("d", bytes(8 * size))
+        self.abs_error = array("d", bytes(8 * size))
+        self.sq_error = array("d", bytes(8 * size))
+
+class ForecastVerifier():
+    """Verifies forecasts against later observations, computing errors per field and lead time.
+
+    Forecast hours are joined with observed hours by ``time_epoch`` (a hash join on the observations),
+    and errors are summed into flat arrays indexed by lead time bucket, so no model objects are involved.
+    Verifiers of many locations can be combined with :meth:`merge`.
+
+    .. code:: python
+
+        verifier = weatherly.ForecastVerifier()
+        for location in archive.locations():
+            verifier.add_archive(archive, store, location)
+        metrics = verifier.metrics("temp_c")
+        print(list(metrics.lead_times), list(metrics.mae))
+
+    Parameters
+    ------------
+    fields: Optional[Sequence[:class:`str`]]
+        Fields to verify, defaults to ``temp_c``, ``wind_kph``, ``precip_mm``, ``humidity``, ``pressure_mb`` and ``cloud``
+    lead_step: :class:`int`
+        Size of lead time buckets in seconds. Defaults to one hour
+    max_lead: :class:`int`
+        Pairs with a longer lead time are ignored. Defaults to 14 days
+
+    Attributes
+    ------------
+    fields: List[:class:`str`]
+        Verified fields
+    lead_step: :class:`int`
+        Size of lead time buckets in seconds
+    max_lead: :class:`int`
+        Longest verified lead time in seconds
+    """
+    def __init__(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        lead_step: int = 3600,
+        max_lead: int = 14 * 86400,
+    ) -> None:
+        if lead_step <= 0:
+            raise ValueError("lead_step must be positive")
+        self.fields: List[str] = list(DEFAULT_FIELDS if fields is None else fields)
+        self.lead_step: int = lead_step
+        self.max_lead: int = max_lead
+        self._size: int = max_lead // lead_step + 1
+        self._stats: Dict[str, _Accumulator] = {field: _Accumulator(self._size) for field in self.fields}
+
+    def add(self, issued: int, forecast: HourlyColumns, observed: HourlyColumns) -> int:
+        """Add forecast/observation pairs of a single forecast.
+
+        Parameters
+        ------------
+        issued: :class:`int`
+            Issue time of the forecast as an epoch
+        forecast: :class:`HourlyColumns`
+            Forecast hours
+        observed: :class:`HourlyColumns`
+            Observed hours, e.g. read from a :class:`TimeSeriesStore`
+
+        Returns
+        ---------
+        :class:`int`
+            Number of joined hours (hours before the issue time or after ``max_lead`` are skipped)
+        """
+        return self._add(issued, forecast, observed, {epoch: i for i, epoch in enumerate(observed.epochs)})
+
+    def _add(self, issued: int, forecast: HourlyColumns, observed: HourlyColumns, index: Dict[int, int]) -> int:
+        step, max_lead = self.lead_step, self.max_lead
+        # join once, then every field reuses matched row indexes
+        rows: List[int] = []
+        matched: List[int] = []
+        buckets: List[int] = []
+        for i, epoch in enumerate(forecast.epochs):
+            j = index.get(epoch)
+            lead = epoch - issued
+            if j is None or lead < 0 or lead > max_lead:
+                continue
+            rows.append(i)
+            matched.append(j)
+            buckets.append(lead // step)
+
+        for field in self.fields:
+            if field not in forecast or field not in observed:
+                continue
+            predicted, actual = forecast.columns[field], observed.columns[field]
+            stats = self._stats[field]
+            count, error, abs_error, sq_error = stats.count, stats.error, stats.abs_error, stats.sq_error
+            for diff, bucket in zip([predicted[i] - actual[j] for i, j in zip(rows, matched)], buckets):
+                if diff != diff: # NaN, one of the values is missing
+                    continue
+                count[bucket] += 1
+                error[bucket] += diff
+                abs_error[bucket] += abs(diff)
+                sq_error[bucket] += diff * diff
+        return len(rows)
+
+    def add_archive(
+        self,
+        archive: SnapshotArchive,
+        store: TimeSeriesStore,
+        location: str,
+        observed_location: Optional[str] = None,
+    ) -> int:
+        """Verify all archived forecasts of a location against observations of a store.
+
+        Parameters
+        ------------
+        archive: :class:`SnapshotArchive`
+            Archive with forecasts
+        store: :class:`TimeSeriesStore`
+            Store with observations
+        location: :class:`str`
+            Location key in the archive
+        observed_location: Optional[:class:`str`]
+            Location key in the store, defaults to ``location``
+
+        Returns
+        ---------
+        :class:`int`
+            Number of joined hours
+        """
+        observed = store.read(location if observed_location is None else observed_location, self.fields)
+        if not len(observed):
+            return 0
+        index = {epoch: i for i, epoch in enumerate(observed.epochs)}
+        return sum(
+            self._add(issued, forecast, observed, index)
+            for issued, forecast in archive.iter_columns(location, self.fields)
+        )
+
+    def merge(self, other: "ForecastVerifier") -> None:
+        """Add pairs of another verifier (with the same lead time buckets) to this one"""
+        if (other.lead_step, other.max_lead) != (self.lead_step, self.max_lead):
+            raise ValueError("Cannot merge verifiers with different lead time buckets")
+        for field, theirs in other._stats.items():
+            ours = self._stats.get(field)
+            if ours is None:
+                self.fields.append(field)
+                ours = self._stats[field] = _Accumulator(self._size)
+            for name in _Accumulator.__slots__:
+                target, source = getattr(ours, name), getattr(theirs, name)
+                for i, value in enumerate(source):
+                    if value:
+                        target[i] += value
+
+    def metrics(self, field: str) -> VerificationMetrics:
+        """Get error metrics of a field per lead time. Only buckets up to the longest verified lead time are returned.
+
+        Parameters
+        ------------
+        field: :class:`str`
+            Verified field
+
+        Raises
+        --------
+        KeyError
+            The field is not verified by this verifier
+
+        Returns
+        ---------
+        :class:`VerificationMetrics`
+            Metrics per lead time
+        """
+        stats = self._stats[field]
+        size = max((i + 1 for i, count in enumerate(stats.count) if count), default=0)
+        nan = float("nan")
+        counts = stats.count[:size]
+        return VerificationMetrics(
+            field,
+            array("q", [i * self.lead_step for i in range(size)]),
+            counts,
+            array("d", [stats.abs_error[i] / n if n else nan for i, n in enumerate(counts)]),
+            array("d", [stats.error[i] / n if n else nan for i, n in enumerate(counts)]),
+            array("d", [math.sqrt(stats.sq_error[i] / n) if n else nan for i, n in enumerate(counts)]),
+        )
+
+    def summary(self, field: str) -> Tuple[int, float, float, float]:
+        """Get error metrics of a field over all lead times
+
+        Returns
+        ---------
+        Tuple[:class:`int`, :class:`float`, :class:`float`, :class:`float`]
+            Number of pairs, MAE, bias and RMSE
+        """
+        stats = self._stats[field]
+        n = sum(stats.count)
+        if not n:
+            return 0, float("nan"), float("nan"), float("nan")
+        return n, math.fsum(stats.abs_error) / n, math.fsum(stats.error) / n, math.sqrt(math.fsum(stats.sq_error) / n)